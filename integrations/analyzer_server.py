@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Pre-forked Unix-domain-socket analysis server
+
+The parent process loads spaCy and textstat once, binds the socket and then
+forks N workers. Workers inherit the loaded pipeline (shared copy-on-write)
+and the listening socket, and each accepts connections on its own, so the
+kernel spreads clients across them. Connections speak the framing protocol
+from framing.py; a connection may carry any number of requests and holds
+its worker until it is closed, so keep at most N connections open at once.
+
+A request {"id": ..., "op": "ping"} is the readiness probe: it is answered
+with {"status": "ready", "worker_pid": ...} without running any analysis.
+The socket only accepts connections after the models are loaded.
+
+Signals to the parent:
+    SIGTERM / SIGINT: graceful shutdown. Workers finish the request they are
+                      serving, then exit; the parent removes the socket.
+Workers that die for any other reason are respawned.
+"""
+
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+from framing import FramingError, handle_request, read_frame, write_frame
+
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+class AnalysisServer:
+    """Unix socket server with a pre-forked worker pool"""
+
+    def __init__(self, analyzer, socket_path: str, workers: Optional[int] = None,
+                 backlog: int = 128):
+        """
+        Args:
+            analyzer: Initialized analyzer, shared copy-on-write with workers
+            socket_path: Filesystem path of the Unix socket
+            workers: Number of worker processes (defaults to CPU count)
+            backlog: Listen backlog of the socket
+        """
+        self.analyzer = analyzer
+        self.socket_path = socket_path
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.backlog = backlog
+        self.listener = None
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self._stopping = False
+        self._busy = False
+
+    # ------------------------------------------------------------------
+    # Parent process
+    # ------------------------------------------------------------------
+
+    def serve_forever(self) -> None:
+        """Bind, fork the pool and supervise it until shutdown"""
+        signal.signal(signal.SIGTERM, self._parent_stop)
+        signal.signal(signal.SIGINT, self._parent_stop)
+        self._bind()
+
+        # Move everything loaded so far out of the collector's reach, so
+        # collections in the workers don't dirty the shared pages
+        gc.collect()
+        gc.freeze()
+
+        try:
+            for _ in range(self.workers):
+                self._spawn_worker()
+
+            while self.children:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                started = self.children.pop(pid, None)
+                if started is None or self._stopping:
+                    continue
+                # Unexpected death: respawn, but don't spin on a crash loop
+                if time.monotonic() - started < 1.0:
+                    time.sleep(1.0)
+                if not self._stopping:
+                    self._spawn_worker()
+        finally:
+            self._stop_children()
+            self.listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _bind(self) -> None:
+        """Create the listening socket, replacing a stale socket file"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        self.listener.listen(self.backlog)
+
+    def _spawn_worker(self) -> None:
+        # Hold shutdown signals until each side has the right handlers
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_loop()
+            except SystemExit:
+                pass
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    def _parent_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _stop_children(self) -> None:
+        """Terminate and reap whatever workers are left"""
+        self._parent_stop(signal.SIGTERM, None)
+        for pid in list(self.children):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.children.pop(pid, None)
+
+    # ------------------------------------------------------------------
+    # Worker process
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self) -> None:
+        self.children = {}
+        parent = os.getppid()
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, self._worker_stop)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+        # Wake up now and then to notice a parent that died without cleanup
+        self.listener.settimeout(1.0)
+        while not self._stopping and os.getppid() == parent:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                continue
+            with conn:
+                self._serve_connection(conn)
+
+    def _worker_stop(self, signum, frame) -> None:
+        self._stopping = True
+        # Idle workers leave at once; busy ones after the current response
+        if not self._busy:
+            raise SystemExit(0)
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        rfile = conn.makefile("rb")
+        wfile = conn.makefile("wb")
+        try:
+            while not self._stopping:
+                try:
+                    request = read_frame(rfile)
+                except FramingError as e:
+                    write_frame(wfile, {"id": None, "result": {"error": f"Protocol error: {str(e)}"}})
+                    break
+                if request is None:
+                    break
+
+                self._busy = True
+                try:
+                    if isinstance(request, dict) and request.get("op") == "ping":
+                        response = {"id": request.get("id"),
+                                    "result": {"status": "ready", "worker_pid": os.getpid()}}
+                    else:
+                        response = handle_request(self.analyzer, request)
+                    write_frame(wfile, response)
+                finally:
+                    self._busy = False
+        except OSError:
+            pass  # Client went away
+        finally:
+            rfile.close()
+            wfile.close()
+
+
+def probe(socket_path: str, timeout: float = 1.0) -> bool:
+    """
+    Readiness probe: True if a worker answers a ping on the socket
+
+    Args:
+        socket_path: Filesystem path of the Unix socket
+        timeout: Seconds to wait for the connection and the answer
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            with sock.makefile("rb") as rfile, sock.makefile("wb") as wfile:
+                write_frame(wfile, {"id": "probe", "op": "ping"})
+                response = read_frame(rfile)
+        return bool(response) and response.get("result", {}).get("status") == "ready"
+    except (OSError, FramingError):
+        return False
+
+
+def wait_until_ready(socket_path: str, timeout: float = 60.0) -> bool:
+    """Poll the readiness probe until it succeeds or `timeout` elapses"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if probe(socket_path):
+            return True
+        time.sleep(0.05)
+    return False
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Caches shared across analyses
+
+WordCache maps a word to (syllables, is_difficult, letter_count) with LRU
+eviction. Educational corpora reuse the same vocabulary heavily, so after a
+warm-up almost every word is a hit and textstat is not consulted at all.
+
+The cache can be saved to and loaded from a gzip-compressed TSV file so
+worker and batch modes start warm. The file header records the format and
+the textstat version; a file written by another version is ignored.
+
+ResultCache maps a content hash (text plus everything else that can change
+the result) to a complete analysis result, in an in-memory LRU tier and an
+optional SQLite tier on local disk that evicts least recently used rows once
+it grows past a byte budget. The same lesson analyzed for every persona is
+then computed once.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from readability import WordStats, textstat_word_info
+
+try:
+    from importlib.metadata import version as _package_version
+    TEXTSTAT_VERSION = _package_version("textstat")
+except Exception:
+    TEXTSTAT_VERSION = "unknown"
+
+WORD_CACHE_FORMAT = "empi-word-cache/1"
+
+
+class WordCache:
+    """Bounded LRU cache of per-word readability statistics"""
+
+    def __init__(self, maxsize: int = 100000, path: Optional[str] = None):
+        """
+        Args:
+            maxsize: Maximum number of cached words (0 disables caching)
+            path: Optional cache file to load now and save to later
+        """
+        self.maxsize = max(0, int(maxsize))
+        self.path = path or None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, WordStats]" = OrderedDict()
+        if self.path:
+            self.load(self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, word: str) -> WordStats:
+        """Return (syllables, is_difficult, letter_count), computing on a miss"""
+        entries = self._entries
+        stats = entries.get(word)
+        if stats is not None:
+            self.hits += 1
+            entries.move_to_end(word)
+            return stats
+
+        self.misses += 1
+        stats = textstat_word_info(word)
+        if self.maxsize:
+            entries[word] = stats
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return stats
+
+    def counters(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def load(self, path: str) -> int:
+        """
+        Merge entries from a cache file
+
+        Returns:
+            Number of entries loaded (0 if the file is missing or stale)
+        """
+        loaded = 0
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                if f.readline().rstrip("\n") != self._header():
+                    return 0
+                for line in f:
+                    word, syllables, difficult, letters = line.rstrip("\n").split("\t")
+                    self._entries[word] = (int(syllables), difficult == "1", int(letters))
+                    loaded += 1
+        except (OSError, ValueError, EOFError):
+            pass
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return loaded
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """
+        Write the cache atomically, most recently used words last
+
+        Returns:
+            True if the file was written
+        """
+        path = path or self.path
+        if not path:
+            return False
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                f.write(self._header() + "\n")
+                for word, (syllables, difficult, letters) in self._entries.items():
+                    if "\t" in word or "\n" in word:
+                        continue
+                    f.write(f"{word}\t{syllables}\t{int(difficult)}\t{letters}\n")
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except Exception:
+                pass
+            return False
+
+    @staticmethod
+    def _header() -> str:
+        return f"{WORD_CACHE_FORMAT}\ttextstat={TEXTSTAT_VERSION}"
+
+
+class ResultCache:
+    """Two-tier (memory LRU + SQLite) cache of complete analysis results"""
+
+    def __init__(self, maxsize: int = 1024, path: Optional[str] = None,
+                 max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            maxsize: Results kept in memory (0 disables the memory tier)
+            path: SQLite file for the disk tier (None disables it)
+            max_bytes: Size budget of the disk tier's stored results
+        """
+        self.maxsize = max(0, int(maxsize))
+        self.path = path or None
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._db = None
+        self._db_pid = None
+        self._disk_bytes = 0
+
+    @staticmethod
+    def key(text: str, context: Dict[str, Any]) -> str:
+        """
+        Content address of a result
+
+        The text is hashed exactly, not normalized: paragraph breaks,
+        whitespace runs and code points all show in the metrics, so two texts
+        that normalize alike can still have different results.
+
+        Args:
+            text: Text exactly as analyzed (after truncation)
+            context: Everything else the result depends on (config, versions)
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps(context, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Look a result up, memory first
+
+        Returns:
+            (fresh copy of the result, "memory" or "disk"), or (None, None)
+        """
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            return json.loads(value), "memory"
+
+        db = self._connection()
+        if db is None:
+            return None, None
+        try:
+            row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None, None
+            db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+        except sqlite3.Error:
+            return None, None
+        self._remember(key, row[0])
+        return json.loads(row[0]), "disk"
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result in both tiers"""
+        try:
+            value = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return
+        self._remember(key, value)
+
+        db = self._connection()
+        if db is None:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            # Running estimate; recounted exactly only when over budget
+            self._disk_bytes += len(value)
+            if self._disk_bytes > self.max_bytes:
+                self._evict(db)
+            db.commit()
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key: str, value: str) -> None:
+        if not self.maxsize:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _evict(self, db) -> None:
+        """Drop least recently used rows until the disk tier fits its budget"""
+        total = self._stored_bytes(db)
+        while total > self.max_bytes:
+            rows = db.execute(
+                "SELECT key, size FROM results ORDER BY last_used LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._disk_bytes = total
+
+    @staticmethod
+    def _stored_bytes(db) -> int:
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _connection(self):
+        """SQLite connection of this process (connections don't survive fork)"""
+        if not self.path:
+            return None
+        if self._db is not None and self._db_pid == os.getpid():
+            return self._db
+        try:
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            db.commit()
+            self._disk_bytes = self._stored_bytes(db)
+        except sqlite3.Error:
+            self.path = None  # Unusable location: run memory-only
+            return None
+        self._db, self._db_pid = db, os.getpid()
+        return db
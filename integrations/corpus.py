@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Bulk corpus analysis for text_analyzer.py batch
+
+Input formats (read incrementally, never loaded whole):
+    JSONL:  one {"id": ..., "text": ...} (or "content") object per line
+    JSON:   {"texts": [{"id": ..., "content": ...}, ...]} as in tests/texts.json
+
+Output is JSONL, one {"id": ..., "result": {...}} line per input record, in
+input order. Records whose id is already in the output file are skipped, so
+an interrupted run is resumed by running the same command again.
+"""
+
+import itertools
+import json
+import multiprocessing
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+Record = Tuple[Any, str]
+
+READ_CHUNK_SIZE = 1 << 16
+# A "texts" array, for first records too long to decode from the prefix
+_TEXTS_ARRAY = re.compile(r'"texts"\s*:\s*\[')
+
+# Analyzer and metric selection inherited by forked pool workers, set by
+# run_batch before forking
+_worker_analyzer = None
+_worker_selection: Dict[str, Any] = {}
+
+
+def _record(obj: Any, position: int) -> Record:
+    """Normalize one input object to (id, text)"""
+    if isinstance(obj, str):
+        return position, obj
+    if not isinstance(obj, dict):
+        return position, ""
+    text = obj.get("text", obj.get("content", ""))
+    return obj.get("id", position), text if isinstance(text, str) else ""
+
+
+def _iter_jsonl(f) -> Iterator[Record]:
+    for position, line in enumerate(f):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            obj = None
+        yield _record(obj, position)
+
+
+def _iter_json_texts(f, key: str = "texts") -> Iterator[Record]:
+    """Stream the items of the top-level `key` array without loading the file"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE)
+    eof = not buffer
+
+    def fill(size: int = READ_CHUNK_SIZE) -> bool:
+        nonlocal buffer, eof
+        if eof:
+            return False
+        chunk = f.read(size)
+        eof = not chunk
+        buffer += chunk
+        return not eof
+
+    # Find the opening bracket of the array
+    marker = json.dumps(key)
+    while True:
+        at = buffer.find(marker)
+        if at != -1:
+            bracket = buffer.find("[", at + len(marker))
+            if bracket != -1:
+                buffer = buffer[bracket + 1:]
+                break
+        if not fill():
+            return
+
+    position = 0
+    pos = 0
+    while True:
+        # Skip whitespace and the comma between items
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or not fill():
+                break
+        if pos >= len(buffer) or buffer[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            # Item continues past the buffer; a truly broken file ends here.
+            # Read as much again as the item so far, so that a large item is
+            # decoded a logarithmic number of times, not once per chunk
+            if not fill(max(READ_CHUNK_SIZE, len(buffer) - pos)):
+                return
+            continue
+        yield _record(obj, position)
+        position += 1
+        pos = end
+        # Drop consumed text so the buffer stays around one read chunk
+        if pos > READ_CHUNK_SIZE:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def iter_corpus(path: str) -> Iterator[Record]:
+    """
+    Yield (id, text) records from a JSONL or {"texts": [...]} corpus file
+
+    The format is detected from the first READ_CHUNK_SIZE characters: a
+    complete JSON value there (normally the first line) other than an
+    object with a "texts" key means JSONL.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        jsonl = _sniff_jsonl(f.read(READ_CHUNK_SIZE))
+        f.seek(0)
+        if jsonl or path.endswith(".jsonl"):
+            yield from _iter_jsonl(f)
+        else:
+            yield from _iter_json_texts(f)
+
+
+def _sniff_jsonl(prefix: str) -> bool:
+    """Whether a file starting with prefix is JSONL"""
+    start = len(prefix) - len(prefix.lstrip())
+    try:
+        first, _ = json.JSONDecoder().raw_decode(prefix, start)
+    except ValueError:
+        # A first line within the prefix that is not JSON (e.g. a pretty-printed
+        # "{") is not JSONL; one longer than the prefix is unless it opens "texts"
+        line_end = prefix.find("\n", start)
+        if line_end != -1 and prefix[start:line_end].strip():
+            return False
+        return prefix[start:start + 1] == "{" and not _TEXTS_ARRAY.search(prefix)
+    return not (isinstance(first, dict) and "texts" in first)
+
+
+def completed_ids(output_path: str) -> Set[Any]:
+    """
+    Collect ids already written to an output file
+
+    A trailing line cut off by an interrupted run is removed so the
+    resumed run appends after the last complete record.
+    """
+    path = Path(output_path)
+    if not path.exists():
+        return set()
+
+    done = set()
+    good_size = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(_hashable(json.loads(line)["id"]))
+            except (ValueError, KeyError, TypeError):
+                break
+            good_size += len(line)
+    if good_size != path.stat().st_size:
+        with open(path, "r+b") as f:
+            f.truncate(good_size)
+    return done
+
+
+def _hashable(value: Any) -> Any:
+    return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+
+def _analyze_chunk(chunk: List[Record]) -> List[Dict[str, Any]]:
+    """Pool task: analyze one chunk with the inherited analyzer and selection"""
+    texts = [text for _, text in chunk]
+    results = _worker_analyzer.analyze_many(texts, batch_size=len(texts), **_worker_selection)
+    return [{"id": record_id, "result": result}
+            for (record_id, _), result in zip(chunk, results)]
+
+
+def _chunks(records: Iterator[Record], size: int) -> Iterator[List[Record]]:
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(analyzer, input_path: str, output_path: str, processes: int = 1,
+              batch_size: int = 64, resume: bool = True,
+              metrics: Optional[List[str]] = None,
+              profile: Optional[str] = None,
+              language: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Analyze every record of a corpus file into a JSONL output file
+
+    Args:
+        analyzer: Initialized analyzer; forked workers inherit its models
+        input_path: JSONL or {"texts": [...]} corpus file
+        output_path: JSONL results file, appended to when resuming
+        processes: Worker processes (1 analyzes in this process)
+        batch_size: Records per chunk handed to a worker
+        resume: Skip records whose id is already in the output file
+        metrics: Metric families and/or result keys to compute (default: all)
+        profile: Named metric profile, used if metrics is None
+        language: Language of every record, a key of [languages]
+
+    Returns:
+        Summary with the number of analyzed, skipped and failed records
+    """
+    global _worker_analyzer, _worker_selection
+
+    done = completed_ids(output_path) if resume else set()
+    summary = {"analyzed": 0, "skipped": 0, "errors": 0, "output": output_path}
+
+    def pending() -> Iterator[Record]:
+        for record in iter_corpus(input_path):
+            if _hashable(record[0]) in done:
+                summary["skipped"] += 1
+            else:
+                yield record
+
+    chunks = _chunks(pending(), max(1, batch_size))
+    _worker_analyzer = analyzer
+    _worker_selection = {"metrics": metrics, "profile": profile, "language": language}
+    pool = None
+    if processes > 1:
+        # Forked workers share the already loaded models copy-on-write
+        analyzer.load_models([language] if language else None)
+        pool = multiprocessing.get_context("fork").Pool(processes)
+        results = pool.imap(_analyze_chunk, chunks)
+    else:
+        results = map(_analyze_chunk, chunks)
+
+    try:
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+            for lines in results:
+                for line in lines:
+                    out.write(json.dumps(line, ensure_ascii=False, separators=(',', ':')) + "\n")
+                    summary["analyzed"] += 1
+                    if "error" in line["result"]:
+                        summary["errors"] += 1
+                # An interrupted run loses at most the chunks still in flight
+                out.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _worker_analyzer = None
+        _worker_selection = {}
+
+    return summary
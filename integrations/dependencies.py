@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Optional dependencies, imported on first use
+
+Importing spaCy takes most of a cold start, and textstat and the TOML
+parser add to it, so no module imports them at load time: a metric family
+(or the config loader) calls optional_import() when it first needs one.
+The import runs with warnings and stderr silenced, and the module, or None
+if it is not installed, is remembered for later calls. available() answers
+"is it installed" without importing anything.
+
+import_times() measures what each dependency adds to a cold start, in a
+fresh interpreter per import (`text_analyzer.py startup`):
+
+    {"spacy": 0.86, "numpy": 0.09, "textstat": 0.24, "tomli": 0.002,
+     "text_analyzer": 0.05}
+"""
+
+import contextlib
+import importlib
+import importlib.util
+import subprocess
+import sys
+import warnings
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, Optional
+
+# What the analyzer may import lazily, heaviest first
+DEPENDENCIES = ("spacy", "numpy", "textstat", "tomli")
+
+# name -> module, or None if the import failed
+_modules: Dict[str, Optional[ModuleType]] = {}
+
+# Run timed imports here, so the analyzer's own modules resolve
+_HERE = str(Path(__file__).resolve().parent)
+_TIMED_IMPORT = ("import time; start = time.perf_counter(); import {name}; "
+                 "print(time.perf_counter() - start)")
+
+
+class NullWriter:
+    """A stderr that drops everything"""
+
+    def write(self, x): pass
+    def flush(self): pass
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """
+    Import a module once, silently
+
+    Returns:
+        The module, or None if it (or one of its imports) is missing
+    """
+    if name not in _modules:
+        with warnings.catch_warnings(), contextlib.redirect_stderr(NullWriter()):
+            warnings.simplefilter("ignore")
+            try:
+                _modules[name] = importlib.import_module(name)
+            except ImportError:
+                _modules[name] = None
+    return _modules[name]
+
+
+def available(name: str) -> bool:
+    """Whether a module is installed, without importing it"""
+    if _modules.get(name) is not None:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def import_times(names: Iterable[str] = DEPENDENCIES, repeat: int = 3,
+                 python: str = sys.executable) -> Dict[str, Optional[float]]:
+    """
+    Cold import time of each module, best of `repeat` fresh interpreters
+
+    Times include the module's own imports that are not already loaded by
+    the interpreter itself.
+
+    Returns:
+        name -> seconds, or None if the import failed
+    """
+    times: Dict[str, Optional[float]] = {}
+    for name in names:
+        best = None
+        for _ in range(max(1, repeat)):
+            completed = subprocess.run([python, "-W", "ignore", "-c",
+                                        _TIMED_IMPORT.format(name=name)],
+                                       capture_output=True, text=True, cwd=_HERE)
+            if completed.returncode != 0:
+                best = None
+                break
+            seconds = float(completed.stdout.strip().splitlines()[-1])
+            best = seconds if best is None else min(best, seconds)
+        times[name] = best
+    return times
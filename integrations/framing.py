@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Length-prefixed framing protocol for a long-lived text analyzer process
+
+Wire format (both directions):
+
+    +----------------------------+---------------------------+
+    | length: 4 bytes, uint32 BE | payload: `length` bytes   |
+    +----------------------------+---------------------------+
+
+The payload is a single JSON document (UTF-8, the default codec) or a
+MessagePack map (codec "msgpack", needs the optional `msgpack` package).
+The codec is fixed for the lifetime of a connection and chosen by the
+process that starts the server (`text_analyzer.py --framed [--msgpack]`).
+
+Requests and responses:
+
+    request:  {"id": <any>, "text": "...", "language": "en"}
+              optional "metrics": [...families or result keys] or "profile": "...",
+              "tier": "fast" or "full", and "deadline_ms": <time budget>
+              (see TextAnalyzer.analyze)
+    response: {"id": <same id>, "result": {...analysis or {"error": ...}}}
+
+Responses are written in request order. A clean EOF between frames ends the
+session; EOF inside a frame, a zero-length frame or a frame longer than
+MAX_FRAME_SIZE is a protocol error and closes the session.
+
+The transport is any pair of byte streams: the stdin/stdout pipes of a child
+process or the two ends of a socketpair. No temporary files, no shell.
+"""
+
+import json
+import socket
+import struct
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024  # 64 MiB, far above max_text_length
+CODECS = ("json", "msgpack")
+
+
+class FramingError(Exception):
+    """Raised on malformed frames or undecodable payloads"""
+
+
+def encode_payload(obj: Any, codec: str = "json") -> bytes:
+    """Serialize a message with the connection codec"""
+    if codec == "json":
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+    if codec == "msgpack":
+        if msgpack is None:
+            raise FramingError("msgpack codec requested but msgpack is not installed")
+        return msgpack.packb(obj, use_bin_type=True)
+    raise FramingError(f"Unknown codec: {codec}")
+
+
+def decode_payload(payload: bytes, codec: str = "json") -> Any:
+    """Deserialize a message with the connection codec"""
+    try:
+        if codec == "json":
+            return json.loads(payload.decode("utf-8"))
+        if codec == "msgpack":
+            if msgpack is None:
+                raise FramingError("msgpack codec requested but msgpack is not installed")
+            return msgpack.unpackb(payload, raw=False)
+    except FramingError:
+        raise
+    except Exception as e:
+        raise FramingError(f"Undecodable {codec} payload: {str(e)}")
+    raise FramingError(f"Unknown codec: {codec}")
+
+
+def encode_frame(obj: Any, codec: str = "json") -> bytes:
+    """Build a complete frame: length header followed by the payload"""
+    payload = encode_payload(obj, codec)
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FramingError(f"Frame too large: {len(payload)} bytes")
+    return HEADER.pack(len(payload)) + payload
+
+
+def _read_exact(stream, size: int) -> bytes:
+    """Read exactly `size` bytes, fewer only at EOF"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(stream, codec: str = "json") -> Optional[Any]:
+    """
+    Read one frame from a binary stream
+
+    Args:
+        stream: Binary file-like object with read()
+        codec: Payload codec of the connection
+
+    Returns:
+        Decoded message, or None on clean EOF before a frame starts
+
+    Raises:
+        FramingError: On truncated, empty, oversized or undecodable frames
+    """
+    header = _read_exact(stream, HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise FramingError("Truncated frame header")
+
+    (length,) = HEADER.unpack(header)
+    if length == 0:
+        raise FramingError("Empty frame")
+    if length > MAX_FRAME_SIZE:
+        raise FramingError(f"Frame too large: {length} bytes")
+
+    payload = _read_exact(stream, length)
+    if len(payload) < length:
+        raise FramingError("Truncated frame payload")
+    return decode_payload(payload, codec)
+
+
+def write_frame(stream, obj: Any, codec: str = "json") -> None:
+    """Write one frame to a binary stream and flush it"""
+    stream.write(encode_frame(obj, codec))
+    stream.flush()
+
+
+def handle_request(analyzer, request: Any) -> Dict[str, Any]:
+    """
+    Turn one decoded request into its response message
+
+    Shared by every long-lived transport so they all answer identically.
+    """
+    request_id = None
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        request_id = request.get("id")
+        text = request.get("text", "")
+        if not text:
+            result = {"error": "No text provided"}
+        else:
+            # Optional metric selection: a list of families/keys or a profile name
+            result = analyzer.analyze(text, metrics=request.get("metrics"),
+                                      profile=request.get("profile"),
+                                      tier=request.get("tier"),
+                                      deadline_ms=request.get("deadline_ms"),
+                                      language=request.get("language"))
+    except Exception as e:
+        result = {"error": f"Invalid request: {str(e)}"}
+    return {"id": request_id, "result": result}
+
+
+def serve_framed(analyzer, rfile, wfile, codec: str = "json") -> int:
+    """
+    Serve framed requests until clean EOF or a protocol error
+
+    Args:
+        analyzer: Initialized analyzer shared by all requests
+        rfile: Binary request stream
+        wfile: Binary response stream
+        codec: Payload codec of the connection
+
+    Returns:
+        Number of requests served
+    """
+    served = 0
+    while True:
+        try:
+            request = read_frame(rfile, codec)
+        except FramingError as e:
+            # The stream position is lost, report once and hang up
+            try:
+                write_frame(wfile, {"id": None, "result": {"error": f"Protocol error: {str(e)}"}}, codec)
+            except Exception:
+                pass
+            break
+        if request is None:
+            break
+
+        response = handle_request(analyzer, request)
+        try:
+            frame = encode_frame(response, codec)
+        except Exception:
+            frame = encode_frame({"id": response["id"],
+                                  "result": {"error": "Serialization failed"}}, codec)
+        wfile.write(frame)
+        wfile.flush()
+        served += 1
+
+    return served
+
+
+class AnalyzerClient:
+    """
+    Reference client for the framing protocol
+
+    Usage:
+        with AnalyzerClient.spawn() as client:
+            result = client.analyze("Some text.")
+    """
+
+    def __init__(self, rfile, wfile, codec: str = "json", process=None):
+        """
+        Wrap an already connected pair of binary streams
+
+        Args:
+            rfile: Stream the server writes responses to
+            wfile: Stream the server reads requests from
+            codec: Payload codec of the connection
+            process: Server subprocess to reap on close, if any
+        """
+        if codec not in CODECS:
+            raise FramingError(f"Unknown codec: {codec}")
+        self.rfile = rfile
+        self.wfile = wfile
+        self.codec = codec
+        self.process = process
+        self.sock = None
+        self._next_id = 0
+
+    @classmethod
+    def spawn(cls, codec: str = "json", python: Optional[str] = None,
+              script: Optional[str] = None) -> "AnalyzerClient":
+        """Start `text_analyzer.py --framed` as a child and connect to its pipes"""
+        script = script or str(Path(__file__).with_name("text_analyzer.py"))
+        command = [python or sys.executable, script, "--framed"]
+        if codec == "msgpack":
+            command.append("--msgpack")
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return cls(process.stdout, process.stdin, codec, process)
+
+    @classmethod
+    def connect(cls, socket_path: str, codec: str = "json") -> "AnalyzerClient":
+        """Connect to a `text_analyzer.py serve --socket PATH` server"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+        client = cls(sock.makefile("rb"), sock.makefile("wb"), codec)
+        client.sock = sock
+        return client
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request and wait for its response"""
+        write_frame(self.wfile, message, self.codec)
+        response = read_frame(self.rfile, self.codec)
+        if response is None:
+            raise FramingError("Server closed the connection")
+        if response.get("id") != message.get("id"):
+            raise FramingError(f"Response id {response.get('id')!r} does not match request")
+        return response
+
+    def analyze(self, text: str, language: Optional[str] = None,
+                metrics: Optional[List[str]] = None,
+                profile: Optional[str] = None,
+                tier: Optional[str] = None,
+                deadline_ms: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze one text and return the analyzer result"""
+        self._next_id += 1
+        message = {"id": self._next_id, "text": text}
+        if language:
+            message["language"] = language
+        if metrics is not None:
+            message["metrics"] = metrics
+        if profile:
+            message["profile"] = profile
+        if tier:
+            message["tier"] = tier
+        if deadline_ms is not None:
+            message["deadline_ms"] = deadline_ms
+        return self.request(message)["result"]
+
+    def close(self) -> None:
+        """Close the request stream and reap the server process"""
+        try:
+            self.wfile.close()
+        except Exception:
+            pass
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.rfile.close()
+        if self.sock is not None:
+            self.rfile.close()
+            self.sock.close()
+
+    def __enter__(self) -> "AnalyzerClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
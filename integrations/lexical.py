@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Lexical diversity measures: MTLD, HD-D and MATTR
+
+MTLD (McCarthy & Jarvis, 2010) is the mean length of the word runs whose
+type-token ratio stays above a threshold (0.72), averaged over a forward
+and a backward pass. HD-D (McCarthy & Jarvis, 2007) is the expected share
+of distinct words in a random 42-word sample, from the hypergeometric
+distribution. MATTR (Covington & McFall, 2010) is the mean type-token
+ratio of a window sliding one word at a time. Unlike plain TTR, none of
+them falls as the text gets longer.
+
+Words are mapped to integer ids first, so an MTLD pass is one loop with
+a per-id stamp array (no set rebuilt per run), and HD-D needs one
+hypergeometric probability per distinct word frequency, not per word.
+The MATTR window keeps a count per id, so each step of the slide is O(1).
+"""
+
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+MTLD_THRESHOLD = 0.72
+HDD_SAMPLE_SIZE = 42
+MATTR_WINDOW = 50
+
+
+def word_ids(words: Iterable[str]) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Intern words as consecutive integer ids
+
+    Returns:
+        (id of every word in order, word -> id)
+    """
+    words = list(words)
+    index = {word: i for i, word in enumerate(dict.fromkeys(words))}
+    return [index[word] for word in words], index
+
+
+def mtld_factors(ids: Sequence[int], threshold: float = MTLD_THRESHOLD) -> float:
+    """
+    Number of MTLD factors in one pass over `ids`, the last one partial
+
+    A factor ends when the running type-token ratio drops to the threshold;
+    the leftover run counts as the fraction of the way it got there.
+    """
+    if not ids:
+        return 0.0
+    stamps = [0] * (max(ids) + 1)
+    run = 1
+    factors = 0.0
+    types = tokens = 0
+    for word_id in ids:
+        tokens += 1
+        if stamps[word_id] != run:
+            stamps[word_id] = run
+            types += 1
+        # A new word never lowers the ratio, so only repeats are checked
+        elif types <= threshold * tokens:
+            factors += 1
+            run += 1
+            types = tokens = 0
+    if tokens:
+        factors += (1 - types / tokens) / (1 - threshold)
+    return factors
+
+
+def mtld_from_factors(word_count: int, forward: float, backward: float) -> float:
+    """Bidirectional MTLD from the factor counts of the two passes"""
+    values = [word_count / factors if factors else float(word_count)
+              for factors in (forward, backward)]
+    return sum(values) / 2
+
+
+def mtld(ids: Sequence[int], threshold: float = MTLD_THRESHOLD) -> float:
+    """Bidirectional MTLD of a word id sequence"""
+    return mtld_from_factors(len(ids), mtld_factors(ids, threshold),
+                             mtld_factors(ids[::-1], threshold))
+
+
+def _log_comb(n: int, k: int) -> float:
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def hdd(frequencies: Iterable[int], sample_size: int = HDD_SAMPLE_SIZE) -> float:
+    """
+    HD-D from word frequencies
+
+    Args:
+        frequencies: Occurrence count of every distinct word
+        sample_size: Size of the hypothetical random sample (42 by convention)
+
+    Returns:
+        Expected distinct words in a sample divided by the sample size,
+        or 0.0 if the text is shorter than the sample
+    """
+    spectrum = Counter(frequencies)
+    total = sum(frequency * types for frequency, types in spectrum.items())
+    if total < sample_size:
+        return 0.0
+
+    log_samples = _log_comb(total, sample_size)
+    expected_types = 0.0
+    for frequency, types in spectrum.items():
+        # Probability that a sample misses every occurrence of the word
+        rest = total - frequency
+        absent = math.exp(_log_comb(rest, sample_size) - log_samples) if rest >= sample_size else 0.0
+        expected_types += types * (1 - absent)
+    return expected_types / sample_size
+
+
+def window_types(ids: Sequence[int], window: int = MATTR_WINDOW) -> Iterator[int]:
+    """
+    Distinct words in every window of `window` consecutive words
+
+    Yields one count per window position (len(ids) - window + 1 of them);
+    a text shorter than the window is a single window of its own length.
+    """
+    if not ids:
+        return
+    window = max(1, window)
+    if len(ids) <= window:
+        yield len(set(ids))
+        return
+
+    counts = [0] * (max(ids) + 1)
+    types = 0
+    for word_id in ids[:window]:
+        if not counts[word_id]:
+            types += 1
+        counts[word_id] += 1
+    yield types
+
+    for leaving, entering in zip(ids, ids[window:]):
+        counts[leaving] -= 1
+        if not counts[leaving]:
+            types -= 1
+        if not counts[entering]:
+            types += 1
+        counts[entering] += 1
+        yield types
+
+
+def mattr(ids: Sequence[int], window: int = MATTR_WINDOW) -> float:
+    """Moving-average type-token ratio (plain TTR for texts under one window)"""
+    if not ids:
+        return 0.0
+    size = min(max(1, window), len(ids))
+    positions = len(ids) - size + 1
+    return sum(window_types(ids, window)) / (positions * size)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Native syllable counts and easy-word lists for languages textstat gets wrong
+
+textstat counts syllables with English heuristics and checks difficult
+words against the English Dale-Chall list whatever the language of the
+text, so a Russian text came out with nonsense syllable counts and nearly
+every word "difficult". A Lexicon replaces both for one language:
+
+    syllables   the number of vowel letters: in Russian spelling every
+                vowel is a syllable nucleus and there are no diphthong
+                digraphs, so the count is exact, not an estimate
+    easy words  the stems of the most frequent words of the language, in
+                a word list file under WORDLIST_DIR; a word is difficult
+                when its stem is not one of them, so every inflection of
+                a frequent word is easy, as Dale-Chall counts regular
+                inflections of its words as familiar
+
+wordlists/ru.txt holds the EASY_WORDS_SIZE most frequent Snowball stems
+(russian_stem) of the Russian list of wordfreq 3.1.1 (Robyn Speer; data
+CC BY-SA 4.0, compiled from subtitles, Wikipedia, news, books and web
+text), taking its words of Cyrillic letters only in frequency order:
+
+    from wordfreq import iter_wordlist
+    words = [w for w in iter_wordlist("ru", "large") if LEXICONS["ru"].is_native(w)]
+    stems = ranked_stems(words, EASY_WORDS_SIZE, russian_stem)
+
+A list can also be built from a corpus of the language (build_word_list).
+
+Words without a letter of the lexicon's alphabet (Latin names, numbers,
+code) are left to the fallback, textstat, as in any other text.
+
+A word list is read into a frozenset the first time it is needed, once
+per process; TextAnalyzer.load_models() reads it before corpus.run_batch
+forks its workers, which then share it. Stems are memoized per lexicon,
+so a word is stemmed once and then costs two hash lookups, without the
+word cache.
+"""
+
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from readability import _PUNCTUATION, WordInfo, WordStats, textstat_word_info
+
+WORDLIST_DIR = Path(__file__).resolve().parent / "wordlists"
+EASY_WORDS_SIZE = 3000
+STEM_CACHE_SIZE = 100000
+
+# ----------------------------------------------------------------------
+# Russian Snowball stemmer (snowballstem.org/algorithms/russian)
+# ----------------------------------------------------------------------
+
+_RU_VOWELS = frozenset("аеиоуыэюя")
+
+# Group 1 endings only count after "а" or "я", which stays
+_PERFECTIVE_GERUND_1 = ("вшись", "вши", "в")
+_PERFECTIVE_GERUND_2 = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+_ADJECTIVE = ("ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий",
+              "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею")
+_PARTICIPLE_1 = ("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE_2 = ("ивш", "ывш", "ующ")
+_REFLEXIVE = ("ся", "сь")
+_VERB_1 = ("ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют", "ны",
+           "ть", "й", "л", "н")
+_VERB_2 = ("ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено",
+           "ует", "уют", "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым", "ен",
+           "ят", "ит", "ыт", "ую", "ю")
+_NOUN = ("иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи", "ии",
+         "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия", "ья", "а",
+         "е", "и", "й", "о", "у", "ы", "ь", "ю", "я")
+_DERIVATIONAL = ("ость", "ост")
+_SUPERLATIVE = ("ейше", "ейш")
+
+
+def _longest(word: str, start: int, endings: Iterable[str]) -> Optional[str]:
+    """Longest of the endings that word ends with, at or after position start"""
+    found = None
+    for ending in endings:
+        if (word.endswith(ending) and len(word) - len(ending) >= start
+                and (found is None or len(ending) > len(found))):
+            found = ending
+    return found
+
+
+def _strip_grouped(word: str, start: int, group_1: Iterable[str],
+                   group_2: Iterable[str]) -> Optional[str]:
+    """word less the longest ending of either group, None if there is none"""
+    ending_1 = _longest(word, start, group_1)
+    ending_2 = _longest(word, start, group_2)
+    if ending_2 is not None and (ending_1 is None or len(ending_2) >= len(ending_1)):
+        return word[:-len(ending_2)]
+    if ending_1 is not None:
+        before = len(word) - len(ending_1) - 1
+        if before >= start and word[before] in "ая":
+            return word[:-len(ending_1)]
+    return None
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    """Starts of the RV and R2 regions"""
+    length = len(word)
+    rv = next((i + 1 for i, c in enumerate(word) if c in _RU_VOWELS), length)
+    r1 = next((i + 1 for i in range(1, length)
+               if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS), length)
+    r2 = next((i + 1 for i in range(r1 + 1, length)
+               if word[i] not in _RU_VOWELS and word[i - 1] in _RU_VOWELS), length)
+    return rv, r2
+
+
+def russian_stem(word: str) -> str:
+    """Snowball stem of a lowercase Russian word ("уроков" -> "урок")"""
+    word = word.replace("ё", "е")
+    rv, r2 = _regions(word)
+
+    # Step 1: a perfective gerund, else reflexive, then adjectival, verb or noun endings
+    stemmed = _strip_grouped(word, rv, _PERFECTIVE_GERUND_1, _PERFECTIVE_GERUND_2)
+    if stemmed is None:
+        reflexive = _longest(word, rv, _REFLEXIVE)
+        if reflexive:
+            word = word[:-len(reflexive)]
+        adjective = _longest(word, rv, _ADJECTIVE)
+        if adjective:
+            word = word[:-len(adjective)]
+            stemmed = _strip_grouped(word, rv, _PARTICIPLE_1, _PARTICIPLE_2) or word
+        else:
+            stemmed = (_strip_grouped(word, rv, _VERB_1, _VERB_2)
+                       or _strip_grouped(word, rv, (), _NOUN) or word)
+    word = stemmed
+
+    # Step 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Step 3
+    derivational = _longest(word, r2, _DERIVATIONAL)
+    if derivational:
+        word = word[:-len(derivational)]
+
+    # Step 4: a superlative ending (then undouble "нн"), else undouble "нн" or drop "ь"
+    superlative = _longest(word, rv, _SUPERLATIVE)
+    if superlative:
+        word = word[:-len(superlative)]
+    if word.endswith("нн") and len(word) - 2 >= rv:
+        return word[:-1]
+    if not superlative and word.endswith("ь") and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+# ----------------------------------------------------------------------
+# Lexicons
+# ----------------------------------------------------------------------
+
+def load_word_list(path: Path) -> FrozenSet[str]:
+    """Words of a word list file, one per line ("#" starts a comment line)"""
+    with open(path, encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f
+                         if line.strip() and not line.startswith("#"))
+
+
+class Lexicon:
+    """Syllable counter and easy-word set of one language"""
+
+    def __init__(self, vowels: str, alphabet: str, word_list: Path,
+                 stem: Callable[[str], str] = str):
+        """
+        Args:
+            vowels: Lowercase letters that make a syllable each
+            alphabet: Lowercase letters of the language; words with none of
+                      them go to the fallback
+            word_list: File of easy stems (load_word_list)
+            stem: Word -> the form the word list holds
+        """
+        self.vowels = vowels
+        self.alphabet = frozenset(alphabet)
+        self.word_list = word_list
+        self._easy_words: Optional[FrozenSet[str]] = None
+        self._stem = lru_cache(maxsize=STEM_CACHE_SIZE)(stem)
+        self._drop_vowels = str.maketrans("", "", vowels)
+
+    @property
+    def easy_words(self) -> FrozenSet[str]:
+        """The word list, read on first use"""
+        if self._easy_words is None:
+            self._easy_words = load_word_list(self.word_list)
+        return self._easy_words
+
+    def syllables(self, word: str) -> int:
+        """Vowel letters of a lowercase word"""
+        return len(word) - len(word.translate(self._drop_vowels))
+
+    def is_native(self, word: str) -> bool:
+        """Whether a lowercase word is written in the lexicon's alphabet only"""
+        return bool(word) and self.alphabet.issuperset(word)
+
+    def is_easy(self, word: str) -> bool:
+        return self._stem(word) in self.easy_words
+
+    def word_info(self, word: str, fallback: WordInfo = textstat_word_info) -> WordStats:
+        """(syllables, is_difficult, letter_count) of a lowercase word, like textstat_word_info"""
+        if self.alphabet.isdisjoint(word):
+            return fallback(word)
+        return self.syllables(word), not self.is_easy(word), len(_PUNCTUATION.sub("", word))
+
+    def word_info_with(self, fallback: WordInfo) -> WordInfo:
+        """word_info bound to a fallback, e.g. the analyzer's WordCache.lookup"""
+        return lambda word: self.word_info(word, fallback)
+
+
+LEXICONS: Dict[str, Lexicon] = {
+    "ru": Lexicon(vowels="аеёиоуыэюя", alphabet="абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+                  word_list=WORDLIST_DIR / "ru.txt", stem=russian_stem),
+}
+
+
+def ranked_stems(words: Iterable[str], size: int = EASY_WORDS_SIZE,
+                 stem: Callable[[str], str] = str) -> List[str]:
+    """The first `size` distinct stems of words ranked most frequent first"""
+    stems: Dict[str, None] = {}
+    for word in words:
+        stems.setdefault(stem(word))
+        if len(stems) >= size:
+            break
+    return list(stems)
+
+
+def build_word_list(texts: Iterable[str], size: int = EASY_WORDS_SIZE,
+                    stem: Callable[[str], str] = str) -> List[str]:
+    """
+    The `size` most frequent stems of some texts, most frequent first; words
+    are normalized like TextCounts words (lowercase, punctuation removed)
+    """
+    counts = Counter()
+    for text in texts:
+        words = (_PUNCTUATION.sub("", token) for token in text.lower().split())
+        counts.update(stem(word) for word in words if word.isalpha())
+    return [word for word, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))][:size]
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Trimmed spaCy pipelines and their on-disk snapshots
+
+The metrics only read tokens, tags, POS and morphology, so of a packaged
+model such as en_core_web_sm only KEEP is loaded, and a sentencizer is
+added. spacy.load(..., disable=[...]) would still deserialize the parser,
+NER and lemmatizer weights on every start just to switch them off; here
+they are excluded, and `text_analyzer.py prepare-model` writes the trimmed
+pipeline to a snapshot directory once (nlp.to_disk), which later starts
+load as is:
+
+    <snapshot_dir>/<model>/            the trimmed pipeline
+    <snapshot_dir>/<model>/FINGERPRINT_FILE
+        {"source": "en_core_web_sm", "source_version": "3.8.0",
+         "spacy_version": "3.8.16", "keep": [...], "components": [...]}
+
+A snapshot is only used while its fingerprint matches: the same source
+model, the installed version of that model (when it is installed), the
+running spaCy version and the same KEEP. Otherwise the source is loaded and trimmed the same
+way, so results do not depend on which of the two was loaded.
+
+PipelineRegistry keeps the pipelines of several languages in one process:
+each is loaded on its first request, and once their total size goes over a
+cap the least recently used ones are dropped (to be loaded again when next
+asked for). Sizes are the size on disk of the model or snapshot a pipeline
+was loaded from, less excluded components, read once when it loads and
+only when there is a cap: a lower bound of its memory, but proportional to
+it.
+"""
+
+import json
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dependencies import available, optional_import
+
+# Components the metrics need; the rest of a model is never loaded. English
+# models have no morphologizer: their POS and morphology are mapped from the
+# tagger's tags by the attribute_ruler (rules only, no weights)
+KEEP = ("tok2vec", "tagger", "morphologizer", "attribute_ruler")
+FINGERPRINT_FILE = "empi_fingerprint.json"
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent / "models"
+
+
+def snapshot_path(model_name: str, snapshot_dir: Optional[str] = None) -> Path:
+    """Snapshot directory of a model (a package name or a model path)"""
+    return Path(snapshot_dir or DEFAULT_SNAPSHOT_DIR) / Path(model_name).name
+
+
+def source_meta(model_name: str) -> Dict[str, Any]:
+    """meta.json of an installed model package or a model directory"""
+    spacy = optional_import("spacy")
+    if Path(model_name).exists():
+        return spacy.util.get_model_meta(Path(model_name))
+    return spacy.util.get_model_meta(spacy.util.get_package_path(model_name))
+
+
+def load_trimmed(model_name: str):
+    """Load a model without the components outside KEEP, plus a sentencizer"""
+    spacy = optional_import("spacy")
+    components = source_meta(model_name).get("components", [])
+    nlp = spacy.load(model_name, exclude=[name for name in components if name not in KEEP])
+    if "sentencizer" not in nlp.pipe_names:
+        nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def fingerprint(model_name: str) -> Dict[str, Any]:
+    """What a snapshot of a model must have been built from"""
+    spacy = optional_import("spacy")
+    try:
+        version = source_meta(model_name).get("version")
+    except Exception:
+        # Source not installed: the snapshot is all there is
+        version = None
+    return {"source": model_name, "source_version": version,
+            "spacy_version": spacy.__version__, "keep": list(KEEP)}
+
+
+def is_current(path: Path, model_name: str) -> bool:
+    """Whether the snapshot at path was built from the model as installed now"""
+    try:
+        recorded = json.loads((path / FINGERPRINT_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    expected = fingerprint(model_name)
+    if expected["source_version"] is None:
+        expected["source_version"] = recorded.get("source_version")
+    return all(recorded.get(key) == value for key, value in expected.items())
+
+
+def prepare_model(model_name: str, snapshot_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write the trimmed pipeline of a model to its snapshot directory
+
+    Args:
+        model_name: Installed model package or model directory
+        snapshot_dir: Where snapshots live (default: DEFAULT_SNAPSHOT_DIR)
+
+    Returns:
+        The snapshot's fingerprint plus its path
+    """
+    nlp = load_trimmed(model_name)
+    path = snapshot_path(model_name, snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    nlp.to_disk(path)
+    recorded = dict(fingerprint(model_name), components=list(nlp.pipe_names))
+    (path / FINGERPRINT_FILE).write_text(json.dumps(recorded, indent=2), encoding="utf-8")
+    return dict(recorded, path=str(path))
+
+
+def load_pipeline(model_name: str, snapshot_dir: Optional[str] = None,
+                  use_snapshot: bool = True):
+    """
+    The trimmed pipeline of a model, from its snapshot when that is current
+
+    Raises:
+        Whatever spacy.load raises when neither is loadable
+    """
+    spacy = optional_import("spacy")
+    path = snapshot_path(model_name, snapshot_dir)
+    if use_snapshot and is_current(path, model_name):
+        return spacy.load(path)
+    return load_trimmed(model_name)
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def pipeline_bytes(nlp) -> int:
+    """
+    Size of a pipeline: the files of the model or snapshot directory it was
+    loaded from, less the directories of components it left out, without
+    serializing it again; the serialized size if it was not loaded from disk
+    """
+    path = nlp.path
+    if path is None or not Path(path).is_dir():
+        return len(nlp.to_bytes())
+    size = 0
+    for entry in Path(path).iterdir():
+        if entry.is_file():
+            size += entry.stat().st_size
+        elif entry.name == "vocab" or entry.name in nlp.component_names:
+            size += _dir_bytes(entry)
+    return size
+
+
+class PipelineRegistry:
+    """Pipelines by language, loaded on first use, evicted least recently used first"""
+
+    def __init__(self, models: Dict[str, str], snapshot_dir: Optional[str] = None,
+                 use_snapshots: bool = True, max_bytes: int = 0,
+                 loader: Optional[Callable[[str], Any]] = None,
+                 size_of: Callable[[Any], int] = pipeline_bytes):
+        """
+        Args:
+            models: language -> model name or path ([languages])
+            snapshot_dir, use_snapshots: Where and whether to load snapshots
+            max_bytes: Cap on the total size of loaded pipelines, 0 for none;
+                       the pipeline in use is kept even if it alone is larger
+            loader: model name -> pipeline (default: load_pipeline)
+            size_of: pipeline -> bytes counted against max_bytes
+        """
+        self.models = models
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._loader = loader or (lambda name: load_pipeline(name, snapshot_dir, use_snapshots))
+        self._size_of = size_of
+        # language -> (pipeline or None if it failed to load, size), oldest use first
+        self._loaded: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        # Pipelines set by hand: never loaded, counted or evicted
+        self._pinned: Dict[str, Any] = {}
+
+    def get(self, language: str):
+        """The pipeline of a language, None if spaCy or its model is missing"""
+        if language in self._pinned:
+            return self._pinned[language]
+        if language in self._loaded:
+            self._loaded.move_to_end(language)
+            return self._loaded[language][0]
+
+        nlp = self._load(language)
+        # Sizes only matter against a cap
+        measure = nlp is not None and self.max_bytes
+        self._loaded[language] = (nlp, self._size_of(nlp) if measure else 0)
+        self._evict()
+        return nlp
+
+    def set(self, language: str, nlp) -> None:
+        """Use a given pipeline (or None for none) for a language"""
+        self._loaded.pop(language, None)
+        self._pinned[language] = nlp
+
+    def is_loaded(self, language: str) -> bool:
+        return language in self._pinned or language in self._loaded
+
+    def available(self, language: str) -> bool:
+        """Whether a language gets a pipeline, checked without loading it if not loaded yet"""
+        if self.is_loaded(language):
+            return self.get(language) is not None
+        model_name = self.models.get(language)
+        if model_name is None:
+            return False
+        return available("spacy") and (available(model_name) or Path(model_name).exists())
+
+    def loaded(self) -> List[str]:
+        """Languages with a loaded pipeline, least recently used first"""
+        return [language for language, (nlp, _) in self._loaded.items() if nlp is not None]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, size in self._loaded.values())
+
+    def _load(self, language: str):
+        model_name = self.models.get(language)
+        if model_name is None:
+            return None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                return self._loader(model_name)
+        except Exception:
+            return None
+
+    def _evict(self) -> None:
+        """Drop least recently used pipelines until under max_bytes, keeping the newest"""
+        while self.max_bytes and len(self._loaded) > 1 and self.total_bytes > self.max_bytes:
+            self._loaded.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Metric selection for TextAnalyzer.analyze
+
+Callers ask for metric families ("readability"), single result keys
+("flesch_kincaid_grade") or a named profile. plan_metrics() resolves the
+request against the metric registry into the families to run, cheapest
+first, and the shared inputs they need (see registry.INPUTS), so nothing
+else is computed. The spaCy Doc is by far the most expensive input, and
+a readability-only request never touches spaCy.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from registry import BUILTIN_METRICS, Metric, MetricRegistry
+
+# Built-in profiles; [profiles] in config.toml adds to or overrides these.
+# "full" (every registered family) needs no entry.
+PROFILES = {
+    "fast": ["readability", "basic", "structural", "lexical"],
+    "readability": ["readability"],
+    "complexity_label": ["flesch_kincaid_grade"],
+}
+
+
+class Plan:
+    """Metrics to run in order, the inputs they need, and keys to return"""
+
+    def __init__(self, metrics: Iterable[Metric], keys: Optional[Iterable[str]] = None):
+        self.metrics = tuple(metrics)
+        self.families = tuple(metric.name for metric in self.metrics)
+        self.intermediates = {need for metric in self.metrics for need in metric.inputs}
+        # None returns every key of the chosen families
+        self.keys = frozenset(keys) if keys is not None else None
+
+    def wants(self, family: str) -> bool:
+        return family in self.families
+
+    def needs(self, intermediate: str) -> bool:
+        return intermediate in self.intermediates
+
+    def select(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop keys that were not asked for (metadata and errors always stay)"""
+        if self.keys is None:
+            return result
+        return {k: v for k, v in result.items()
+                if k in self.keys or k in ("metadata", "error")}
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-friendly form, for cache keys"""
+        return {"families": {metric.name: metric.version for metric in self.metrics},
+                "keys": sorted(self.keys) if self.keys is not None else None}
+
+
+def _names(metrics: Any) -> List[str]:
+    """A metric selection as a list of names (ValueError if it is not strings)"""
+    if isinstance(metrics, str):
+        return [metrics]
+    error = ValueError("metrics must be a string or a list of strings")
+    if isinstance(metrics, dict):
+        raise error
+    try:
+        names = list(metrics)
+    except TypeError:
+        raise error from None
+    if not all(isinstance(name, str) for name in names):
+        raise error
+    return names
+
+
+def plan_metrics(metrics: Optional[Iterable[str]] = None, profile: Optional[str] = None,
+                 profiles: Optional[Dict[str, Iterable[str]]] = None,
+                 registry: Optional[MetricRegistry] = None) -> Plan:
+    """
+    Resolve a metric selection into a Plan
+
+    Args:
+        metrics: Family names and/or result keys
+        profile: Name of a profile, used when `metrics` is not given
+        profiles: Known profiles (defaults to PROFILES)
+        registry: Registered metric families (defaults to the built-in ones)
+
+    Returns:
+        The plan; every registered family when neither metrics nor profile
+        is given, or for the "full" profile
+
+    Raises:
+        ValueError: Unknown profile or metric name, or a selection that is
+                    not a string or a list of strings (as JSON may send)
+    """
+    registry = registry if registry is not None else MetricRegistry(BUILTIN_METRICS)
+    if profile is not None and not isinstance(profile, str):
+        raise ValueError("profile must be a string")
+    if metrics is None:
+        if profile is None or profile == "full":
+            return Plan(registry.schedule(registry.names()))
+        profiles = PROFILES if profiles is None else profiles
+        if profile not in profiles:
+            raise ValueError(f"Unknown profile: {profile}")
+        metrics = profiles[profile]
+    metrics = _names(metrics)
+
+    families = set()
+    keys = set()
+    whole_families = True
+    for name in metrics:
+        if name in registry:
+            families.add(name)
+            keys.update(registry[name].keys)
+            continue
+        family = registry.family_of(name)
+        if family is None:
+            raise ValueError(f"Unknown metric: {name}")
+        families.add(family)
+        keys.add(name)
+        whole_families = False
+
+    if not families:
+        raise ValueError("No metrics selected")
+    return Plan(registry.schedule(families), None if whole_families else keys)
+
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Single-pass readability engine
+
+TextCounts walks the text once and collects every count the readability
+formulas need (words, sentences, syllables, polysyllables, letters,
+characters, difficult words). The formulas below are then plain arithmetic
+on those counts, instead of ~16 textstat calls that each re-tokenize the
+text and recount syllables.
+
+Tokenization, rounding and formulas follow textstat 0.7.x, and per-word
+syllables and the Dale-Chall easy-word list still come from textstat, so
+results match textstat: counts exactly, indices to within TOLERANCE (the
+last rounding digit, for textstat versions that round differently).
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dependencies import optional_import
+from tokens import TokenizedText
+
+
+TOLERANCE = 0.1
+
+# Same character classes textstat uses
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SENTENCE = re.compile(r"\b[^.!?]+[.!?]*")
+_DIFFICULT_TOKEN = re.compile(r"[\w\='‘’]+")
+
+# Flesch Reading Ease constants per language (textstat.langs)
+FRE_CONSTANTS = {
+    "en": {"base": 206.835, "sentence_length": 1.015, "syll_per_word": 84.6},
+    "ru": {"base": 206.835, "sentence_length": 1.3, "syll_per_word": 60.1},
+}
+GUNNING_FOG_SYLLABLE_THRESHOLD = 3
+LINSEAR_WORDS = 100
+
+# (syllables, is_difficult, letter_count); is_difficult means "not on the
+# easy-word list", the syllable threshold is applied per formula
+WordStats = Tuple[int, bool, int]
+WordInfo = Callable[[str], WordStats]
+
+
+def textstat_word_info(word: str) -> WordStats:
+    """Per-word statistics, straight from textstat (imported on the first call)"""
+    textstat = optional_import("textstat")
+    syllables = textstat.syllable_count(word)
+    # With threshold 0 the syllable test always passes: only the list decides
+    is_difficult = textstat.is_difficult_word(word, 0)
+    return syllables, is_difficult, len(_PUNCTUATION.sub("", word))
+
+
+def legacy_round(number: float, points: int = 0) -> float:
+    """Round half away from zero, exactly like textstat's _legacy_round"""
+    p = 10 ** points
+    return float(math.floor((number * p) + math.copysign(0.5, number))) / p
+
+
+def _lexicon_count(text: str) -> int:
+    return len(_PUNCTUATION.sub("", text).split())
+
+
+def _sentence_count(text: str) -> int:
+    """Regex sentences with more than two words (textstat.sentence_count before max(1, ...))"""
+    sentences = _SENTENCE.findall(text)
+    ignored = sum(1 for sentence in sentences if _lexicon_count(sentence) <= 2)
+    return len(sentences) - ignored
+
+
+class TextCounts:
+    """Every count the readability formulas need, computed once"""
+
+    def __init__(self, language: str = "en"):
+        # Selects the Flesch Reading Ease constants
+        self.language = language
+        self.character_count = 0
+        self.letter_count = 0
+        self.word_count = 0
+        self.syllable_count = 0
+        self.polysyllable_count = 0
+        self.sentence_count = 0
+        self.raw_sentence_count = 0
+        # Unique lowercased tokens that are not in the easy-word list,
+        # with their syllable counts (textstat counts difficult words once)
+        self.hard_words: Dict[str, int] = {}
+        # Linsear Write only looks at the first 100 words
+        self.linsear_words = 0
+        self.linsear_easy = 0
+        self.linsear_hard = 0
+        self.linsear_sentence_count = 0
+
+    @classmethod
+    def from_text(cls, text: str, word_info: Optional[WordInfo] = None,
+                  raw_sentence_count: Optional[int] = None,
+                  tokens: Optional[TokenizedText] = None,
+                  language: str = "en") -> "TextCounts":
+        """
+        Count a text in one pass over its whitespace tokens
+
+        Args:
+            text: Input text
+            word_info: word -> (syllables, is_difficult, letter_count), e.g.
+                       WordCache.lookup; defaults to textstat with a per-call
+                       memo so each distinct word is looked up once
+            raw_sentence_count: Sentences already counted by the caller
+                                (Segmentation.raw_sentence_count)
+            tokens: The text already tokenized by the caller
+            language: Language of the text, for its FRE_CONSTANTS; word_info
+                      is what counts its syllables and difficult words
+                      (lexicons.LEXICONS)
+        """
+        if word_info is None:
+            memo: Dict[str, WordStats] = {}
+
+            def word_info(word: str) -> WordStats:
+                info = memo.get(word)
+                if info is None:
+                    info = memo[word] = textstat_word_info(word)
+                return info
+
+        if tokens is None:
+            tokens = TokenizedText.from_text(text)
+
+        counts = cls(language)
+        counts.character_count = tokens.character_count
+        # (syllables, letters) per token id, None for punctuation-only tokens
+        stats: Dict[int, Optional[Tuple[int, int]]] = {}
+        linsear_tokens = []
+        for position, token_id in enumerate(tokens.ids):
+            if token_id in stats:
+                info = stats[token_id]
+            else:
+                word = _PUNCTUATION.sub("", tokens[position]).lower()
+                info = stats[token_id] = word_info(word)[0::2] if word else None
+            syllables = 0
+            if info is not None:
+                syllables, letters = info
+                counts.word_count += 1
+                counts.letter_count += letters
+                counts.syllable_count += syllables
+                if syllables >= 3:
+                    counts.polysyllable_count += 1
+            if position < LINSEAR_WORDS:
+                linsear_tokens.append(tokens[position])
+                if syllables < 3:
+                    counts.linsear_easy += 1
+                else:
+                    counts.linsear_hard += 1
+
+        # Difficult-word tokens never cross whitespace, so the distinct
+        # lowercase words hold all of them
+        difficult_tokens = {word for token in tokens.vocabulary
+                            for word in _DIFFICULT_TOKEN.findall(token)}
+        for word in difficult_tokens:
+            syllables, is_difficult, _ = word_info(word)
+            if is_difficult:
+                counts.hard_words[word] = syllables
+
+        if raw_sentence_count is None:
+            raw_sentence_count = _sentence_count(text)
+        counts.raw_sentence_count = raw_sentence_count
+        counts.sentence_count = max(1, counts.raw_sentence_count)
+        counts.linsear_words = len(linsear_tokens)
+        counts.linsear_sentence_count = max(1, _sentence_count(" ".join(linsear_tokens)))
+        return counts
+
+    def merge(self, other: "TextCounts") -> "TextCounts":
+        """
+        Add the counts of the text that follows this one
+
+        Exact for everything but sentences that straddle the boundary between
+        the two texts, and Linsear Write when this text is under 100 words.
+        """
+        for name in ("character_count", "letter_count", "word_count", "syllable_count",
+                     "polysyllable_count", "raw_sentence_count"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.sentence_count = max(1, self.raw_sentence_count)
+        self.hard_words.update(other.hard_words)
+
+        # Linsear Write: top the first 100 words up from the next text
+        missing = LINSEAR_WORDS - self.linsear_words
+        if missing > 0 and other.linsear_words:
+            share = min(1.0, missing / other.linsear_words)
+            self.linsear_words += min(missing, other.linsear_words)
+            self.linsear_easy += round(other.linsear_easy * share)
+            self.linsear_hard += round(other.linsear_hard * share)
+            self.linsear_sentence_count += max(1, round(other.linsear_sentence_count * share))
+        return self
+
+    def difficult_word_count(self, syllable_threshold: int = 2) -> int:
+        """Unique non-easy words with at least `syllable_threshold` syllables"""
+        if syllable_threshold <= 0:
+            return len(self.hard_words)
+        return sum(1 for s in self.hard_words.values() if s >= syllable_threshold)
+
+    # ------------------------------------------------------------------
+    # Averages, rounded like textstat
+    # ------------------------------------------------------------------
+
+    def avg_sentence_length(self) -> float:
+        return legacy_round(self.word_count / self.sentence_count, 1) if self.sentence_count else 0.0
+
+    def avg_syllables_per_word(self) -> float:
+        return legacy_round(self.syllable_count / self.word_count, 1) if self.word_count else 0.0
+
+    # ------------------------------------------------------------------
+    # Formulas
+    # ------------------------------------------------------------------
+
+    def flesch_reading_ease(self, lang: Optional[str] = None) -> float:
+        constants = FRE_CONSTANTS.get(lang or self.language, FRE_CONSTANTS["en"])
+        score = (constants["base"]
+                 - constants["sentence_length"] * self.avg_sentence_length()
+                 - constants["syll_per_word"] * self.avg_syllables_per_word())
+        return legacy_round(score, 2)
+
+    def flesch_kincaid_grade(self) -> float:
+        grade = 0.39 * self.avg_sentence_length() + 11.8 * self.avg_syllables_per_word() - 15.59
+        return legacy_round(grade, 1)
+
+    def gunning_fog(self) -> float:
+        if not self.word_count:
+            return 0.0
+        hard = self.difficult_word_count(GUNNING_FOG_SYLLABLE_THRESHOLD)
+        per_diff_words = hard / self.word_count * 100
+        return legacy_round(0.4 * (self.avg_sentence_length() + per_diff_words), 2)
+
+    def smog_index(self) -> float:
+        if self.sentence_count < 3:
+            return 0.0
+        smog = 1.043 * (30 * (self.polysyllable_count / self.sentence_count)) ** .5 + 3.1291
+        return legacy_round(smog, 1)
+
+    def automated_readability_index(self) -> float:
+        if not self.word_count or not self.sentence_count:
+            return 0.0
+        chars_per_word = legacy_round(self.character_count / self.word_count, 2)
+        words_per_sentence = legacy_round(self.word_count / self.sentence_count, 2)
+        return legacy_round(4.71 * chars_per_word + 0.5 * words_per_sentence - 21.43, 1)
+
+    def coleman_liau_index(self) -> float:
+        if self.word_count:
+            letters_per_word = legacy_round(self.letter_count / self.word_count, 2)
+            sentences_per_word = legacy_round(self.sentence_count / self.word_count, 2)
+        else:
+            letters_per_word = sentences_per_word = 0.0
+        letters = legacy_round(letters_per_word * 100, 2)
+        sentences = legacy_round(sentences_per_word * 100, 2)
+        return legacy_round(0.058 * letters - 0.296 * sentences - 15.8, 2)
+
+    def dale_chall_readability_score(self) -> float:
+        if not self.word_count:
+            return 0.0
+        easy = self.word_count - self.difficult_word_count(0)
+        per_difficult_words = 100 - easy / self.word_count * 100
+        score = 0.1579 * per_difficult_words + 0.0496 * self.avg_sentence_length()
+        if per_difficult_words > 5:
+            score += 3.6365
+        return legacy_round(score, 2)
+
+    def linsear_write_formula(self) -> float:
+        if not self.linsear_sentence_count:
+            return 0.0
+        number = (self.linsear_easy + self.linsear_hard * 3) / self.linsear_sentence_count
+        if number <= 20:
+            number -= 2
+        return number / 2
+
+    def text_standard(self) -> str:
+        """Consensus grade of all the formulas, formatted like textstat"""
+        grade = self.flesch_kincaid_grade()
+        grades = [int(legacy_round(grade)), int(math.ceil(grade))]
+
+        fre = self.flesch_reading_ease()
+        if 90 <= fre < 100:
+            grades.append(5)
+        elif 80 <= fre < 90:
+            grades.append(6)
+        elif 70 <= fre < 80:
+            grades.append(7)
+        elif 60 <= fre < 70:
+            grades += [8, 9]
+        elif 50 <= fre < 60:
+            grades.append(10)
+        elif 40 <= fre < 50:
+            grades.append(11)
+        elif 30 <= fre < 40:
+            grades.append(12)
+        else:
+            grades.append(13)
+
+        for score in (self.smog_index(), self.coleman_liau_index(),
+                      self.automated_readability_index(),
+                      self.dale_chall_readability_score(),
+                      self.linsear_write_formula(), self.gunning_fog()):
+            grades += [int(legacy_round(score)), int(math.ceil(score))]
+
+        grade = Counter(grades).most_common(1)[0][0]
+        lower, upper = int(grade) - 1, int(grade)
+        return f"{lower}{_grade_suffix(lower)} and {upper}{_grade_suffix(upper)} grade"
+
+    def readability_metrics(self) -> Dict[str, Any]:
+        """The readability block of TextAnalyzer results"""
+        return {
+            "flesch_kincaid_grade": self.flesch_kincaid_grade(),
+            "flesch_reading_ease": self.flesch_reading_ease(),
+            "gunning_fog_index": self.gunning_fog(),
+            "smog_index": self.smog_index(),
+            "automated_readability_index": self.automated_readability_index(),
+            "coleman_liau_index": self.coleman_liau_index(),
+            "dale_chall_score": self.dale_chall_readability_score(),
+            "linsear_write_score": self.linsear_write_formula(),
+            "difficult_word_count": self.difficult_word_count(),
+            "text_standard": self.text_standard(),
+        }
+
+    def basic_stats(self) -> Dict[str, Any]:
+        """The basic statistics block of TextAnalyzer results"""
+        return {
+            "character_count": self.character_count,
+            "letter_count": self.letter_count,
+            "syllable_count": self.syllable_count,
+            "word_count": self.word_count,
+            "sentence_count": self.sentence_count,
+            "polysyllable_count": self.polysyllable_count,
+        }
+
+
+# Fast estimate: vowel groups instead of per-word syllable lookups
+_WORD_START = re.compile(r"(?<!\S)[^\w\s]*\w")
+_VOWEL_GROUP = re.compile(r"[aeiouy]+", re.IGNORECASE)
+# Final "e" after a consonant in a word with an earlier vowel ("make", not "the")
+_SILENT_E = re.compile(r"[aeiouy][^\Waeiouy]+e\b", re.IGNORECASE)
+_NO_VOWEL = re.compile(r"\b[^\Waeiouy]+\b", re.IGNORECASE)
+# textstat's syllables per vowel-group syllable over tests/texts.json
+# (pyphen splits short words less often)
+ESTIMATE_SYLLABLE_SCALE = 0.925
+
+
+def estimate_flesch_kincaid_grade(text: str, sentence_count: Optional[int] = None,
+                                  vowels: Optional[str] = None) -> Optional[float]:
+    """
+    Flesch-Kincaid grade from a few regex scans, without textstat lookups
+
+    Syllables are vowel groups, less silent final e's, plus one for each
+    word without vowels, scaled to textstat's rate; words and sentences are
+    counted like textstat. The estimate is within about one grade of
+    textstat, so it only tells apart texts far from a threshold.
+
+    Args:
+        text: Input text
+        sentence_count: Sentences by textstat's rule, if already known
+                        (Segmentation.sentence_count)
+        vowels: Vowel letters of a language whose syllables are its vowels
+                (Lexicon.vowels); they are counted exactly, English vowel
+                groups only in the Latin words
+
+    Returns:
+        The estimate rounded like textstat, or None for a text without words
+    """
+    words = len(_WORD_START.findall(text))
+    if not words:
+        return None
+    if vowels:
+        lowered = text.lower()
+        syllables = (len(lowered) - len(lowered.translate(str.maketrans("", "", vowels)))
+                     + ESTIMATE_SYLLABLE_SCALE * (len(_VOWEL_GROUP.findall(text))
+                                                  - len(_SILENT_E.findall(text))))
+    else:
+        syllables = ESTIMATE_SYLLABLE_SCALE * (len(_VOWEL_GROUP.findall(text))
+                                               - len(_SILENT_E.findall(text))
+                                               + len(_NO_VOWEL.findall(text)))
+    if sentence_count is None:
+        sentence_count = max(1, _sentence_count(text))
+    grade = (0.39 * legacy_round(words / sentence_count, 1)
+             + 11.8 * legacy_round(syllables / words, 1) - 15.59)
+    return legacy_round(grade, 1)
+
+
+def _grade_suffix(grade: int) -> str:
+    if grade % 100 in (11, 12, 13):
+        return "th"
+    return {1: "st", 2: "nd", 3: "rd"}.get(grade % 10, "th")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Registry of metric families
+
+Each family is a Metric that declares the inputs it reads, a rough relative
+cost, the result keys it produces and how to compute them. TextAnalyzer
+builds each input a plan needs once per text (Inputs), runs the planned
+metrics cheapest first and times every step, so a new metric is a
+registration rather than another pass over the text in analyze().
+
+Inputs, computed on first use and shared by all metrics:
+
+    text       the prepared text
+    segments   Segmentation: paragraph, sentence and token offsets, the
+               only source of boundaries (one sentence_count for all)
+    tokens     TokenizedText: whitespace token offsets over the segments'
+               offsets, with interned lowercase ids
+    words      whitespace tokens as a list of strings (for metric packs;
+               the built-in families read tokens)
+    sentences  sentence strings of the segmentation
+    counts     TextCounts: syllables, hard words, textstat sentences, by
+               the lexicon of the text's language (None without textstat)
+    doc        spaCy Doc from the pipeline of the text's language (None
+               without one)
+
+Third-party metric packs register through the "empi_agent.metrics" entry
+point group, without changes to text_analyzer.py. An entry point may
+resolve to a Metric, a list of Metrics, or a function called with the
+registry:
+
+    [project.entry-points."empi_agent.metrics"]
+    plain_language = "plain_language_pack:METRICS"
+
+A metric that also defines count() and finalize() is computed in streamed
+analyses too: count() returns counts that streaming.merge_counts can add up
+across chunks, finalize() turns the totals into metrics.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from segmentation import Segmentation
+from tokens import TokenizedText
+
+ENTRY_POINT_GROUP = "empi_agent.metrics"
+INPUTS = ("text", "segments", "tokens", "words", "sentences", "counts", "doc")
+
+Compute = Callable[[Any, "Inputs"], Dict[str, Any]]
+Count = Callable[[Any, "Inputs"], Dict[str, Any]]
+Finalize = Callable[[Any, Dict[str, Any]], Dict[str, Any]]
+
+
+class Metric:
+    """One metric family: declared inputs, cost and keys, plus its functions"""
+
+    def __init__(self, name: str, inputs: Iterable[str], keys: Iterable[str],
+                 compute: Optional[Compute] = None, cost: float = 1.0,
+                 count: Optional[Count] = None, finalize: Optional[Finalize] = None,
+                 version: str = "1"):
+        """
+        Args:
+            name: Family name, also usable in metrics=[...] selections
+            inputs: Names from INPUTS the metric reads
+            keys: Result keys the metric may produce
+            compute: (analyzer, inputs) -> metrics; defaults to
+                     finalize(count(...)) when those are given
+            cost: Relative cost estimate, cheaper metrics run first
+            count: (analyzer, inputs) -> mergeable counts, for streaming
+            finalize: (analyzer, counts) -> metrics, for streaming
+            version: Bump when results change (part of the result cache key)
+        """
+        unknown = set(inputs) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown metric inputs: {', '.join(sorted(unknown))}")
+        if compute is None and (count is None or finalize is None):
+            raise ValueError(f"Metric {name} needs compute or count and finalize")
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.keys = tuple(keys)
+        self.cost = cost
+        self.count = count
+        self.finalize = finalize
+        self.version = version
+        self._compute = compute
+
+    @property
+    def streamable(self) -> bool:
+        return self.count is not None and self.finalize is not None
+
+    def compute(self, analyzer, inputs: "Inputs") -> Dict[str, Any]:
+        if self._compute is not None:
+            return self._compute(analyzer, inputs)
+        return self.finalize(analyzer, self.count(analyzer, inputs))
+
+    def __repr__(self) -> str:
+        return f"Metric({self.name!r}, inputs={self.inputs}, cost={self.cost})"
+
+
+class Inputs:
+    """Lazily built, shared inputs of one text, with the time each took"""
+
+    def __init__(self, analyzer, text: str, doc=None, language: Optional[str] = None):
+        self.analyzer = analyzer
+        # Language of the text (None: the analyzer's default language)
+        self.language = language
+        self.timings: Dict[str, float] = {}
+        self._values: Dict[str, Any] = {"text": text}
+        self._nested = 0.0
+        if doc is not None:
+            self._values["doc"] = doc
+
+    def get(self, name: str) -> Any:
+        if name not in self._values:
+            outer = self._nested
+            self._nested = 0.0
+            start = time.perf_counter()
+            self._values[name] = _PROVIDERS[name](self)
+            elapsed = time.perf_counter() - start
+            # Inputs built along the way (counts needs tokens) time on their own
+            self.timings[name] = elapsed - self._nested
+            self._nested = outer + elapsed
+        return self._values[name]
+
+    def ready(self, name: str) -> bool:
+        """Whether an input is already built"""
+        return name in self._values
+
+    def __getattr__(self, name: str) -> Any:
+        if name in INPUTS:
+            return self.get(name)
+        raise AttributeError(name)
+
+
+def _parse(nlp, text: str):
+    return nlp(text) if nlp else None
+
+
+_PROVIDERS: Dict[str, Callable[[Inputs], Any]] = {
+    "segments": lambda inputs: Segmentation.from_text(inputs.text),
+    "tokens": lambda inputs: TokenizedText(inputs.text, inputs.segments.token_starts,
+                                           inputs.segments.token_ends),
+    "words": lambda inputs: inputs.text.split(),
+    "sentences": lambda inputs: list(inputs.segments.sentences(inputs.text)),
+    "counts": lambda inputs: inputs.analyzer._count_text(inputs.text, inputs.segments,
+                                                         inputs.tokens, inputs.language),
+    "doc": lambda inputs: _parse(inputs.analyzer.pipeline(inputs.language), inputs.text),
+}
+
+
+class MetricRegistry:
+    """Metric families by name, in registration order"""
+
+    def __init__(self, metrics: Iterable[Metric] = ()):
+        self._metrics: Dict[str, Metric] = {}
+        # Entry points that failed to load: name -> error
+        self.plugin_errors: Dict[str, str] = {}
+        for metric in metrics:
+            self.register(metric)
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric; a metric with the same name is replaced"""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def __getitem__(self, name: str) -> Metric:
+        return self._metrics[name]
+
+    def __iter__(self):
+        return iter(self._metrics.values())
+
+    def names(self) -> List[str]:
+        return list(self._metrics)
+
+    def family_of(self, key: str) -> Optional[str]:
+        """First registered family producing a result key"""
+        for metric in self._metrics.values():
+            if key in metric.keys:
+                return metric.name
+        return None
+
+    def schedule(self, names: Iterable[str]) -> Tuple[Metric, ...]:
+        """The named metrics, cheapest first (registration order breaks ties)"""
+        chosen = set(names)
+        order = {name: position for position, name in enumerate(self._metrics)}
+        return tuple(sorted((self._metrics[name] for name in chosen),
+                            key=lambda metric: (metric.cost, order[metric.name])))
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> int:
+        """
+        Register the metric packs installed under an entry point group
+
+        Returns:
+            Number of metrics registered; failures are kept in plugin_errors
+        """
+        try:
+            from importlib.metadata import entry_points
+            found = entry_points()
+            found = found.select(group=group) if hasattr(found, "select") else found.get(group, [])
+        except Exception:
+            return 0
+
+        registered = 0
+        for entry_point in found:
+            try:
+                registered += self._register_pack(entry_point.load())
+            except Exception as e:
+                self.plugin_errors[entry_point.name] = str(e)
+        return registered
+
+    def _register_pack(self, pack: Any) -> int:
+        if isinstance(pack, Metric):
+            self.register(pack)
+            return 1
+        if callable(pack):
+            before = len(self._metrics)
+            pack(self)
+            return len(self._metrics) - before
+        count = 0
+        for metric in pack:
+            count += self._register_pack(metric)
+        return count
+
+
+# ======================================================================
+# Built-in families
+# ======================================================================
+
+def _readability_count(analyzer, inputs: Inputs) -> Dict[str, Any]:
+    return {"counts": inputs.counts} if inputs.counts else {}
+
+
+def _readability_finalize(analyzer, totals: Dict[str, Any]) -> Dict[str, Any]:
+    return analyzer._compute_readability_metrics(totals["counts"]) if "counts" in totals else {}
+
+
+def _basic_compute(analyzer, inputs: Inputs) -> Dict[str, Any]:
+    return analyzer._compute_basic_stats(inputs.text, inputs.counts, inputs.segments)
+
+
+def _basic_count(analyzer, inputs: Inputs) -> Dict[str, Any]:
+    counts = inputs.counts
+    if counts:
+        return dict(counts.basic_stats(), raw_sentence_count=counts.raw_sentence_count)
+    segments = inputs.segments
+    return {"character_count": len(inputs.text), "word_count": segments.token_count,
+            "raw_sentence_count": segments.raw_sentence_count}
+
+
+def _basic_finalize(analyzer, totals: Dict[str, Any]) -> Dict[str, Any]:
+    stats = {k: v for k, v in totals.items() if k != "raw_sentence_count"}
+    if "raw_sentence_count" in totals:
+        # textstat counts at least one sentence per text, not per chunk
+        stats["sentence_count"] = max(1, totals["raw_sentence_count"])
+    return stats
+
+
+def _structural_count(analyzer, inputs: Inputs) -> Dict[str, Any]:
+    return analyzer._count_structure(inputs.text, inputs.segments)
+
+
+def _structural_finalize(analyzer, totals: Dict[str, Any]) -> Dict[str, Any]:
+    return analyzer._structural_metrics_from_counts(totals) if totals else {}
+
+
+def _lexical_count(analyzer, inputs: Inputs) -> Dict[str, Any]:
+    return analyzer._count_vocabulary(inputs.tokens)
+
+
+def _lexical_finalize(analyzer, totals: Dict[str, Any]) -> Dict[str, Any]:
+    return analyzer._lexical_metrics_from_counts(totals) if totals else {}
+
+
+def _autism_count(analyzer, inputs: Inputs) -> Dict[str, Any]:
+    return analyzer._count_reference(inputs.doc) if inputs.doc is not None else {}
+
+
+def _autism_finalize(analyzer, totals: Dict[str, Any]) -> Dict[str, Any]:
+    return analyzer._autism_metrics_from_counts(totals) if totals else {}
+
+
+BUILTIN_METRICS = (
+    Metric("readability", inputs=("counts",), cost=2.0, version="3",
+           keys=("flesch_kincaid_grade", "flesch_reading_ease", "gunning_fog_index",
+                 "smog_index", "automated_readability_index", "coleman_liau_index",
+                 "dale_chall_score", "linsear_write_score", "difficult_word_count",
+                 "text_standard"),
+           count=_readability_count, finalize=_readability_finalize),
+    Metric("basic", inputs=("text", "segments", "counts"), cost=2.0,
+           keys=("character_count", "letter_count", "syllable_count", "word_count",
+                 "sentence_count", "polysyllable_count"),
+           compute=_basic_compute, count=_basic_count, finalize=_basic_finalize),
+    Metric("structural", inputs=("text", "segments"), cost=1.0, version="2",
+           keys=("paragraph_count", "paragraph_sentence_ratio", "has_headings", "has_lists",
+                 "list_item_count", "average_paragraph_length_words", "heading_count",
+                 "numbered_heading_count", "block_quote_count", "table_count",
+                 "code_block_count"),
+           count=_structural_count, finalize=_structural_finalize),
+    Metric("lexical", inputs=("tokens",), cost=3.0,
+           keys=("type_token_ratio", "unique_word_count", "unique_word_ratio",
+                 "lexical_diversity_score", "mtld", "hdd", "mattr", "mattr_series"),
+           count=_lexical_count, finalize=_lexical_finalize),
+    Metric("autism", inputs=("doc",), cost=20.0,
+           keys=("pronoun_density", "determiner_density", "anaphora_density",
+                 "content_token_count"),
+           count=_autism_count, finalize=_autism_finalize),
+)
+
+
+def default_registry(plugins: bool = True) -> MetricRegistry:
+    """Built-in families, plus installed metric packs if `plugins`"""
+    registry = MetricRegistry(BUILTIN_METRICS)
+    if plugins:
+        registry.load_entry_points()
+    return registry
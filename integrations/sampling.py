@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Stratified paragraph sampling for very large documents
+
+A multi-megabyte text (a whole textbook) does not need exact metrics to
+pick a presentation style. With long_text_mode = "sample", or through
+TextAnalyzer.analyze_sample(), the paragraphs are split into contiguous
+strata by position, a seeded random sample of each stratum is analyzed,
+with the stratum's share of a fixed token budget, and metrics come from
+the merged sample counts:
+
+    - ratios, grades and densities are estimated from the sample as is
+    - counts that grow with the text (EXTENSIVE_KEYS) are scaled up by
+      total tokens / sampled tokens
+    - values that depend on how much text was seen or on runs across
+      paragraphs (NOT_EXTRAPOLATED_KEYS, e.g. the type-token ratio) have no
+      sound extrapolation and are left out
+
+Confidence intervals come from a stratified bootstrap: the sampled
+paragraphs are resampled with replacement within each stratum and the
+metrics recomputed for every replicate.
+"""
+
+import random
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Scale with the amount of text
+EXTENSIVE_KEYS = frozenset((
+    "character_count", "letter_count", "syllable_count", "word_count", "sentence_count",
+    "polysyllable_count", "paragraph_count", "list_item_count", "heading_count",
+    "numbered_heading_count", "block_quote_count", "table_count", "code_block_count",
+    "content_token_count",
+))
+
+# Not estimable from separate paragraphs: unique-word counts and what is
+# built on them (textstat counts each difficult word once) fall as more text
+# is seen, MTLD runs are cut at every paragraph end, and the series is
+# positional
+NOT_EXTRAPOLATED_KEYS = frozenset((
+    "type_token_ratio", "unique_word_count", "unique_word_ratio", "difficult_word_count",
+    "dale_chall_score", "gunning_fog_index", "text_standard", "mtld", "mattr_series",
+))
+
+
+def paragraph_token_counts(segments) -> List[int]:
+    """Whitespace tokens in each paragraph of a Segmentation"""
+    starts = segments.token_starts
+    return [bisect_left(starts, end) - bisect_left(starts, start)
+            for start, end in segments.paragraph_spans()]
+
+
+def stratified_sample(sizes: Sequence[int], max_tokens: int, strata: int,
+                      rng: random.Random) -> List[List[int]]:
+    """
+    Pick paragraphs from contiguous strata in proportion to their tokens
+
+    Each stratum takes paragraphs in random order until the next one would
+    overrun its share of max_tokens, but always takes at least one, so the
+    sample holds at most max_tokens plus one paragraph per stratum.
+
+    Args:
+        sizes: Tokens per paragraph, in document order
+        max_tokens: Token budget of the whole sample
+        strata: Number of strata
+        rng: Seeded random source
+
+    Returns:
+        Sorted paragraph indices of each stratum
+    """
+    total = sum(sizes)
+    count = len(sizes)
+    strata = max(1, min(strata, count))
+    bounds = [round(i * count / strata) for i in range(strata + 1)]
+
+    chosen = []
+    for low, high in zip(bounds, bounds[1:]):
+        budget = max_tokens * sum(sizes[low:high]) / max(1, total)
+        order = list(range(low, high))
+        rng.shuffle(order)
+        picked: List[int] = []
+        used = 0
+        for index in order:
+            if picked and used + sizes[index] > budget:
+                break
+            picked.append(index)
+            used += sizes[index]
+        chosen.append(sorted(picked))
+    return chosen
+
+
+def bootstrap_intervals(strata: Sequence[Sequence[int]],
+                        estimate: Callable[[List[int]], Dict[str, object]],
+                        replicates: int, confidence: float,
+                        rng: random.Random) -> Dict[str, Tuple[float, float]]:
+    """
+    Percentile confidence intervals of every numeric metric
+
+    Args:
+        strata: Sampled paragraph indices per stratum
+        estimate: Metrics of a multiset of paragraph indices (sorted)
+        replicates: Bootstrap resamples
+        confidence: Coverage of the intervals, e.g. 0.95
+        rng: Seeded random source
+
+    Returns:
+        key -> (low, high)
+    """
+    values: Dict[str, List[float]] = {}
+    for _ in range(replicates):
+        indices = sorted(index for stratum in strata if stratum
+                         for index in rng.choices(stratum, k=len(stratum)))
+        for key, value in estimate(indices).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.setdefault(key, []).append(value)
+
+    tail = (1 - confidence) / 2
+    return {key: (_percentile(sample, tail), _percentile(sample, 1 - tail))
+            for key, sample in values.items()}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile (fraction in [0, 1])"""
+    values = sorted(values)
+    position = fraction * (len(values) - 1)
+    below = int(position)
+    above = min(below + 1, len(values) - 1)
+    return values[below] + (values[above] - values[below]) * (position - below)
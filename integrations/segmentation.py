@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Paragraph, sentence and token segmentation, done once per text
+
+Every metric family reads its boundaries from one Segmentation, so the
+paragraphs the structural metrics count are the paragraphs, and there is a
+single sentence_count: the one the readability formulas use (textstat's
+rule, see readability._sentence_count). Spans are kept as start/end
+character offsets in compact arrays.
+
+    paragraphs  non-blank pieces between "\n\n" breaks
+    sentences   runs of text from a word character up to and including the
+                next . ! ? run; only those with more than two words count
+    tokens      maximal runs of non-whitespace (the words of text.split());
+                tokens.TokenizedText adds lowercase ids over the same offsets
+"""
+
+from array import array
+from typing import Iterator, Tuple
+
+from readability import _SENTENCE, _lexicon_count
+from tokens import token_offsets
+
+PARAGRAPH_BREAK = "\n\n"
+
+# Sentences of this many words or fewer are not counted (textstat)
+SHORT_SENTENCE_WORDS = 2
+
+
+class Segmentation:
+    """Start/end offsets of the paragraphs, sentences and tokens of a text"""
+
+    __slots__ = ("paragraph_starts", "paragraph_ends", "sentence_starts", "sentence_ends",
+                 "sentence_words", "token_starts", "token_ends")
+
+    def __init__(self):
+        self.paragraph_starts = array("I")
+        self.paragraph_ends = array("I")
+        self.sentence_starts = array("I")
+        self.sentence_ends = array("I")
+        # Words per sentence, as textstat counts them
+        self.sentence_words = array("I")
+        self.token_starts = array("I")
+        self.token_ends = array("I")
+
+    @classmethod
+    def from_text(cls, text: str) -> "Segmentation":
+        segments = cls()
+
+        start = 0
+        while start <= len(text):
+            end = text.find(PARAGRAPH_BREAK, start)
+            if end == -1:
+                end = len(text)
+            if text[start:end].strip():
+                segments.paragraph_starts.append(start)
+                segments.paragraph_ends.append(end)
+            start = end + len(PARAGRAPH_BREAK)
+
+        for match in _SENTENCE.finditer(text):
+            segments.sentence_starts.append(match.start())
+            segments.sentence_ends.append(match.end())
+            segments.sentence_words.append(_lexicon_count(match.group()))
+
+        segments.token_starts, segments.token_ends = token_offsets(text)
+        return segments
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self.paragraph_starts)
+
+    @property
+    def raw_sentence_count(self) -> int:
+        """Sentences with more than two words (may be 0)"""
+        return sum(1 for words in self.sentence_words if words > SHORT_SENTENCE_WORDS)
+
+    @property
+    def sentence_count(self) -> int:
+        """The sentence count every metric family uses (at least 1)"""
+        return max(1, self.raw_sentence_count)
+
+    @property
+    def token_count(self) -> int:
+        return len(self.token_starts)
+
+    def paragraphs(self, text: str) -> Iterator[str]:
+        return _slices(text, self.paragraph_starts, self.paragraph_ends)
+
+    def sentences(self, text: str) -> Iterator[str]:
+        return _slices(text, self.sentence_starts, self.sentence_ends)
+
+    def paragraph_spans(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.paragraph_starts, self.paragraph_ends)
+
+    def sentence_spans(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.sentence_starts, self.sentence_ends)
+
+
+def _slices(text: str, starts: array, ends: array) -> Iterator[str]:
+    return (text[start:end] for start, end in zip(starts, ends))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Chunking and count merging for streaming analysis of long texts
+
+Instead of truncating at max_text_length, a long text is cut into chunks at
+paragraph boundaries, every chunk is analyzed on its own (spaCy included,
+optionally in parallel), and the per-chunk counts are merged into
+whole-document metrics: readability from summed counts, lexical statistics
+from the merged word frequencies. Only one chunk's worth of text and Doc is alive
+at a time; what grows with the document is its vocabulary.
+"""
+
+import copy
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator
+
+PARAGRAPH_BREAK = "\n\n"
+# Plain numbers, the common case of merge_counts (bool is merged apart)
+_NUMBERS = (int, float)
+
+
+def iter_chunks(pieces: Iterable[str], chunk_chars: int) -> Iterator[str]:
+    """
+    Regroup a stream of text pieces into chunks of about `chunk_chars`
+
+    Chunks end at a paragraph break when there is one in reach, else at the
+    last whitespace, and only as a last resort in the middle of a word.
+
+    Args:
+        pieces: Text in any pieces (a whole string, file blocks, pages)
+        chunk_chars: Target chunk size in characters
+
+    Yields:
+        Non-blank chunks that concatenate back to the input
+    """
+    chunk_chars = max(1, chunk_chars)
+    # Pieces not yet in a chunk; joined only once they reach chunk_chars, and
+    # chunks are cut at offsets into the joined text, so each character is
+    # copied a bounded number of times however long the text
+    pending = []
+    pending_chars = 0
+    for piece in pieces:
+        pending.append(piece)
+        pending_chars += len(piece)
+        if pending_chars < chunk_chars:
+            continue
+        buffer = "".join(pending)
+        start = 0
+        while len(buffer) - start >= chunk_chars:
+            cut = _cut_point(buffer, start, chunk_chars)
+            chunk = buffer[start:cut]
+            start = cut
+            if chunk.strip():
+                yield chunk
+        pending = [buffer[start:]]
+        pending_chars = len(pending[0])
+    rest = "".join(pending)
+    if rest.strip():
+        yield rest
+
+
+def _cut_point(buffer: str, start: int, chunk_chars: int) -> int:
+    """Position just after the best boundary within chunk_chars of start"""
+    limit = start + chunk_chars
+    at = buffer.rfind(PARAGRAPH_BREAK, start, limit)
+    if at > start:
+        # Keep the whole run of newlines with the chunk that ends there
+        end = at + len(PARAGRAPH_BREAK)
+        while end < len(buffer) and buffer[end] == "\n":
+            end += 1
+        return end
+    at = max(buffer.rfind(" ", start, limit), buffer.rfind("\n", start, limit),
+             buffer.rfind("\t", start, limit))
+    if at > start:
+        return at + 1
+    return limit
+
+
+def merge_counts(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold one chunk's counts into the running totals, in place
+
+    Numbers add up, flags are or-ed, sets are united, Counters (word
+    frequencies) and lists are concatenated or added, and objects with a
+    merge() method (TextCounts) merge the next chunk's object. The totals
+    never share a mutable value with a part, so parts can be merged again
+    (sampling.bootstrap_intervals).
+    """
+    for key, value in part.items():
+        if type(value) in _NUMBERS and key in total:
+            total[key] += value
+        elif key not in total:
+            if hasattr(value, "merge"):
+                total[key] = copy.deepcopy(value)
+            elif isinstance(value, (set, Counter, list)):
+                total[key] = value.copy()
+            else:
+                total[key] = value
+        elif isinstance(value, set):
+            total[key] |= value
+        elif isinstance(value, bool):
+            total[key] = total[key] or value
+        elif hasattr(total[key], "merge"):
+            total[key].merge(value)
+        elif isinstance(value, Counter):
+            # Counter += rescans the whole total to drop non-positive counts
+            total[key].update(value)
+        else:
+            total[key] += value
+    return total
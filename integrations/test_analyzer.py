@@ -4,10 +4,12 @@ Pytest tests for text analyzer - UPDATED for new config structure
 """
 
 import pytest
+import io
 import json
 import tempfile
 from pathlib import Path
-from text_analyzer import TextAnalyzer
+from framing import handle_request
+from text_analyzer import TextAnalyzer, serve
 
 # Test data
 QUANTUM_TEXT = """
@@ -190,6 +192,211 @@ class TestTextAnalyzer:
             Path(config_path).unlink()
 
 
+class TestAnalyzeMany:
+    """Test cases for batch analysis with nlp.pipe"""
+    
+    TEXTS = [SIMPLE_TEXT, "", QUANTUM_TEXT, "He said she went to their house."]
+    
+    # Metadata that legitimately differs between two runs of the same text
+    RUN_DEPENDENT = ("processing_time_seconds", "timings_seconds", "word_cache")
+    
+    @classmethod
+    def _without_timing(cls, result):
+        result = dict(result)
+        if "metadata" in result:
+            result["metadata"] = {k: v for k, v in result["metadata"].items()
+                                  if k not in cls.RUN_DEPENDENT}
+        return result
+    
+    def test_matches_analyze(self):
+        """Results come back in input order, identical to analyze()"""
+        # A second analyzer, so that analyze() does not hit analyze_many()'s results
+        batched = list(TextAnalyzer().analyze_many(iter(self.TEXTS), batch_size=2))
+        single = [TextAnalyzer().analyze(text) for text in self.TEXTS]
+        
+        assert len(batched) == len(self.TEXTS)
+        assert [self._without_timing(r) for r in batched] == \
+               [self._without_timing(r) for r in single]
+    
+    def test_matches_analyze_with_pipeline(self):
+        """Same guarantee when the spaCy path (nlp.pipe) is taken"""
+        spacy = pytest.importorskip("spacy")
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        batch_analyzer, single_analyzer = TextAnalyzer(), TextAnalyzer()
+        batch_analyzer.nlp = single_analyzer.nlp = nlp
+        
+        batched = list(batch_analyzer.analyze_many(self.TEXTS, batch_size=2))
+        single = [single_analyzer.analyze(text) for text in self.TEXTS]
+        
+        assert batched[1] == {"error": "Empty text provided"}
+        assert batched[2]["metadata"]["spacy_available"] is True
+        assert [self._without_timing(r) for r in batched] == \
+               [self._without_timing(r) for r in single]
+
+
+class TestAutismMetrics:
+    """Test cases for the array-based pronoun/determiner/anaphora counts"""
+    
+    def test_counts_from_tagged_doc(self):
+        """Counts agree with the token-by-token definition on a tagged Doc"""
+        spacy = pytest.importorskip("spacy")
+        from spacy.tokens import Doc
+        
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        doc = nlp(Doc(
+            nlp.vocab,
+            words=["He", "saw", "that", "cat", ",", "this", "one", "and", "it", "."],
+            pos=["PRON", "VERB", "DET", "NOUN", "PUNCT", "DET", "NUM", "CCONJ", "PRON", "PUNCT"],
+            deps=["nsubj", "ROOT", "obj", "obj", "punct", "det", "obj", "cc", "conj", "punct"],
+            heads=[1, 1, 1, 1, 1, 6, 1, 8, 1, 1],
+            morphs=["Case=Nom|Number=Sing|Person=3", "", "PronType=Dem", "", "",
+                    "PronType=Dem", "", "", "PronType=Prs", ""],
+        ))
+        analyzer = TextAnalyzer()
+        
+        metrics = analyzer._compute_autism_metrics(doc)
+        
+        # "He" (has Person) and "that" (demonstrative, not a det) are anaphoric;
+        # "this" is attached as det and "it" carries no Person/Number/Case
+        assert metrics["content_token_count"] == 8
+        assert metrics["pronoun_density"] == 2 / 8
+        assert metrics["determiner_density"] == 2 / 8
+        assert metrics["anaphora_density"] == 2 / 8
+        # Sentences come from the shared segmentation, not from the Doc
+        assert "sentence_count" not in metrics
+
+
+class TestTiers:
+    """Test cases for analyze(tier=...)"""
+    
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        analyzer.nlp = None
+        return analyzer
+    
+    def test_fast_tier_far_from_thresholds(self, analyzer):
+        result = analyzer.analyze(SIMPLE_TEXT, tier="fast")
+        
+        assert set(result) == {"flesch_kincaid_grade", "metadata"}
+        assert result["metadata"]["tier"] == "fast"
+        assert result["flesch_kincaid_grade"] < 8.0 - analyzer.config['tiers']['fast_margin']
+        assert set(result["metadata"]["timings_seconds"]) == {"language", "estimate"}
+    
+    def test_fast_tier_escalates_near_threshold(self, analyzer):
+        analyzer.config['tiers']['fast_margin'] = 100.0
+        result = analyzer.analyze(SIMPLE_TEXT, tier="fast")
+        
+        assert result["metadata"]["tier"] == "full"
+        assert result["metadata"]["fast_estimate"] is not None
+        assert result["flesch_kincaid_grade"] == analyzer.analyze(SIMPLE_TEXT)["flesch_kincaid_grade"]
+        assert "type_token_ratio" in result
+    
+    def test_fast_tier_with_complexity_label_profile(self, analyzer):
+        result = analyzer.analyze(SIMPLE_TEXT, profile="complexity_label", tier="fast")
+        assert result["metadata"]["tier"] == "fast"
+    
+    def test_fast_tier_skips_estimate_for_other_metrics(self, analyzer):
+        result = analyzer.analyze(SIMPLE_TEXT, metrics=["type_token_ratio"], tier="fast")
+        
+        assert set(result) == {"type_token_ratio", "metadata"}
+        assert result["metadata"]["tier"] == "full"
+        assert "fast_estimate" not in result["metadata"]
+    
+    def test_full_tier(self, analyzer):
+        result = analyzer.analyze(QUANTUM_TEXT, tier="full")
+        assert result["metadata"]["tier"] == "full"
+        assert "tier" not in analyzer.analyze(QUANTUM_TEXT)["metadata"]
+    
+    def test_request_field(self, analyzer):
+        response = handle_request(analyzer, {"id": 1, "text": SIMPLE_TEXT, "tier": "fast"})
+        assert response["result"]["metadata"]["tier"] == "fast"
+    
+    def test_unknown_tier(self, analyzer):
+        assert analyzer.analyze(SIMPLE_TEXT, tier="turbo") == {"error": "Unknown tier: turbo"}
+
+
+class TestDeadline:
+    """Test cases for analyze(deadline_ms=...)"""
+    
+    @pytest.fixture
+    def analyzer(self):
+        return TextAnalyzer()
+    
+    def test_generous_deadline(self, analyzer):
+        result = analyzer.analyze(QUANTUM_TEXT, deadline_ms=60000)
+        
+        assert result["metadata"]["partial"] is False
+        assert "skipped_families" not in result["metadata"]
+        assert "flesch_kincaid_grade" in result
+    
+    def test_expired_deadline(self, analyzer):
+        result = analyzer.analyze(QUANTUM_TEXT, deadline_ms=0)
+        
+        metadata = result["metadata"]
+        assert metadata["partial"] is True
+        assert metadata["skipped_families"] == list(analyzer._plan(None, None).families)
+        assert metadata["families"] == []
+        # Partial results are not cached
+        assert analyzer.analyze(QUANTUM_TEXT)["metadata"]["cache_hit"] is False
+    
+    def test_slow_input_is_skipped(self, analyzer):
+        analyzer.nlp = None
+        analyzer._input_rates["doc"] = 1.0  # a second per character
+        result = analyzer.analyze(QUANTUM_TEXT, deadline_ms=60000)
+        
+        assert result["metadata"]["skipped_families"] == ["autism"]
+        assert "flesch_kincaid_grade" in result and "type_token_ratio" in result
+    
+    def test_rates_are_learned(self, analyzer):
+        analyzer.analyze(QUANTUM_TEXT, deadline_ms=60000)
+        assert analyzer._input_rates["counts"] > 0
+    
+    def test_invalid_deadline(self, analyzer):
+        assert analyzer.analyze(SIMPLE_TEXT, deadline_ms="soon") == \
+            {"error": "deadline_ms must be a number"}
+
+
+class TestServeMode:
+    """Test cases for the JSON-lines worker mode"""
+    
+    @pytest.fixture
+    def analyzer(self):
+        """One analyzer shared by all requests, as in a real worker"""
+        return TextAnalyzer()
+    
+    def test_responses_keep_request_ids(self, analyzer):
+        """Each request gets one response line carrying its id, in order"""
+        requests = [
+            {"id": "a", "text": SIMPLE_TEXT},
+            {"id": 2, "text": QUANTUM_TEXT},
+        ]
+        stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests))
+        stdout = io.StringIO()
+        
+        assert serve(analyzer, stdin, stdout) == 2
+        
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert [r["id"] for r in responses] == ["a", 2]
+        expected = analyzer.analyze(SIMPLE_TEXT)
+        assert responses[0]["result"]["flesch_kincaid_grade"] == expected["flesch_kincaid_grade"]
+        assert "flesch_kincaid_grade" in responses[1]["result"]
+    
+    def test_bad_lines_do_not_stop_the_worker(self, analyzer):
+        """Malformed or empty requests produce errors, later ones still run"""
+        stdin = io.StringIO('not json\n\n{"id": 1}\n{"id": 2, "text": "Hi there. Bye now."}\n')
+        stdout = io.StringIO()
+        
+        assert serve(analyzer, stdin, stdout) == 3
+        
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert "error" in responses[0]["result"]
+        assert responses[1] == {"id": 1, "result": {"error": "No text provided"}}
+        assert "error" not in responses[2]["result"]
+
+
 # Run tests if executed directly
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the analyzer caches
+"""
+
+import pytest
+from caching import ResultCache, WordCache
+from text_analyzer import TextAnalyzer
+
+pytest.importorskip("textstat")
+
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+
+
+class TestWordCache:
+    """Test cases for the per-word syllable/difficulty cache"""
+
+    def test_lru_eviction(self):
+        cache = WordCache(maxsize=2)
+        cache.lookup("cat")
+        cache.lookup("dog")
+        cache.lookup("cat")      # cat becomes most recent
+        cache.lookup("bird")     # evicts dog
+
+        assert len(cache) == 2
+        assert cache.counters() == {"hits": 1, "misses": 3, "size": 2}
+        cache.lookup("dog")
+        assert cache.misses == 4
+
+    def test_entries(self):
+        cache = WordCache()
+        syllables, is_difficult, letters = cache.lookup("photosynthesis")
+        assert syllables >= 4 and is_difficult and letters == 14
+        assert cache.lookup("the")[1] is False
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "words.tsv.gz")
+        cache = WordCache(path=path)
+        for word in ("river", "evaporation", "it's"):
+            cache.lookup(word)
+        assert cache.save()
+
+        warm = WordCache(path=path)
+        assert len(warm) == 3
+        assert warm.lookup("evaporation") == cache.lookup("evaporation")
+        assert warm.misses == 0
+
+    def test_stale_file_is_ignored(self, tmp_path):
+        path = tmp_path / "words.tsv.gz"
+        path.write_bytes(b"not a cache file")
+        assert len(WordCache(path=str(path))) == 0
+
+
+def test_counters_in_metadata():
+    """Repeated vocabulary turns into cache hits, reported per analysis"""
+    analyzer = TextAnalyzer()
+    reordered = "It was a sunny day. The cat sat on the mat. The cat enjoyed the warmth."
+    first = analyzer.analyze(SIMPLE_TEXT)["metadata"]["word_cache"]
+    second = analyzer.analyze(reordered)["metadata"]["word_cache"]
+
+    assert first["misses"] > 0
+    assert second["misses"] == 0
+    assert second["hits"] == first["hits"] + first["misses"]
+
+
+class TestResultCache:
+    """Test cases for the content-addressed result cache"""
+
+    def test_hit_skips_analysis(self, monkeypatch):
+        analyzer = TextAnalyzer()
+        first = analyzer.analyze(SIMPLE_TEXT)
+        assert first["metadata"]["cache_hit"] is False
+
+        # A hit must not touch the counting pass (or spaCy) at all
+        monkeypatch.setattr(analyzer, "_count_text", None)
+        second = analyzer.analyze(SIMPLE_TEXT)
+        assert second["metadata"]["cache_hit"] is True
+        assert second["metadata"]["cache_tier"] == "memory"
+        assert second["flesch_kincaid_grade"] == first["flesch_kincaid_grade"]
+
+    def test_hits_are_copies(self):
+        analyzer = TextAnalyzer()
+        analyzer.analyze(SIMPLE_TEXT)
+        analyzer.analyze(SIMPLE_TEXT)["word_count"] = -1
+        assert analyzer.analyze(SIMPLE_TEXT)["word_count"] > 0
+
+    def test_key_depends_on_settings(self):
+        context = {"max_text_length": 100000, "language": "en"}
+        assert ResultCache.key("text", context) == ResultCache.key("text", dict(context))
+        assert ResultCache.key("text", context) != ResultCache.key("text ", context)
+        assert ResultCache.key("text", context) != \
+            ResultCache.key("text", {**context, "max_text_length": 50000})
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "results.sqlite")
+        ResultCache(path=path).put("k", {"word_count": 3, "metadata": {}})
+
+        fresh = ResultCache(maxsize=0, path=path)
+        result, tier = fresh.get("k")
+        assert result == {"word_count": 3, "metadata": {}}
+        assert tier == "disk"
+
+    def test_disk_tier_evicts_least_recently_used(self, tmp_path):
+        cache = ResultCache(maxsize=0, path=str(tmp_path / "results.sqlite"), max_bytes=100)
+        payload = {"text": "x" * 30}
+        cache.put("a", payload)
+        cache.put("b", payload)
+        cache.get("a")               # a is now more recent than b
+        cache.put("c", payload)      # over budget: b goes
+
+        assert cache.get("a")[0] == payload
+        assert cache.get("b") == (None, None)
+        assert cache.get("c")[0] == payload
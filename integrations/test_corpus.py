@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk corpus analysis (text_analyzer.py batch)
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+import corpus
+from corpus import completed_ids, iter_corpus, run_batch
+from text_analyzer import TextAnalyzer
+
+TEXTS_JSON = Path(__file__).resolve().parent.parent / "tests" / "texts.json"
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def jsonl_corpus(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    records = [
+        {"id": "a", "text": "The cat sat on the mat. It was a sunny day."},
+        {"id": "b", "content": "Dogs bark. Birds sing in the morning."},
+        {"id": "c", "text": ""},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return str(path)
+
+
+def test_texts_json_is_streamed(monkeypatch):
+    """The {"texts": [...]} shape is parsed in small pieces, not loaded whole"""
+    monkeypatch.setattr(corpus, "READ_CHUNK_SIZE", 37)
+    records = list(iter_corpus(str(TEXTS_JSON)))
+
+    expected = json.loads(TEXTS_JSON.read_text(encoding="utf-8"))["texts"]
+    assert records == [(t["id"], t["content"]) for t in expected]
+
+
+class ReadSpy:
+    """File wrapper recording how much each read asks for"""
+
+    def __init__(self, f, sizes):
+        self._f = f
+        self._sizes = sizes
+
+    def read(self, size=-1):
+        self._sizes.append(size)
+        return self._f.read(size)
+
+    def readline(self, size=-1):
+        self._sizes.append(size)
+        return self._f.readline(size)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+def test_one_line_texts_json_is_sniffed_from_a_prefix(tmp_path, monkeypatch):
+    """A json.dump'ed {"texts": [...]} file is one line; detection reads one chunk of it"""
+    path = tmp_path / "corpus.json"
+    texts = [{"id": i, "content": f"Text number {i}."} for i in range(200)]
+    path.write_text(json.dumps({"texts": texts}), encoding="utf-8")
+    monkeypatch.setattr(corpus, "READ_CHUNK_SIZE", 64)
+    sizes = []
+    monkeypatch.setattr(corpus, "open", lambda *a, **k: ReadSpy(open(*a, **k), sizes),
+                        raising=False)
+
+    records = list(iter_corpus(str(path)))
+    assert records == [(t["id"], t["content"]) for t in texts]
+    assert sizes and all(0 < size <= 64 for size in sizes)
+
+
+def test_large_texts_item_is_read_in_growing_pieces(tmp_path, monkeypatch):
+    """A whole-textbook item is decoded a few times, not once per chunk"""
+    path = tmp_path / "corpus.json"
+    texts = [{"id": "book", "content": "Word " * 1000000}, {"id": "short", "content": "Hi."}]
+    path.write_text(json.dumps({"texts": texts}), encoding="utf-8")
+    sizes = []
+    monkeypatch.setattr(corpus, "open", lambda *a, **k: ReadSpy(open(*a, **k), sizes),
+                        raising=False)
+
+    records = list(iter_corpus(str(path)))
+    assert records == [(t["id"], t["content"]) for t in texts]
+    assert len(sizes) < 20
+
+
+def test_jsonl_with_first_record_longer_than_the_prefix(tmp_path, monkeypatch):
+    path = tmp_path / "corpus.txt"
+    records = [{"id": "long", "text": "Word " * 100}, {"id": "short", "text": "Hi."}]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    monkeypatch.setattr(corpus, "READ_CHUNK_SIZE", 64)
+    assert [record_id for record_id, _ in iter_corpus(str(path))] == ["long", "short"]
+
+
+def test_jsonl_records(jsonl_corpus):
+    assert [record_id for record_id, _ in iter_corpus(jsonl_corpus)] == ["a", "b", "c"]
+
+
+def test_batch_writes_results_by_id(jsonl_corpus, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    summary = run_batch(TextAnalyzer(), jsonl_corpus, output)
+
+    lines = read_jsonl(output)
+    assert [line["id"] for line in lines] == ["a", "b", "c"]
+    assert "flesch_kincaid_grade" in lines[0]["result"]
+    assert lines[2]["result"] == {"error": "Empty text provided"}
+    assert summary["analyzed"] == 3 and summary["errors"] == 1
+
+
+def test_resume_skips_done_and_drops_partial_line(jsonl_corpus, tmp_path):
+    """An interrupted output (cut mid-line) is completed, not duplicated"""
+    output = tmp_path / "out.jsonl"
+    run_batch(TextAnalyzer(), jsonl_corpus, str(output))
+    full = output.read_text(encoding="utf-8")
+    first_line_end = full.index("\n") + 1
+    output.write_text(full[:first_line_end + 20], encoding="utf-8")
+
+    assert completed_ids(str(output)) == {"a"}
+    summary = run_batch(TextAnalyzer(), jsonl_corpus, str(output))
+
+    assert summary["skipped"] == 1 and summary["analyzed"] == 2
+    assert [line["id"] for line in read_jsonl(output)] == ["a", "b", "c"]
+
+
+def test_processes_keep_input_order(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    run_batch(TextAnalyzer(), str(TEXTS_JSON), output, processes=2, batch_size=7)
+
+    ids = [line["id"] for line in read_jsonl(output)]
+    assert ids == [f"text_{i:04d}" for i in range(1, 101)]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy optional imports and the startup path
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from dependencies import available, import_times, optional_import
+
+HERE = str(Path(__file__).parent)
+SCRIPT = str(Path(__file__).with_name("text_analyzer.py"))
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+HEAVY = ("spacy", "numpy", "textstat", "tomli")
+
+
+def loaded_after(code):
+    """Heavy modules imported by running code in a fresh interpreter"""
+    output = subprocess.check_output(
+        [sys.executable, "-c", f"import sys\n{code}\n"
+                               f"print([m for m in {HEAVY!r} if m in sys.modules])"],
+        cwd=HERE, text=True)
+    return json.loads(output.strip().splitlines()[-1].replace("'", '"'))
+
+
+class TestOptionalImport:
+    """Test cases for optional_import and available"""
+
+    def test_missing_module(self):
+        assert optional_import("no_such_module_here") is None
+        assert available("no_such_module_here") is False
+
+    def test_imports_once(self):
+        assert optional_import("json") is json
+        assert optional_import("json") is optional_import("json")
+
+    def test_available_does_not_import(self):
+        assert loaded_after("from dependencies import available\navailable('spacy')") == []
+
+
+class TestStartup:
+    """Cold-start regressions: heavy dependencies stay out of the startup path"""
+
+    def test_import_is_light(self):
+        assert loaded_after("import text_analyzer") == []
+
+    def test_fast_start_never_loads_spacy(self):
+        loaded = loaded_after("from text_analyzer import TextAnalyzer\n"
+                              f"TextAnalyzer(fast_start=True).analyze({SIMPLE_TEXT!r})")
+        assert "spacy" not in loaded
+
+    def test_fast_start_is_readability_only(self):
+        pytest.importorskip("textstat")
+        from text_analyzer import TextAnalyzer
+        result = TextAnalyzer(fast_start=True).analyze(SIMPLE_TEXT)
+
+        assert result["metadata"]["families"] == ["readability"]
+        assert result["metadata"]["spacy_available"] is False
+        assert "flesch_kincaid_grade" in result
+
+    def test_fast_start_cli(self):
+        output = subprocess.run([sys.executable, SCRIPT, "--fast-start"], input=json.dumps({"text": SIMPLE_TEXT}),
+                                capture_output=True, text=True).stdout
+        assert json.loads(output)["metadata"]["families"] == ["readability"]
+
+    def test_import_times(self):
+        times = import_times(["json", "no_such_module_here"], repeat=1)
+
+        assert times["json"] >= 0
+        assert times["no_such_module_here"] is None
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Conformance tests for the length-prefixed framing protocol
+
+The golden vectors below are the byte-exact frames any client (including the
+C++ agent) must produce and accept.
+"""
+
+import io
+import socket
+import threading
+
+import pytest
+from framing import (
+    AnalyzerClient, FramingError, MAX_FRAME_SIZE,
+    encode_frame, read_frame, serve_framed, write_frame,
+)
+from text_analyzer import TextAnalyzer
+
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+
+# (message, exact JSON frame bytes)
+GOLDEN_JSON_FRAMES = [
+    ({"id": 1, "text": "Hi."},
+     b'\x00\x00\x00\x15{"id":1,"text":"Hi."}'),
+    ({"id": "x", "text": "Привет"},
+     b'\x00\x00\x00\x20' + '{"id":"x","text":"Привет"}'.encode("utf-8")),
+    ({"id": None, "result": {"error": "No text provided"}},
+     b'\x00\x00\x00\x31{"id":null,"result":{"error":"No text provided"}}'),
+]
+
+
+class TestFrameCodec:
+    """Byte-level conformance of frame encoding and decoding"""
+
+    @pytest.mark.parametrize("message,frame", GOLDEN_JSON_FRAMES)
+    def test_golden_frames_encode(self, message, frame):
+        """Encoding matches the golden bytes exactly"""
+        assert encode_frame(message) == frame
+
+    @pytest.mark.parametrize("message,frame", GOLDEN_JSON_FRAMES)
+    def test_golden_frames_decode(self, message, frame):
+        """Decoding the golden bytes returns the message, then clean EOF"""
+        stream = io.BytesIO(frame)
+        assert read_frame(stream) == message
+        assert read_frame(stream) is None
+
+    def test_back_to_back_frames(self):
+        """Frames carry no delimiter, only the length separates them"""
+        stream = io.BytesIO(b"".join(frame for _, frame in GOLDEN_JSON_FRAMES))
+        decoded = [read_frame(stream) for _ in GOLDEN_JSON_FRAMES]
+        assert decoded == [message for message, _ in GOLDEN_JSON_FRAMES]
+
+    def test_truncated_header(self):
+        with pytest.raises(FramingError):
+            read_frame(io.BytesIO(b"\x00\x00"))
+
+    def test_truncated_payload(self):
+        with pytest.raises(FramingError):
+            read_frame(io.BytesIO(b"\x00\x00\x00\x10{}"))
+
+    def test_empty_frame_rejected(self):
+        with pytest.raises(FramingError):
+            read_frame(io.BytesIO(b"\x00\x00\x00\x00"))
+
+    def test_oversized_frame_rejected(self):
+        """The length is checked before any payload is read"""
+        header = (MAX_FRAME_SIZE + 1).to_bytes(4, "big")
+        with pytest.raises(FramingError):
+            read_frame(io.BytesIO(header))
+
+    def test_invalid_json_payload(self):
+        with pytest.raises(FramingError):
+            read_frame(io.BytesIO(b"\x00\x00\x00\x03{x}"))
+
+    def test_msgpack_round_trip(self):
+        pytest.importorskip("msgpack")
+        stream = io.BytesIO()
+        write_frame(stream, {"id": 7, "text": "Привет"}, codec="msgpack")
+        stream.seek(0)
+        assert read_frame(stream, codec="msgpack") == {"id": 7, "text": "Привет"}
+
+
+class TestFramedServer:
+    """Request/response conformance of a server over a socketpair"""
+
+    @pytest.fixture
+    def connection(self):
+        """Client streams connected to serve_framed running in a thread"""
+        client_sock, server_sock = socket.socketpair()
+        analyzer = TextAnalyzer()
+
+        def run_server():
+            # Hang up when the session ends, as an exiting process would
+            serve_framed(analyzer, server_sock.makefile("rb"), server_sock.makefile("wb"))
+            try:
+                server_sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        thread = threading.Thread(target=run_server, daemon=True)
+        thread.start()
+
+        client_r = client_sock.makefile("rb")
+        client_w = client_sock.makefile("wb")
+        yield client_r, client_w, client_sock
+
+        try:
+            client_sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        thread.join(timeout=5)
+        client_sock.close()
+        server_sock.close()
+
+    def test_many_requests_in_order(self, connection):
+        """Responses come back in request order with matching ids"""
+        rfile, wfile, _ = connection
+        client = AnalyzerClient(rfile, wfile)
+        results = [client.analyze(SIMPLE_TEXT) for _ in range(3)]
+        assert all("flesch_kincaid_grade" in r for r in results)
+
+    def test_missing_text_is_an_error_response(self, connection):
+        rfile, wfile, _ = connection
+        write_frame(wfile, {"id": "empty"})
+        assert read_frame(rfile) == {"id": "empty", "result": {"error": "No text provided"}}
+
+    def test_protocol_error_closes_session(self, connection):
+        """A malformed frame gets one error response, then EOF"""
+        rfile, wfile, _ = connection
+        wfile.write(b"\x00\x00\x00\x03{x}")
+        wfile.flush()
+        response = read_frame(rfile)
+        assert response["id"] is None
+        assert "Protocol error" in response["result"]["error"]
+        assert read_frame(rfile) is None
+
+    def test_half_close_ends_session(self, connection):
+        """Closing the write side is a clean EOF for the server"""
+        rfile, wfile, sock = connection
+        write_frame(wfile, {"id": 1, "text": SIMPLE_TEXT})
+        sock.shutdown(socket.SHUT_WR)
+        assert read_frame(rfile)["id"] == 1
+        assert read_frame(rfile) is None
+
+
+def test_spawned_process_client():
+    """End to end: a real `text_analyzer.py --framed` child process"""
+    with AnalyzerClient.spawn() as client:
+        first = client.analyze(SIMPLE_TEXT)
+        second = client.analyze("")
+    assert "flesch_kincaid_grade" in first
+    assert second == {"error": "No text provided"}
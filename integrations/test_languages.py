@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for character trigram language detection and routing
+"""
+
+import pytest
+from languages import PROFILES, build_profile, detect_language, trigrams
+from text_analyzer import TextAnalyzer
+
+ENGLISH = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+RUSSIAN = "Кошка сидела на коврике. Был солнечный день. Кошка грелась на солнце."
+
+
+class TestDetection:
+    """Test cases for detect_language"""
+
+    @pytest.mark.parametrize("text, language", [
+        (ENGLISH, "en"),
+        (RUSSIAN, "ru"),
+        ("I think so too", "en"),
+        ("Я тоже так думаю", "ru"),
+        ("# Урок 2\n\n- Прочитайте текст.\n- Ответьте на вопросы.", "ru"),
+    ])
+    def test_detects(self, text, language):
+        detected, confidence = detect_language(text)
+        assert detected == language
+        assert 0.5 < confidence <= 1.0
+
+    @pytest.mark.parametrize("text", ["", "Hi", "12345 !!! 678"])
+    def test_too_short_to_tell(self, text):
+        assert detect_language(text) == (None, 0.0)
+
+    def test_candidates(self):
+        assert detect_language(ENGLISH, candidates=["en"]) == ("en", 1.0)
+        # No English trigram in Russian, and no profile for German
+        assert detect_language(RUSSIAN, candidates=["en"]) == (None, 0.0)
+        assert detect_language(ENGLISH, candidates=["de"]) == (None, 0.0)
+
+    def test_trigrams(self):
+        assert list(trigrams("Hi, you!")) == ["_hi", "hi_", "i_y", "_yo", "you", "ou_"]
+
+    def test_build_profile(self):
+        profile = build_profile(["the the then"], size=3)
+        # Most frequent first, ties in character order
+        assert profile == ["_th", "the", "e_t"]
+        assert all(len(profile) == 300 for profile in PROFILES.values())
+
+
+class TestRouting:
+    """Test cases for requests without a language"""
+
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        analyzer.nlp = None
+        analyzer.pipelines.set("ru", None)
+        return analyzer
+
+    def test_routes_detected_language(self, analyzer):
+        result = analyzer.analyze(RUSSIAN, profile="fast")
+        metadata = result["metadata"]
+
+        assert metadata["language"] == "ru"
+        assert metadata["language_detected"] is True
+        assert metadata["language_confidence"] > 0.5
+        assert "language" in metadata["timings_seconds"]
+
+    def test_explicit_language_is_not_detected(self, analyzer):
+        metadata = analyzer.analyze(RUSSIAN, profile="fast", language="en")["metadata"]
+        assert metadata["language"] == "en"
+        assert "language_detected" not in metadata
+
+    def test_detection_off(self, analyzer):
+        analyzer.config['system']['detect_language'] = False
+        assert analyzer.analyze(RUSSIAN, profile="fast")["metadata"]["language"] == "en"
+
+    def test_undetectable_falls_back_to_default(self, analyzer):
+        metadata = analyzer.analyze("42", profile="fast")["metadata"]
+        assert metadata["language"] == "en"
+        assert metadata["language_detected"] is False
+        assert metadata["language_confidence"] is None
+        assert "language" in metadata["timings_seconds"]
+
+    def test_batch_routes_each_text(self, analyzer):
+        spacy = pytest.importorskip("spacy")
+        for language in ("en", "ru"):
+            nlp = spacy.blank(language)
+            nlp.add_pipe("sentencizer")
+            analyzer.pipelines.set(language, nlp)
+
+        batched = list(analyzer.analyze_many([ENGLISH, RUSSIAN, ENGLISH]))
+
+        assert [result["metadata"]["language"] for result in batched] == ["en", "ru", "en"]
+        single = analyzer.analyze(RUSSIAN)
+        for key, value in batched[1].items():
+            if key != "metadata":
+                assert single[key] == value, key
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the MTLD, HD-D and MATTR lexical diversity measures
+"""
+
+from collections import Counter
+
+import pytest
+from lexical import hdd, mattr, mtld, mtld_factors, window_types, word_ids
+from text_analyzer import TextAnalyzer
+
+
+def naive_mtld_pass(words, threshold=0.72):
+    """Textbook MTLD pass, rebuilding the type set for every factor"""
+    factors, seen, tokens = 0.0, set(), 0
+    for word in words:
+        tokens += 1
+        seen.add(word)
+        if len(seen) / tokens <= threshold:
+            factors, seen, tokens = factors + 1, set(), 0
+    if tokens:
+        factors += (1 - len(seen) / tokens) / (1 - threshold)
+    return len(words) / factors
+
+
+def exact_hdd(words, sample_size=42):
+    """HD-D with the no-occurrence probability as an explicit product"""
+    total = len(words)
+    score = 0.0
+    for frequency in Counter(words).values():
+        absent = 1.0
+        for i in range(sample_size):
+            absent *= (total - frequency - i) / (total - i)
+        score += (1 - absent) / sample_size
+    return score
+
+
+WORDS = ("the cat sat on the mat and the dog sat on the log while a bird "
+         "sang in the tall tree near the old house by the river").split() * 5
+
+
+class TestMeasures:
+    """Test cases for the measures on word id sequences"""
+
+    def test_word_ids(self):
+        ids, index = word_ids(["b", "a", "b", "c"])
+        assert ids == [0, 1, 0, 2]
+        assert index == {"b": 0, "a": 1, "c": 2}
+
+    def test_mtld_matches_textbook_definition(self):
+        ids, _ = word_ids(WORDS)
+        expected = (naive_mtld_pass(WORDS) + naive_mtld_pass(WORDS[::-1])) / 2
+        assert mtld(ids) == pytest.approx(expected)
+
+    def test_mtld_of_repeated_word(self):
+        # "a a" drops the TTR to 0.5: every second word closes a factor
+        assert mtld_factors([0] * 10) == 5
+        assert mtld([0] * 10) == 2
+
+    def test_hdd_matches_exact_probabilities(self):
+        assert hdd(Counter(WORDS).values()) == pytest.approx(exact_hdd(WORDS))
+
+    def test_hdd_of_short_text(self):
+        assert hdd([1] * 10) == 0.0
+
+    def test_window_types_match_sets(self):
+        ids, _ = word_ids(WORDS)
+        expected = [len(set(ids[i:i + 7])) for i in range(len(ids) - 6)]
+        assert list(window_types(ids, 7)) == expected
+        assert mattr(ids, 7) == pytest.approx(sum(expected) / (7 * len(expected)))
+
+    def test_mattr_of_short_text_is_ttr(self):
+        assert list(window_types([0, 1, 0], 50)) == [2]
+        assert mattr([0, 1, 0], 50) == pytest.approx(2 / 3)
+
+
+class TestAnalyzerLexicalMetrics:
+    """Test cases for the [lexical] thresholds in TextAnalyzer"""
+
+    @pytest.fixture
+    def analyzer(self):
+        return TextAnalyzer()
+
+    def test_thresholds(self, analyzer):
+        short = analyzer._compute_lexical_metrics(" ".join(WORDS[:49]))
+        medium = analyzer._compute_lexical_metrics(" ".join(WORDS[:60]))
+        long = analyzer._compute_lexical_metrics(" ".join(WORDS))
+
+        assert "mtld" not in short and "hdd" not in short
+        assert "mtld" in medium and "hdd" not in medium
+        assert long["mtld"] > 0
+        assert long["hdd"] == pytest.approx(exact_hdd(WORDS))
+
+    def test_mattr_and_series(self, analyzer):
+        analyzer.config['lexical']['mattr_series_step'] = 10
+        ids, _ = word_ids(WORDS)
+        result = analyzer._compute_lexical_metrics(" ".join(WORDS))
+
+        assert result["mattr"] == pytest.approx(mattr(ids, 50))
+        series = result["mattr_series"]
+        assert (series["window"], series["step"]) == (50, 10)
+        assert series["values"][1] == len(set(ids[10:60])) / 50
+        assert len(series["values"]) == len(range(0, len(ids) - 49, 10))
+
+    def test_series_off_by_default(self, analyzer):
+        result = analyzer._compute_lexical_metrics(" ".join(WORDS))
+        assert "mattr" in result and "mattr_series" not in result
+
+    def test_configured_thresholds(self, analyzer):
+        analyzer.config['lexical']['min_words_for_mtld'] = 200
+        result = analyzer._compute_lexical_metrics(" ".join(WORDS))
+        assert "mtld" not in result
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for native syllable counts and easy-word lists
+"""
+
+import pytest
+from lexicons import (EASY_WORDS_SIZE, LEXICONS, build_word_list, load_word_list,
+                      ranked_stems, russian_stem)
+from readability import FRE_CONSTANTS, TextCounts, estimate_flesch_kincaid_grade
+from text_analyzer import TextAnalyzer
+
+RUSSIAN = ("Мама мыла раму. Ребёнок читает интересную книгу в школьной библиотеке. "
+           "Погода сегодня хорошая, и мы пойдём гулять в парк.")
+
+
+class TestRussianLexicon:
+    """Test cases for the Russian Lexicon"""
+
+    @pytest.mark.parametrize("word, syllables", [
+        ("мама", 2), ("библиотеке", 5), ("хорошая", 4), ("ребёнок", 3),
+        ("в", 0), ("парк", 1), ("кто-то", 2),
+    ])
+    def test_syllables_are_vowels(self, word, syllables):
+        assert LEXICONS["ru"].syllables(word) == syllables
+
+    def test_difficult_words(self):
+        lexicon = LEXICONS["ru"]
+        assert lexicon.word_info("мама") == (2, False, 4)
+        assert lexicon.word_info("суперпозиция") == (6, True, 12)
+        # "ё" and "е" are the same letter for the list
+        assert not lexicon.word_info("ребёнок")[1]
+        assert not lexicon.word_info("ребенок")[1]
+
+    @pytest.mark.parametrize("word", ["урок", "уроки", "уроков", "дворе", "играли", "ждали"])
+    def test_inflections_of_frequent_words_are_easy(self, word):
+        assert LEXICONS["ru"].is_easy(word)
+
+    def test_words_of_other_scripts_go_to_the_fallback(self):
+        lexicon = LEXICONS["ru"]
+        assert lexicon.word_info("iphone", lambda word: (9, False, 9)) == (9, False, 9)
+        assert lexicon.word_info("2024", lambda word: (1, True, 4)) == (1, True, 4)
+
+    def test_word_list(self):
+        easy = LEXICONS["ru"].easy_words
+        assert isinstance(easy, frozenset)
+        assert len(easy) == EASY_WORDS_SIZE
+        assert "ё" not in "".join(easy)
+        assert easy == load_word_list(LEXICONS["ru"].word_list)
+
+    def test_build_word_list(self):
+        texts = ["Кот и пёс. Кот спит, пёс-барбос лает в 2024 году.", "Кот, пёс!"]
+        assert build_word_list(texts, size=3) == ["кот", "пёс", "в"]
+        assert build_word_list(["Коты кот котов и пёс"], size=2, stem=russian_stem) == ["кот", "и"]
+
+    def test_ranked_stems(self):
+        assert ranked_stems(["урок", "и", "уроки", "уроков", "дом"], 2, russian_stem) == ["урок", "и"]
+
+
+class TestRussianStem:
+    """Test cases for the Russian Snowball stemmer"""
+
+    @pytest.mark.parametrize("word, stem", [
+        ("уроков", "урок"), ("уроками", "урок"), ("играли", "игра"), ("ждали", "ждал"),
+        ("следующая", "след"), ("красивейший", "красив"), ("длинный", "длин"),
+        ("ёлка", "елк"), ("прочитавшись", "прочита"), ("радость", "радост"), ("вероятность", "вероятн"), ("в", "в"),
+    ])
+    def test_stems(self, word, stem):
+        assert russian_stem(word) == stem
+
+    def test_matches_nltk(self):
+        snowball = pytest.importorskip("nltk.stem.snowball")
+        stemmer = snowball.RussianStemmer()
+        words = RUSSIAN.lower().replace("ё", "е").replace(".", "").replace(",", "").split()
+        words += ["библиотеками", "читающими", "интереснейшая", "говорившись", "учителями"]
+        assert [russian_stem(w) for w in words] == [stemmer.stem(w) for w in words]
+
+
+class TestRussianReadability:
+    """Test cases for readability counts in Russian"""
+
+    def test_counts(self):
+        counts = TextCounts.from_text(RUSSIAN, LEXICONS["ru"].word_info, language="ru")
+        assert counts.word_count == 19
+        assert counts.syllable_count == 43
+        assert counts.polysyllable_count == 7
+        assert set(counts.hard_words) == {"мыла", "раму", "школьной", "гулять"}
+        assert counts.difficult_word_count() == 4
+
+    def test_simple_text_is_easy(self):
+        text = ("Мальчик пошёл в школу. Он взял с собой книгу. Дети играли во дворе "
+                "и ждали урока. После уроков мальчик пошёл домой.")
+        counts = TextCounts.from_text(text, LEXICONS["ru"].word_info, language="ru")
+        assert counts.difficult_word_count(0) == 0
+        assert counts.dale_chall_readability_score() < 5
+
+    def test_flesch_reading_ease_uses_russian_constants(self):
+        counts = TextCounts.from_text(RUSSIAN, LEXICONS["ru"].word_info, language="ru")
+        ru = FRE_CONSTANTS["ru"]
+        expected = (ru["base"] - ru["sentence_length"] * counts.avg_sentence_length()
+                    - ru["syll_per_word"] * counts.avg_syllables_per_word())
+        assert counts.flesch_reading_ease() == pytest.approx(expected, abs=0.01)
+        assert counts.flesch_reading_ease("en") != counts.flesch_reading_ease()
+
+    def test_estimate_counts_russian_vowels(self):
+        exact = TextCounts.from_text(RUSSIAN, LEXICONS["ru"].word_info,
+                                     language="ru").flesch_kincaid_grade()
+        estimate = estimate_flesch_kincaid_grade(RUSSIAN, vowels=LEXICONS["ru"].vowels)
+        assert estimate == exact
+        assert estimate_flesch_kincaid_grade(RUSSIAN) != exact
+
+
+class TestAnalyzer:
+    """Test cases for the analyzer in Russian"""
+
+    @pytest.fixture
+    def analyzer(self):
+        pytest.importorskip("textstat")
+        analyzer = TextAnalyzer()
+        analyzer.nlp = None
+        return analyzer
+
+    def test_russian_text_gets_native_counts(self, analyzer):
+        result = analyzer.analyze(RUSSIAN, language="ru")
+        assert result["syllable_count"] == 43
+        assert result["difficult_word_count"] == 4
+        assert result["metadata"]["language"] == "ru"
+
+    def test_detected_russian_is_counted_natively(self, analyzer):
+        assert analyzer.analyze(RUSSIAN)["syllable_count"] == 43
+
+    def test_russian_words_skip_the_word_cache(self, analyzer):
+        analyzer.analyze(RUSSIAN, language="ru")
+        assert len(analyzer.word_cache) == 0
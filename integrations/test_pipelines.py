@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Tests for trimmed pipeline snapshots (prepare-model)
+"""
+
+import json
+
+import pytest
+from framing import handle_request
+from pipelines import (FINGERPRINT_FILE, PipelineRegistry, is_current, load_pipeline,
+                       pipeline_bytes, prepare_model, snapshot_path)
+from text_analyzer import TextAnalyzer
+
+spacy = pytest.importorskip("spacy")
+
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+
+
+def build_model(path, version="1.0.0"):
+    """
+    A small trained-from-nothing model laid out like en_core_web_sm (POS
+    mapped from tags by an attribute_ruler), plus a component the metrics
+    do not need
+    """
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("tagger").add_label("NN")
+    ruler = nlp.add_pipe("attribute_ruler")
+    nlp.add_pipe("entity_ruler")
+    nlp.initialize()
+    # initialize() resets the ruler's patterns
+    ruler.add(patterns=[[{"TAG": "NN"}]], attrs={"POS": "NOUN"})
+    nlp.meta.update(name="test_model", version=version)
+    nlp.to_disk(path)
+    return str(path)
+
+
+@pytest.fixture
+def model(tmp_path):
+    return build_model(tmp_path / "test_model")
+
+
+class TestSnapshots:
+    """Test cases for writing and loading snapshots"""
+
+    def test_prepare_trims(self, model, tmp_path):
+        prepared = prepare_model(model, str(tmp_path / "snapshots"))
+
+        assert prepared["components"] == ["tok2vec", "tagger", "attribute_ruler", "sentencizer"]
+        assert prepared["source_version"] == "1.0.0"
+        assert is_current(snapshot_path(model, str(tmp_path / "snapshots")), model)
+
+    def test_trimmed_pipeline_keeps_pos(self, model, tmp_path):
+        """Without the attribute_ruler an English pipeline has tags but no POS"""
+        prepare_model(model, str(tmp_path / "snapshots"))
+        nlp = load_pipeline(model, str(tmp_path / "snapshots"))
+        assert [token.pos_ for token in nlp("cat mat")] == ["NOUN", "NOUN"]
+
+    def test_loads_current_snapshot(self, model, tmp_path):
+        snapshots = str(tmp_path / "snapshots")
+        prepare_model(model, snapshots)
+        # A marker that only the snapshot carries
+        meta_path = snapshot_path(model, snapshots) / "meta.json"
+        meta = json.loads(meta_path.read_text())
+        meta_path.write_text(json.dumps(dict(meta, description="snapshot")))
+
+        nlp = load_pipeline(model, snapshots)
+        assert nlp.meta["description"] == "snapshot"
+        assert nlp.pipe_names == ["tok2vec", "tagger", "attribute_ruler", "sentencizer"]
+
+    def test_stale_snapshot_falls_back_to_source(self, model, tmp_path):
+        snapshots = str(tmp_path / "snapshots")
+        prepare_model(model, snapshots)
+        build_model(model, version="2.0.0")
+
+        assert not is_current(snapshot_path(model, snapshots), model)
+        nlp = load_pipeline(model, snapshots)
+        assert nlp.meta["version"] == "2.0.0"
+        assert nlp.pipe_names == ["tok2vec", "tagger", "attribute_ruler", "sentencizer"]
+
+    def test_other_spacy_version_is_stale(self, model, tmp_path):
+        snapshots = str(tmp_path / "snapshots")
+        path = snapshot_path(model, snapshots)
+        prepare_model(model, snapshots)
+        recorded = json.loads((path / FINGERPRINT_FILE).read_text())
+        (path / FINGERPRINT_FILE).write_text(json.dumps(dict(recorded, spacy_version="0.0")))
+
+        assert not is_current(path, model)
+
+    def test_snapshot_trimmed_differently_is_stale(self, model, tmp_path):
+        snapshots = str(tmp_path / "snapshots")
+        path = snapshot_path(model, snapshots)
+        prepare_model(model, snapshots)
+        recorded = json.loads((path / FINGERPRINT_FILE).read_text())
+        (path / FINGERPRINT_FILE).write_text(json.dumps(dict(recorded, keep=["tok2vec"])))
+
+        assert not is_current(path, model)
+
+
+class TestAnalyzerModels:
+    """Test cases for TextAnalyzer.prepare_models and snapshot loading"""
+
+    @pytest.fixture
+    def config_path(self, model, tmp_path):
+        path = tmp_path / "config.toml"
+        path.write_text(f'[languages]\nen = "{model}"\nru = "no_such_model"\n'
+                        f'[models]\nsnapshot_dir = "{tmp_path / "snapshots"}"\n')
+        return str(path)
+
+    def test_prepare_models(self, config_path):
+        prepared = TextAnalyzer(config_path).prepare_models()
+
+        assert prepared["en"]["components"] == ["tok2vec", "tagger", "attribute_ruler", "sentencizer"]
+        assert "error" in prepared["ru"]
+
+    def test_analyzer_loads_trimmed_pipeline(self, config_path):
+        TextAnalyzer(config_path).prepare_models(["en"])
+        analyzer = TextAnalyzer(config_path)
+
+        assert analyzer.nlp.pipe_names == ["tok2vec", "tagger", "attribute_ruler", "sentencizer"]
+        assert analyzer.analyze(SIMPLE_TEXT)["metadata"]["spacy_available"] is True
+
+
+class TestPipelineRegistry:
+    """Test cases for lazily loaded pipelines with LRU eviction"""
+
+    @pytest.fixture
+    def registry(self):
+        loads = []
+
+        def loader(name):
+            loads.append(name)
+            if name == "broken":
+                raise OSError("no such model")
+            return spacy.blank(name[:2])
+
+        registry = PipelineRegistry({"en": "en_model", "ru": "ru_model", "de": "de_model",
+                                     "xx": "broken"},
+                                    max_bytes=250, loader=loader, size_of=lambda nlp: 100)
+        registry.loads = loads
+        return registry
+
+    def test_loads_once_on_first_use(self, registry):
+        assert registry.loaded() == []
+        first = registry.get("en")
+        assert registry.get("en") is first
+        assert registry.loads == ["en_model"]
+        assert first.lang == "en"
+
+    def test_evicts_least_recently_used(self, registry):
+        registry.get("en")
+        registry.get("ru")
+        registry.get("en")
+        registry.get("de")
+
+        assert registry.loaded() == ["en", "de"]
+        assert registry.evictions == 1
+        assert registry.total_bytes == 200
+
+        # An evicted language is loaded again when asked for
+        registry.get("ru")
+        assert registry.loads == ["en_model", "ru_model", "de_model", "ru_model"]
+
+    def test_failed_load_is_not_retried(self, registry):
+        assert registry.get("xx") is None
+        assert registry.get("xx") is None
+        assert registry.loads == ["broken"]
+        assert registry.available("xx") is False
+
+    def test_unknown_language(self, registry):
+        assert registry.get("fr") is None
+        assert registry.loads == []
+
+    def test_no_cap_skips_sizes(self):
+        sizes = []
+        registry = PipelineRegistry({"en": "en_model"}, loader=lambda name: spacy.blank("en"),
+                                    size_of=lambda nlp: sizes.append(nlp) or 100)
+        assert registry.get("en") is not None
+        assert sizes == []
+
+    def test_size_is_read_from_disk(self, model, monkeypatch):
+        nlp = load_pipeline(model, use_snapshot=False)
+        monkeypatch.setattr(nlp, "to_bytes", lambda *a, **k: pytest.fail("serialized"))
+        size = pipeline_bytes(nlp)
+
+        with_excluded = sum(path.stat().st_size for path in nlp.path.rglob("*")
+                            if path.is_file())
+        assert 0 < size < with_excluded
+
+    def test_pinned_pipeline(self, registry):
+        nlp = spacy.blank("en")
+        registry.set("en", nlp)
+        assert registry.get("en") is nlp
+        assert registry.loads == []
+
+
+class TestRequestLanguage:
+    """Test cases for the per-request language parameter"""
+
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        for language in ("en", "ru"):
+            nlp = spacy.blank(language)
+            nlp.add_pipe("sentencizer")
+            analyzer.pipelines.set(language, nlp)
+        return analyzer
+
+    def test_routes_to_language_pipeline(self, analyzer, monkeypatch):
+        parsed = []
+        monkeypatch.setattr(analyzer, "_count_reference",
+                            lambda doc: parsed.append(doc.lang_) or {})
+        analyzer.analyze(SIMPLE_TEXT, language="ru")
+        analyzer.analyze(SIMPLE_TEXT)
+
+        assert parsed == ["ru", "en"]
+
+    def test_metadata_and_cache_key(self, analyzer):
+        english = analyzer.analyze(SIMPLE_TEXT, profile="fast")
+        russian = analyzer.analyze(SIMPLE_TEXT, profile="fast", language="ru")
+
+        assert english["metadata"]["language"] == "en"
+        assert russian["metadata"]["language"] == "ru"
+        assert russian["metadata"]["cache_hit"] is False
+
+    def test_unsupported_language(self, analyzer):
+        assert analyzer.analyze(SIMPLE_TEXT, language="xx") == \
+            {"error": "Unsupported language: xx"}
+
+    @pytest.mark.parametrize("language", [["en"], 5, {"en": 1}])
+    def test_malformed_language_is_an_error(self, analyzer, language):
+        expected = {"error": "language must be a string"}
+        assert analyzer.analyze(SIMPLE_TEXT, language=language) == expected
+        assert analyzer.analyze_stream([SIMPLE_TEXT], language=language) == expected
+        assert list(analyzer.analyze_many([SIMPLE_TEXT], language=language)) == [expected]
+
+    def test_framed_request(self, analyzer):
+        response = handle_request(analyzer, {"id": 1, "text": SIMPLE_TEXT, "language": "ru",
+                                             "profile": "fast"})
+        assert response["result"]["metadata"]["language"] == "ru"
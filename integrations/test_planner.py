@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for metric selection and planning
+"""
+
+import pytest
+from framing import handle_request
+from planner import plan_metrics
+from registry import BUILTIN_METRICS
+from text_analyzer import TextAnalyzer
+
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+
+
+class ForbiddenPipeline:
+    """Stands in for a loaded spaCy pipeline that must not be used"""
+
+    def __call__(self, text):
+        raise AssertionError("spaCy was used")
+
+    def pipe(self, *args, **kwargs):
+        raise AssertionError("spaCy was used")
+
+
+class TestPlanMetrics:
+    """Test cases for resolving selections into plans"""
+
+    def test_default_is_everything(self):
+        plan = plan_metrics()
+        assert set(plan.families) == {metric.name for metric in BUILTIN_METRICS}
+        assert plan.families[-1] == "autism"  # most expensive last
+        assert plan.needs("doc") and plan.needs("counts")
+
+    def test_single_key(self):
+        plan = plan_metrics(["flesch_kincaid_grade"])
+        assert plan.families == ("readability",)
+        assert plan.needs("counts") and not plan.needs("doc")
+        assert plan.select({"flesch_kincaid_grade": 1, "smog_index": 2, "metadata": {}}) == \
+            {"flesch_kincaid_grade": 1, "metadata": {}}
+
+    def test_families_keep_every_key(self):
+        plan = plan_metrics(["lexical", "structural"])
+        assert plan.families == ("structural", "lexical")
+        assert not plan.needs("doc") and not plan.needs("counts")
+        assert plan.keys is None
+
+    def test_profiles(self):
+        assert set(plan_metrics(profile="fast").families) == {"readability", "basic",
+                                                               "structural", "lexical"}
+        custom = plan_metrics(profile="mine", profiles={"mine": ["autism"]})
+        assert custom.needs("doc")
+
+    @pytest.mark.parametrize("selection", [
+        {"metrics": ["no_such_metric"]},
+        {"profile": "no_such_profile"},
+        {"metrics": []},
+        {"metrics": 5},
+        {"metrics": [["readability"]]},
+        {"metrics": {"readability": True}},
+        {"profile": ["fast"]},
+    ])
+    def test_invalid_selection(self, selection):
+        with pytest.raises(ValueError):
+            plan_metrics(**selection)
+
+
+class TestSelectedAnalysis:
+    """Test cases for analyze() with a metric selection"""
+
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        analyzer.nlp = ForbiddenPipeline()
+        return analyzer
+
+    def test_readability_only_never_parses(self, analyzer):
+        result = analyzer.analyze(SIMPLE_TEXT, metrics=["flesch_kincaid_grade"])
+
+        assert set(result) == {"flesch_kincaid_grade", "metadata"}
+        assert result["metadata"]["families"] == ["readability"]
+
+    def test_matches_full_analysis(self, analyzer):
+        full = TextAnalyzer().analyze(SIMPLE_TEXT)
+        result = analyzer.analyze(SIMPLE_TEXT, profile="fast")
+
+        for key, value in result.items():
+            if key != "metadata":
+                assert full[key] == value, key
+
+    def test_selections_are_cached_separately(self, analyzer):
+        analyzer.analyze(SIMPLE_TEXT, metrics=["readability"])
+        result = analyzer.analyze(SIMPLE_TEXT, metrics=["lexical"])
+
+        assert "type_token_ratio" in result and "flesch_kincaid_grade" not in result
+        assert result["metadata"]["cache_hit"] is False
+
+    def test_analyze_many(self, analyzer):
+        results = list(analyzer.analyze_many([SIMPLE_TEXT, ""], profile="readability"))
+
+        assert "flesch_kincaid_grade" in results[0]
+        assert results[1] == {"error": "Empty text provided"}
+
+    def test_unknown_metric(self, analyzer):
+        assert analyzer.analyze(SIMPLE_TEXT, metrics=["bogus"]) == {"error": "Unknown metric: bogus"}
+
+    @pytest.mark.parametrize("selection", [
+        {"metrics": 5}, {"metrics": [["a"]]}, {"profile": ["x"]},
+    ])
+    def test_malformed_selection_is_an_error(self, analyzer, selection):
+        assert "error" in analyzer.analyze(SIMPLE_TEXT, **selection)
+        assert "error" in analyzer.analyze_stream([SIMPLE_TEXT], **selection)
+        assert ["error"] == list(next(analyzer.analyze_many([SIMPLE_TEXT], **selection)))
+
+    def test_request_field(self, analyzer):
+        response = handle_request(analyzer, {"id": 1, "text": SIMPLE_TEXT,
+                                             "profile": "complexity_label"})
+        assert set(response["result"]) == {"flesch_kincaid_grade", "metadata"}
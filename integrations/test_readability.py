@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Parity tests: the single-pass readability engine against textstat
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+from readability import TOLERANCE, TextCounts, estimate_flesch_kincaid_grade, legacy_round
+
+textstat = pytest.importorskip("textstat")
+
+TEXTS_JSON = Path(__file__).resolve().parent.parent / "tests" / "texts.json"
+EDGE_TEXTS = [
+    "Hi.",
+    "!!! ...",
+    "Well-known it's ‘quoted’ don't=x e.g. U.S.A. 3.14 etc. Yes!? No. Maybe...",
+]
+
+TEXTSTAT_METRICS = {
+    "flesch_kincaid_grade": textstat.flesch_kincaid_grade,
+    "flesch_reading_ease": textstat.flesch_reading_ease,
+    "gunning_fog_index": textstat.gunning_fog,
+    "smog_index": textstat.smog_index,
+    "automated_readability_index": textstat.automated_readability_index,
+    "coleman_liau_index": textstat.coleman_liau_index,
+    "dale_chall_score": textstat.dale_chall_readability_score,
+    "linsear_write_score": textstat.linsear_write_formula,
+    "difficult_word_count": textstat.difficult_words,
+    "text_standard": textstat.text_standard,
+    "character_count": textstat.char_count,
+    "letter_count": textstat.letter_count,
+    "syllable_count": textstat.syllable_count,
+    "word_count": textstat.lexicon_count,
+    "sentence_count": textstat.sentence_count,
+    "polysyllable_count": textstat.polysyllabcount,
+}
+
+
+def corpus_texts():
+    texts = json.loads(TEXTS_JSON.read_text(encoding="utf-8"))["texts"]
+    return [t["content"] for t in texts] + EDGE_TEXTS
+
+
+@pytest.mark.parametrize("text", corpus_texts())
+def test_matches_textstat(text):
+    counts = TextCounts.from_text(text)
+    ours = {**counts.readability_metrics(), **counts.basic_stats()}
+
+    for name, reference in TEXTSTAT_METRICS.items():
+        expected = reference(text)
+        if isinstance(expected, str):
+            assert ours[name] == expected, name
+        else:
+            assert ours[name] == pytest.approx(expected, abs=TOLERANCE), name
+
+
+def test_legacy_round_is_half_away_from_zero():
+    assert legacy_round(2.5) == 3.0
+    assert legacy_round(-2.5) == -3.0
+    assert legacy_round(1.25, 1) == 1.3
+
+
+def test_estimate_tracks_textstat():
+    errors = [estimate_flesch_kincaid_grade(text) - textstat.flesch_kincaid_grade(text)
+              for text in corpus_texts()[:-len(EDGE_TEXTS)]]
+    assert abs(sum(errors) / len(errors)) < 0.5
+    assert max(abs(error) for error in errors) < 3.0
+
+
+def test_estimate_of_text_without_words():
+    assert estimate_flesch_kincaid_grade("!!! ...") is None
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the metric registry and metric packs
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from registry import Metric, MetricRegistry, default_registry
+from text_analyzer import TextAnalyzer
+
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+
+
+def exclamation_count(analyzer, inputs):
+    return {"exclamations": inputs.text.count("!")}
+
+
+def exclamation_density(analyzer, totals):
+    return {"exclamation_density": totals["exclamations"] / max(1, totals["words"])}
+
+
+EXCLAMATIONS = Metric(
+    "exclamations", inputs=("text", "words"), keys=("exclamation_density",),
+    count=lambda analyzer, inputs: dict(exclamation_count(analyzer, inputs),
+                                        words=len(inputs.words)),
+    finalize=exclamation_density,
+)
+
+SHOUTING = Metric(
+    "shouting", inputs=("words",), keys=("capitalized_ratio",),
+    compute=lambda analyzer, inputs: {
+        "capitalized_ratio": sum(w[:1].isupper() for w in inputs.words) / len(inputs.words)},
+)
+
+
+class TestRegistry:
+    """Test cases for registering and scheduling metrics"""
+
+    def test_schedule_cheapest_first(self):
+        registry = MetricRegistry([Metric("b", ("text",), ("x",), compute=dict, cost=5),
+                                   Metric("a", ("text",), ("y",), compute=dict, cost=1),
+                                   Metric("c", ("text",), ("z",), compute=dict, cost=1)])
+        assert [m.name for m in registry.schedule(["b", "c", "a"])] == ["a", "c", "b"]
+
+    def test_declared_inputs_are_checked(self):
+        with pytest.raises(ValueError):
+            Metric("bad", inputs=("paragraph_tree",), keys=(), compute=dict)
+        with pytest.raises(ValueError):
+            Metric("bad", inputs=("text",), keys=())
+
+    def test_entry_points(self, monkeypatch):
+        def register_pack(registry):
+            registry.register(SHOUTING)
+
+        def broken():
+            raise ImportError("missing dependency")
+
+        points = [SimpleNamespace(name="list", load=lambda: [EXCLAMATIONS]),
+                  SimpleNamespace(name="function", load=lambda: register_pack),
+                  SimpleNamespace(name="broken", load=broken)]
+        monkeypatch.setattr("importlib.metadata.entry_points",
+                            lambda: SimpleNamespace(select=lambda group: points))
+
+        registry = default_registry()
+
+        assert "exclamations" in registry and "shouting" in registry
+        assert "readability" in registry
+        assert registry.plugin_errors == {"broken": "missing dependency"}
+
+
+class TestRegisteredMetrics:
+    """Test cases for running registered metrics in TextAnalyzer"""
+
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        analyzer.registry.register(EXCLAMATIONS)
+        analyzer.registry.register(SHOUTING)
+        return analyzer
+
+    def test_metrics_run_and_are_timed(self, analyzer):
+        result = analyzer.analyze("Stop! The Cat sat on the mat!")
+
+        assert result["exclamation_density"] == 2 / 7
+        assert result["capitalized_ratio"] == 3 / 7
+        timings = result["metadata"]["timings_seconds"]
+        assert {"exclamations", "shouting", "readability", "words"} <= set(timings)
+
+    def test_selection_by_key(self, analyzer):
+        result = analyzer.analyze(SIMPLE_TEXT, metrics=["capitalized_ratio"])
+        assert set(result) == {"capitalized_ratio", "metadata"}
+        assert result["metadata"]["families"] == ["shouting"]
+
+    def test_streamed_analysis(self, analyzer):
+        analyzer.config['system']['stream_chunk_chars'] = 40
+        text = "\n\n".join(["Stop! The cat sat on the mat."] * 4)
+
+        result = analyzer.analyze_stream([text])
+
+        assert result["metadata"]["chunk_count"] > 1
+        assert result["exclamation_density"] == 4 / 28
+        # compute()-only metrics need the whole text at once
+        assert "capitalized_ratio" not in result
+        assert result["metadata"]["skipped_families"] == ["shouting"]
+
+    def test_failing_metric_is_silent(self, analyzer):
+        analyzer.registry.register(Metric("broken", ("text",), ("never",),
+                                          compute=lambda analyzer, inputs: 1 / 0))
+        result = analyzer.analyze(SIMPLE_TEXT)
+        assert "never" not in result and "flesch_kincaid_grade" in result
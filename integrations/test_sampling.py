@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for stratified sampling of very large documents
+"""
+
+import random
+
+import pytest
+from sampling import bootstrap_intervals, stratified_sample
+from text_analyzer import TextAnalyzer
+
+pytest.importorskip("textstat")
+
+SHORT = "The cat sat on the mat. It was a sunny day. The dog slept in the warm sun."
+LONG = ("Meanwhile, the government considered complicated regulations concerning "
+        "agricultural subsidies. Representatives deliberated extensively.")
+
+
+def document(paragraphs=200):
+    """Simple paragraphs in the first half, difficult ones in the second"""
+    return "\n\n".join(f"{SHORT if i < paragraphs // 2 else LONG} Part {i}."
+                       for i in range(paragraphs))
+
+
+class TestStratifiedSample:
+    """Test cases for picking paragraphs"""
+
+    def test_every_stratum_is_sampled_within_budget(self):
+        sizes = [10] * 100
+        strata = stratified_sample(sizes, 200, 5, random.Random(0))
+
+        assert len(strata) == 5
+        for number, stratum in enumerate(strata):
+            assert len(stratum) == 4
+            assert all(number * 20 <= index < (number + 1) * 20 for index in stratum)
+
+    def test_budget_follows_token_share(self):
+        sizes = [10] * 50 + [30] * 50
+        strata = stratified_sample(sizes, 300, 2, random.Random(0))
+        assert sum(sizes[i] for i in strata[0]) <= 75
+        assert sum(sizes[i] for i in strata[1]) <= 225
+
+    def test_oversized_paragraph_is_still_taken(self):
+        assert stratified_sample([1000, 1000], 10, 2, random.Random(0)) == [[0], [1]]
+
+    def test_seeded(self):
+        sizes = [5] * 300
+        assert stratified_sample(sizes, 100, 4, random.Random(7)) == \
+            stratified_sample(sizes, 100, 4, random.Random(7))
+
+
+class TestBootstrap:
+    """Test cases for the percentile intervals"""
+
+    def test_interval_contains_mean(self):
+        values = {i: float(i) for i in range(20)}
+
+        def mean(indices):
+            return {"mean": sum(values[i] for i in indices) / len(indices), "flag": True}
+
+        intervals = bootstrap_intervals([list(range(20))], mean, 200, 0.9, random.Random(0))
+        low, high = intervals["mean"]
+        assert low < 9.5 < high
+        assert "flag" not in intervals
+
+
+class TestSampledAnalysis:
+    """Test cases for TextAnalyzer.analyze_sample and long_text_mode = "sample\""""
+
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        analyzer.nlp = None
+        analyzer.config['sampling'].update(max_tokens=600, strata=4, bootstrap_replicates=50)
+        return analyzer
+
+    def test_estimates_and_intervals(self, analyzer):
+        text = document()
+        exact = analyzer.analyze_stream([text], profile="fast")
+        result = analyzer.analyze_sample(text, profile="fast")
+
+        sampling = result["metadata"]["sampling"]
+        assert result["metadata"]["sampled"] is True
+        assert 0 < sampling["sample_fraction"] < 0.5
+        assert sampling["paragraph_count"] == 200
+
+        # Both halves are sampled, so the grade lands near the exact one
+        assert result["flesch_kincaid_grade"] == pytest.approx(exact["flesch_kincaid_grade"], abs=2)
+        # Counts are scaled up to the whole text
+        assert result["word_count"] == pytest.approx(exact["word_count"], rel=0.05)
+        assert result["paragraph_count"] == pytest.approx(200, rel=0.05)
+
+        for key, interval in sampling["metrics"].items():
+            assert interval["low"] <= interval["high"]
+            assert interval["ci_width"] == pytest.approx(interval["high"] - interval["low"])
+        assert "flesch_kincaid_grade" in sampling["metrics"]
+        assert "type_token_ratio" not in result and "mtld" not in result
+
+    def test_deterministic(self, analyzer):
+        text = document()
+        first = analyzer.analyze_sample(text, profile="readability")
+        second = analyzer.analyze_sample(text, profile="readability")
+        assert first["metadata"]["sampling"] == second["metadata"]["sampling"]
+        assert first["flesch_kincaid_grade"] == second["flesch_kincaid_grade"]
+
+    def test_small_text_is_analyzed_in_full(self, analyzer):
+        result = analyzer.analyze_sample(SHORT, profile="fast")
+        assert result["metadata"]["sampled"] is False
+        assert "type_token_ratio" in result
+
+    def test_sample_mode(self, analyzer):
+        analyzer.config['system'].update(max_text_length=1000, long_text_mode='sample')
+        result = analyzer.analyze(document(), profile="readability")
+
+        assert result["metadata"]["sampled"] is True
+        assert result["metadata"]["text_length_characters"] > 1000
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared paragraph/sentence/token segmentation
+"""
+
+import pytest
+from segmentation import Segmentation
+from text_analyzer import TextAnalyzer
+
+textstat = pytest.importorskip("textstat")
+
+TEXT = ("# Water\n\nWater moves in a cycle. It rains! Then what?\n\n\n\n"
+        "- Clouds form over the sea\n- Rain falls on the hills\n\n"
+        "The sun warms the water again... and the cycle repeats.")
+
+
+class TestSegmentation:
+    """Test cases for the offset arrays"""
+
+    def test_paragraphs(self):
+        segments = Segmentation.from_text(TEXT)
+        assert list(segments.paragraphs(TEXT)) == [p for p in TEXT.split("\n\n") if p.strip()]
+
+    def test_tokens(self):
+        segments = Segmentation.from_text(TEXT)
+        tokens = [TEXT[s:e] for s, e in zip(segments.token_starts, segments.token_ends)]
+        assert tokens == TEXT.split()
+
+    def test_sentences_follow_textstat(self):
+        segments = Segmentation.from_text(TEXT)
+        assert segments.sentence_count == textstat.sentence_count(TEXT)
+        assert next(segments.sentences(TEXT)) == "Water\n\nWater moves in a cycle."
+        for sentence, (start, end) in zip(segments.sentences(TEXT), segments.sentence_spans()):
+            assert TEXT[start:end] == sentence
+
+    def test_empty_text(self):
+        segments = Segmentation.from_text("")
+        assert segments.paragraph_count == segments.token_count == 0
+        assert segments.raw_sentence_count == 0 and segments.sentence_count == 1
+
+
+class TestConsistentCounts:
+    """Every family reports the same sentence boundaries"""
+
+    def test_one_sentence_count(self):
+        result = TextAnalyzer().analyze(TEXT)
+        sentences = textstat.sentence_count(TEXT)
+
+        assert result["sentence_count"] == sentences
+        assert result["paragraph_sentence_ratio"] == result["paragraph_count"] / sentences
+
+    def test_spacy_does_not_override(self):
+        spacy = pytest.importorskip("spacy")
+        analyzer = TextAnalyzer()
+        analyzer.nlp = spacy.blank("en")
+        analyzer.nlp.add_pipe("sentencizer")
+
+        result = analyzer.analyze(TEXT)
+
+        assert "pronoun_density" in result
+        assert result["sentence_count"] == textstat.sentence_count(TEXT)
+
+    def test_fallback_without_counts(self):
+        stats = TextAnalyzer()._compute_basic_stats(TEXT)
+        assert stats["sentence_count"] == textstat.sentence_count(TEXT)
+        assert stats["word_count"] == len(TEXT.split())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-forked Unix socket analysis server
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from analyzer_server import probe, wait_until_ready
+from framing import AnalyzerClient
+
+SCRIPT = str(Path(__file__).with_name("text_analyzer.py"))
+SIMPLE_TEXT = "The cat sat on the mat. It was a sunny day. The cat enjoyed the warmth."
+
+
+def ping(socket_path):
+    with AnalyzerClient.connect(socket_path) as client:
+        return client.request({"id": "p", "op": "ping"})["result"]
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A running `text_analyzer.py serve` with two workers"""
+    socket_path = str(tmp_path / "analyzer.sock")
+    process = subprocess.Popen(
+        [sys.executable, SCRIPT, "serve", "--socket", socket_path, "--workers", "2"],
+        stderr=subprocess.DEVNULL,
+    )
+    assert wait_until_ready(socket_path, timeout=30)
+    yield process, socket_path
+    if process.poll() is None:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_probe_without_server(tmp_path):
+    assert not probe(str(tmp_path / "missing.sock"))
+
+
+def test_requests_from_several_clients(server):
+    """Each connection carries many requests, all answered correctly"""
+    _, socket_path = server
+    # One open connection per worker: a connection holds its worker until closed
+    clients = [AnalyzerClient.connect(socket_path) for _ in range(2)]
+    try:
+        for client in clients:
+            for _ in range(2):
+                assert "flesch_kincaid_grade" in client.analyze(SIMPLE_TEXT)
+    finally:
+        for client in clients:
+            client.close()
+
+
+def test_probe_cli(server):
+    _, socket_path = server
+    code = subprocess.call([sys.executable, SCRIPT, "probe", "--socket", socket_path])
+    assert code == 0
+
+
+def test_dead_worker_is_respawned(server):
+    """Killing a worker doesn't take capacity away for long"""
+    _, socket_path = server
+    victim = ping(socket_path)["worker_pid"]
+    os.kill(victim, signal.SIGKILL)
+
+    deadline = time.monotonic() + 10
+    seen = set()
+    while time.monotonic() < deadline and len(seen - {victim}) < 2:
+        seen.add(ping(socket_path)["worker_pid"])
+    assert len(seen - {victim}) == 2
+
+
+def test_graceful_shutdown_removes_socket(server):
+    process, socket_path = server
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
+    assert not os.path.exists(socket_path)
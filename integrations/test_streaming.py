@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming analysis of texts beyond max_text_length
+"""
+
+from collections import Counter
+
+import pytest
+from streaming import iter_chunks, merge_counts
+from text_analyzer import TextAnalyzer
+
+pytest.importorskip("textstat")
+
+PARAGRAPH = ("The cat sat on the mat. It was a sunny day. "
+             "Meanwhile, the government considered complicated regulations.")
+
+
+def long_text(paragraphs=60):
+    return "\n\n".join(f"{PARAGRAPH} Paragraph number {i} ends here." for i in range(paragraphs))
+
+
+class TestChunking:
+    """Test cases for cutting a text stream into chunks"""
+
+    def test_chunks_concatenate_to_input(self):
+        text = long_text()
+        pieces = [text[i:i + 333] for i in range(0, len(text), 333)]
+        chunks = list(iter_chunks(pieces, 1000))
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == text
+        assert all(len(chunk) <= 1000 + 2 for chunk in chunks)
+
+    def test_chunks_end_at_paragraph_breaks(self):
+        chunks = list(iter_chunks([long_text()], 1000))
+        for chunk in chunks[:-1]:
+            assert chunk.endswith("\n\n")
+
+    @pytest.mark.parametrize("piece_chars", [1, 7, 999, 1000, 5000])
+    def test_chunks_do_not_depend_on_pieces(self, piece_chars):
+        text = long_text()
+        pieces = [text[i:i + piece_chars] for i in range(0, len(text), piece_chars)]
+        assert list(iter_chunks(pieces, 1000)) == list(iter_chunks([text], 1000))
+
+    def test_falls_back_to_whitespace_then_hard_cut(self):
+        assert list(iter_chunks(["aaaa bbbb cccc"], 7)) == ["aaaa ", "bbbb ", "cccc"]
+        assert list(iter_chunks(["abcdefgh"], 3)) == ["abc", "def", "gh"]
+
+    def test_blank_chunks_are_dropped(self):
+        assert list(iter_chunks(["   \n\n  "], 4)) == []
+
+    def test_merge_counts(self):
+        total = {}
+        merge_counts(total, {"words": 2, "vocabulary": {"a", "b"}, "headings": False})
+        merge_counts(total, {"words": 3, "vocabulary": {"b", "c"}, "headings": True})
+        assert total == {"words": 5, "vocabulary": {"a", "b", "c"}, "headings": True}
+
+    def test_merge_counts_leaves_parts_alone(self):
+        part = {"frequencies": Counter(a=1), "series": [0.5]}
+        total = {}
+        merge_counts(total, part)
+        merge_counts(total, part)
+
+        assert total == {"frequencies": Counter(a=2), "series": [0.5, 0.5]}
+        assert part == {"frequencies": Counter(a=1), "series": [0.5]}
+
+
+class TestStreamedAnalysis:
+    """Test cases for TextAnalyzer.analyze_stream and long_text_mode"""
+
+    @pytest.fixture
+    def analyzer(self):
+        analyzer = TextAnalyzer()
+        analyzer.config['system']['stream_chunk_chars'] = 2000
+        return analyzer
+
+    def test_counts_match_whole_text(self, analyzer):
+        """Chunks cut at paragraph breaks add up to the whole-text counts"""
+        text = long_text()
+        whole = analyzer.analyze(text)
+        streamed = analyzer.analyze_stream([text])
+
+        assert streamed["metadata"]["streamed"] is True
+        assert streamed["metadata"]["chunk_count"] > 1
+        for key in ("word_count", "character_count", "syllable_count", "polysyllable_count",
+                    "sentence_count", "difficult_word_count", "paragraph_count",
+                    "unique_word_count", "flesch_kincaid_grade", "flesch_reading_ease"):
+            assert streamed[key] == whole[key], key
+
+    def test_stream_mode_does_not_truncate(self, analyzer):
+        analyzer.config['system']['long_text_mode'] = 'stream'
+        analyzer.config['system']['max_text_length'] = 5000
+        text = long_text()
+        assert len(text) > 5000
+
+        result = analyzer.analyze(text)
+
+        assert "error" not in result
+        assert result["metadata"]["streamed"] is True
+        assert result["metadata"]["text_length_characters"] == len(text)
+        assert result["word_count"] == len(text.split())
+
+    def test_truncate_mode_is_default(self, analyzer):
+        analyzer.config['system']['max_text_length'] = 5000
+        result = analyzer.analyze(long_text())
+
+        assert result["metadata"]["text_length_characters"] == 5000
+        assert "streamed" not in result["metadata"]
+
+    def test_analyze_many_streams_long_texts(self, analyzer):
+        analyzer.config['system']['long_text_mode'] = 'stream'
+        analyzer.config['system']['max_text_length'] = 5000
+        short, text = "The cat sat on the mat.", long_text()
+
+        results = list(analyzer.analyze_many([short, text]))
+
+        assert "streamed" not in results[0]["metadata"]
+        assert results[1]["metadata"]["text_length_characters"] == len(text)
+
+    def test_empty_stream(self, analyzer):
+        assert analyzer.analyze_stream(["", "  \n\n "]) == {"error": "Empty text provided"}
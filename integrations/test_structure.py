@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass structure scanner
+"""
+
+import time
+
+from structure import count_structure, scan
+from text_analyzer import TextAnalyzer
+
+DOCUMENT = """# Water
+
+## 2. The cycle
+2.1 Evaporation comes first.
+
+- Clouds form
+* Rain falls
+1. Rivers fill
+2) Seas rise
+
+> Water is life.
+> It moves.
+Plain line.
+> Again here.
+
+| Stage | Length |
+|-------|:------:|
+| Rain  | Days   |
+
+```python
+# not a heading
+- not a list item. Nor a sentence.
+```
+Done! Really?"""
+
+
+def kinds(text):
+    return [kind for kind, _, _ in scan(text)]
+
+
+class TestScan:
+    """Test cases for the ordered element stream"""
+
+    def test_positions(self):
+        for kind, start, end in scan(DOCUMENT):
+            element = DOCUMENT[start:end]
+            if kind == "sentence_end":
+                assert set(element) <= set(".!?")
+            elif kind == "paragraph_break":
+                assert element.strip() == ""
+            elif kind == "heading":
+                assert element.startswith("#")
+
+    def test_order(self):
+        events = list(scan(DOCUMENT))
+        assert events == sorted(events, key=lambda event: event[1])
+        assert kinds(DOCUMENT)[:4] == ["heading", "paragraph_break", "numbered_heading",
+                                       "numbered_heading"]
+
+    def test_code_block_is_opaque(self):
+        events = list(scan(DOCUMENT))
+        fences = [start for kind, start, _ in events if kind == "code_fence"]
+        assert len(fences) == 2
+        assert not [kind for kind, start, _ in events if fences[0] < start < fences[1]]
+
+    def test_sentence_ends(self):
+        ends = [DOCUMENT[start:end] for kind, start, end in scan(DOCUMENT)
+                if kind == "sentence_end"]
+        assert ends[-2:] == ["!", "?"]
+        assert kinds("Pi is 3.14 or so...") == ["sentence_end"]
+
+
+class TestCountStructure:
+    """Test cases for element counts"""
+
+    def test_counts(self):
+        assert count_structure(DOCUMENT) == {
+            "heading": 1, "numbered_heading": 2, "list_item": 4, "block_quote": 2,
+            "table": 1, "code_block": 1,
+        }
+
+    def test_numbered_list_is_not_a_heading(self):
+        counts = count_structure("1. First\n2. Second\n")
+        assert counts["list_item"] == 2 and counts["numbered_heading"] == 0
+
+    def test_unclosed_fence(self):
+        assert count_structure("```\n# code\n")["code_block"] == 1
+        assert count_structure("```\n# code\n")["heading"] == 0
+
+    def test_quote_on_first_line(self):
+        assert count_structure("> a\n> b\n\n> c")["block_quote"] == 2
+
+    def test_plain_text(self):
+        assert not any(count_structure("Just a plain sentence. And another.").values())
+
+    def test_whitespace_run_is_linear(self):
+        # A line of blanks once made the table pattern backtrack quadratically
+        text = " \t" * 50000 + "x"
+        start = time.perf_counter()
+        assert not any(count_structure(text).values())
+        assert not list(scan(text))
+        assert time.perf_counter() - start < 1
+
+
+class TestStructuralMetrics:
+    """Test cases for the structural family in TextAnalyzer"""
+
+    def test_richer_structure(self):
+        result = TextAnalyzer()._compute_structural_metrics(DOCUMENT)
+
+        assert result["has_headings"] and result["heading_count"] == 3
+        assert result["numbered_heading_count"] == 2
+        assert result["list_item_count"] == 4
+        assert result["block_quote_count"] == 2
+        assert result["table_count"] == 1
+        assert result["code_block_count"] == 1
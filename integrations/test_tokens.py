@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared offset-array tokenization
+"""
+
+from collections import Counter
+
+from lexical import word_ids
+from tokens import TokenizedText, token_offsets
+
+TEXT = "The cat sat.  THE DOG sat\non the cat's mat -- the end"
+
+
+class TestTokenizedText:
+    """Test cases for offsets and interned ids"""
+
+    def test_tokens_match_split(self):
+        tokens = TokenizedText.from_text(TEXT)
+        assert list(tokens) == TEXT.split()
+        assert len(tokens) == len(TEXT.split())
+        assert tokens[4] == "DOG"
+        assert tokens.character_count == sum(len(token) for token in TEXT.split())
+
+    def test_ids_are_lowercase_interned(self):
+        tokens = TokenizedText.from_text(TEXT)
+        lowered = [token.lower() for token in TEXT.split()]
+        ids, index = word_ids(lowered)
+
+        assert list(tokens.ids) == ids
+        assert tokens.vocabulary == list(index)
+        assert tokens.frequencies() == Counter(lowered)
+
+    def test_shares_offsets(self):
+        starts, ends = token_offsets(TEXT)
+        tokens = TokenizedText(TEXT, starts, ends)
+        assert tokens.starts is starts and tokens.ends is ends
+        assert tokens.starts.typecode == tokens.ids.typecode == "I"
+
+    def test_empty_text(self):
+        tokens = TokenizedText.from_text(" \n ")
+        assert len(tokens) == 0 and tokens.vocabulary == []
+        assert tokens.character_count == 0
+
+
+class TestSharedTokens:
+    """Every built-in family reads one TokenizedText"""
+
+    def test_built_once(self):
+        from text_analyzer import TextAnalyzer
+        analyzer = TextAnalyzer()
+        result = analyzer.analyze(TEXT * 10, profile="fast")
+
+        timings = result["metadata"]["timings_seconds"]
+        assert "tokens" in timings and "words" not in timings
+        assert result["metadata"]["text_length_words"] == len((TEXT * 10).split())
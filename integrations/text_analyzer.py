@@ -7,49 +7,39 @@ Analyzes text complexity for people with ASD and ADHD
 import json
 import sys
 import logging
-import textstat
-import spacy
-import re
 import time
-import tomli
 import os
+import random
 import warnings
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from framing import handle_request, serve_framed
+from languages import detect_language
+from lexicons import LEXICONS
+from readability import TextCounts, estimate_flesch_kincaid_grade
+from caching import ResultCache, TEXTSTAT_VERSION, WordCache
+from dependencies import NullWriter, available, optional_import
+from streaming import iter_chunks, merge_counts
+from sampling import (EXTENSIVE_KEYS, NOT_EXTRAPOLATED_KEYS, bootstrap_intervals,
+                      paragraph_token_counts, stratified_sample)
+from pipelines import PipelineRegistry, prepare_model
+from planner import PROFILES, Plan, plan_metrics
+from registry import Inputs, default_registry
+from segmentation import Segmentation
+from structure import count_structure
+from tokens import TokenizedText
+from lexical import (HDD_SAMPLE_SIZE, MATTR_WINDOW, MTLD_THRESHOLD, hdd, mtld_factors,
+                     mtld_from_factors, window_types)
+
 # ====== CRITICAL: Suppress ALL warnings before anything else ======
 warnings.filterwarnings("ignore")
 if not sys.warnoptions:
     warnings.simplefilter("ignore")
     os.environ["PYTHONWARNINGS"] = "ignore"
 
-# Redirect stderr to suppress any remaining output
-class NullWriter:
-    def write(self, x): pass
-    def flush(self): pass
-
-# Temporarily replace stderr during imports
-original_stderr = sys.stderr
-sys.stderr = NullWriter()
-
-# Now import with suppressed warnings
-try:
-    import spacy
-except ImportError:
-    spacy = None
-
-try:
-    import textstat
-except ImportError:
-    textstat = None
-
-try:
-    import tomli
-except ImportError:
-    tomli = None
-
-# Restore stderr
-sys.stderr = original_stderr
+# spaCy, numpy, textstat and tomli are imported on first use (dependencies.py):
+# a readability-only request never pays for spaCy
 
 # Setup SILENT logging
 logging.basicConfig(
@@ -60,40 +50,132 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.propagate = False  # Don't propagate to root logger
 
+# Bump whenever the same text would produce a different result (keys the result cache)
+ANALYZER_VERSION = "1.6"
+
+ANAPHORIC_FEATURES = ("Person", "Number", "Case")
+
+# Flesch-Kincaid grades splitting simple / moderate / complex (the C++
+# TextAnalyzer's complexity_label); analyze(tier="fast") escalates near them
+COMPLEXITY_THRESHOLDS = (8.0, 12.0)
+TIERS = (None, "fast", "full")
+# The only selection the fast tier's estimate can answer
+FAST_TIER_KEYS = frozenset({"flesch_kincaid_grade"})
+
+
+def _reference_features(morph: str) -> Tuple[bool, bool]:
+    """(has Person/Number/Case, is PronType=Dem) of a FEATS string, e.g. Case=Nom|Number=Sing"""
+    features = dict(item.split("=", 1) for item in morph.split("|") if "=" in item)
+    return (any(key in features for key in ANAPHORIC_FEATURES),
+            features.get("PronType") == "Dem")
+
+
+def _add_timing(timings: Dict[str, float], name: str, seconds: float) -> None:
+    timings[name] = timings.get(name, 0.0) + seconds
+
 
 class TextAnalyzer:
     """Text analyzer with configurable metrics - SILENT version"""
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, fast_start: bool = False):
         """
         Initialize analyzer with configuration
         
+        The spaCy pipeline of each language is loaded on first use (see
+        pipeline()).
+        
         Args:
             config_path: Path to TOML configuration file
+            fast_start: Readability-only start: spaCy is never loaded, metric
+                        packs are not scanned for, and requests without a
+                        selection get the "readability" profile
         """
         self.config = self._load_config(config_path)
-        self.nlp = None
+        self.fast_start = fast_start
+        
+        # Pipelines of the [languages] models, least recently used evicted
+        models = self.config['models']
+        self.pipelines = PipelineRegistry(self.config['languages'],
+                                          models['snapshot_dir'] or None,
+                                          models['use_snapshots'],
+                                          models['max_loaded_mb'] * 1024 * 1024)
+        
+        # Metric families: built-ins plus installed metric packs
+        self.registry = default_registry(
+            plugins=self.config['metrics']['load_plugins'] and not fast_start)
+        
+        # MORPH hash -> anaphora-relevant features, filled as analyses see them
+        self._morph_flags: Dict[int, Tuple[bool, bool]] = {}
+        # Seconds per character to build each analysis input, for deadlines
+        self._input_rates: Dict[str, float] = {}
         
-        # Don't log initialization
-        self._initialize_models()
+        # Per-word syllable/difficulty cache shared by all analyses
+        cache_config = self.config['cache']
+        self.word_cache = WordCache(cache_config['word_cache_size'],
+                                    cache_config['word_cache_path'] or None)
+        
+        # Complete results keyed by text + settings, memory and optional disk tier
+        self.result_cache = ResultCache(cache_config['result_cache_size'],
+                                        cache_config['result_cache_path'] or None,
+                                        cache_config['result_cache_max_mb'] * 1024 * 1024)
     
     def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
         """Load configuration from TOML file - SILENT"""
         default_config = {
             'system': {
                 'max_text_length': 100000,
-                'default_language': 'en'
+                'default_language': 'en',
+                'detect_language': True,
+                'long_text_mode': 'truncate',
+                'stream_chunk_chars': 50000,
+                'stream_workers': 1
             },
             'languages': {
                 'en': 'en_core_web_sm',
                 'ru': 'ru_core_news_sm'
+            },
+            'models': {
+                'snapshot_dir': '',
+                'use_snapshots': True,
+                'max_loaded_mb': 1024
+            },
+            'cache': {
+                'word_cache_size': 100000,
+                'word_cache_path': '',
+                'result_cache_size': 1024,
+                'result_cache_path': '',
+                'result_cache_max_mb': 256
+            },
+            'profiles': {name: list(metrics) for name, metrics in PROFILES.items()},
+            'metrics': {
+                'load_plugins': True
+            },
+            'tiers': {
+                'complexity_thresholds': list(COMPLEXITY_THRESHOLDS),
+                'fast_margin': 1.5
+            },
+            'sampling': {
+                'max_tokens': 20000,
+                'strata': 10,
+                'seed': 0,
+                'bootstrap_replicates': 100,
+                'confidence': 0.95
+            },
+            'lexical': {
+                'min_words_for_mtld': 50,
+                'min_words_for_hdd': 100,
+                'mtld_threshold': MTLD_THRESHOLD,
+                'hdd_sample_size': HDD_SAMPLE_SIZE,
+                'mattr_window': MATTR_WINDOW,
+                'mattr_series_step': 0
             }
         }
         
         if config_path and Path(config_path).exists():
             try:
+                toml = optional_import('tomli') or optional_import('tomllib')
                 with open(config_path, 'rb') as f:
-                    user_config = tomli.load(f)
+                    user_config = toml.load(f)
                 # Merge with defaults
                 for section, values in user_config.items():
                     if section in default_config:
@@ -105,240 +187,1088 @@ class TextAnalyzer:
         
         return default_config
     
-    def _initialize_models(self) -> None:
-        """Initialize NLP models - COMPLETELY SILENT"""
-        language = self.config['system']['default_language']
+    @property
+    def nlp(self):
+        """spaCy pipeline of the default language (see pipeline())"""
+        return self.pipeline()
+    
+    @nlp.setter
+    def nlp(self, pipeline) -> None:
+        self.pipelines.set(self.config['system']['default_language'], pipeline)
+    
+    def pipeline(self, language: Optional[str] = None):
+        """
+        spaCy pipeline of a language, loaded on first use
+        
+        Args:
+            language: Key of [languages] (default: default_language)
+            
+        Returns:
+            The trimmed pipeline, or None without spaCy or the model (and
+            always with fast_start)
+        """
+        if self.fast_start:
+            return None
+        return self.pipelines.get(language or self.config['system']['default_language'])
+    
+    def spacy_available(self, language: Optional[str] = None) -> bool:
+        """
+        Whether analyses in a language get a Doc; before its pipeline is
+        loaded, whether spaCy and the model are installed (checked without
+        importing them)
+        """
+        if self.fast_start:
+            return False
+        return self.pipelines.available(language or self.config['system']['default_language'])
+    
+    def load_models(self, languages: Optional[Iterable[str]] = None) -> None:
+        """
+        Import textstat and load spaCy pipelines (and word lists, see
+        lexicons.py) now instead of on first use, e.g. before forking
+        workers that should share them
         
-        # Initialize spaCy model if available
-        if spacy:
-            model_name = self.config['languages'].get(language, 'en_core_web_sm')
+        Args:
+            languages: Keys of [languages] (default: default_language)
+        """
+        optional_import('textstat')
+        for language in languages or [self.config['system']['default_language']]:
+            self.pipeline(language)
+            if language in LEXICONS:
+                LEXICONS[language].easy_words
+    
+    def prepare_models(self, languages: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Write the trimmed pipeline snapshot of each language's model ([models])
+        
+        Args:
+            languages: Languages from [languages] (default: all of them)
+            
+        Returns:
+            language -> the snapshot's fingerprint and path, or {"error": ...}
+        """
+        snapshot_dir = self.config['models']['snapshot_dir'] or None
+        prepared = {}
+        for language in languages or self.config['languages']:
+            model_name = self.config['languages'].get(language)
+            if model_name is None:
+                prepared[language] = {"error": f"No model configured for language: {language}"}
+                continue
             try:
-                # Ultra-silent load
-                import warnings
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    # Load with minimal components
-                    self.nlp = spacy.load(
-                        model_name, 
-                        disable=["parser", "ner", "lemmatizer", "attribute_ruler"]
-                    )
-            except Exception:
-                self.nlp = None
-        else:
-            self.nlp = None
+                prepared[language] = prepare_model(model_name, snapshot_dir)
+            except Exception as e:
+                prepared[language] = {"error": f"{model_name}: {str(e)}"}
+        return prepared
+    
+    def _route_language(self, text: str) -> Tuple[str, Optional[float], Optional[float]]:
+        """
+        Language of a text without one: detected among [languages] if
+        detect_language is on, else (and when unsure) default_language
+        
+        Returns:
+            (language, detection confidence or None if the detector was
+            unsure, seconds spent detecting or None if it did not run)
+        """
+        default = self.config['system']['default_language']
+        if not self.config['system']['detect_language']:
+            return default, None, None
+        start = time.perf_counter()
+        detected, confidence = detect_language(text, self.config['languages'])
+        seconds = time.perf_counter() - start
+        if detected is None:
+            return default, None, seconds
+        return detected, confidence, seconds
     
-    def analyze(self, text: str) -> Dict[str, Any]:
+    def _note_detection(self, result: Dict[str, Any], confidence: Optional[float],
+                        seconds: Optional[float]) -> Dict[str, Any]:
+        """
+        Report a language detection in a result's metadata and timings;
+        language_detected is false when the detector fell back to
+        default_language
         """
-        Analyze text and return all computed metrics
+        metadata = result.get("metadata")
+        if metadata is not None and seconds is not None:
+            metadata["language_detected"] = confidence is not None
+            metadata["language_confidence"] = confidence
+            _add_timing(metadata.setdefault("timings_seconds", {}), "language", seconds)
+            metadata["processing_time_seconds"] = \
+                metadata.get("processing_time_seconds", 0.0) + seconds
+        return result
+    
+    def _check_language(self, language: Optional[str]) -> Optional[str]:
+        """A requested language, checked against [languages] (ValueError); None stays None"""
+        if language is not None and not isinstance(language, str):
+            raise ValueError("language must be a string")
+        if language is not None and language not in self.config['languages']:
+            raise ValueError(f"Unsupported language: {language}")
+        return language
+    
+    def _language(self, language: Optional[str]) -> str:
+        return language or self.config['system']['default_language']
+    
+    def analyze(self, text: str, metrics: Optional[Iterable[str]] = None,
+                profile: Optional[str] = None, tier: Optional[str] = None,
+                deadline_ms: Optional[float] = None,
+                language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze text and return the computed metrics
         
         Args:
             text: Input text for analysis
+            metrics: Metric families and/or result keys to compute (default: all)
+            profile: Named selection from [profiles], used if metrics is None
+            tier: "fast" returns only a cheap flesch_kincaid_grade estimate
+                  unless it is within [tiers] fast_margin of a complexity
+                  threshold, and the full analysis otherwise; a selection
+                  of anything but flesch_kincaid_grade skips the estimate.
+                  "full" (or None) always runs the full analysis
+            deadline_ms: Time budget; families (cheapest first) that would
+                         start after it, or whose inputs are expected to
+                         take longer than what is left, are skipped
+            language: Key of [languages] selecting the spaCy pipeline;
+                      detected from the text if None (see detect_language)
             
         Returns:
-            Dictionary with all computed metrics
+            Dictionary with the requested metrics; with a tier,
+            metadata["tier"] says which tier produced it, and with a
+            deadline metadata["partial"] whether families were skipped
+            (listed in metadata["skipped_families"])
         """
-        if not text or not text.strip():
+        deadline = None
+        if deadline_ms is not None:
+            if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)):
+                return {"error": "deadline_ms must be a number"}
+            deadline = time.perf_counter() + deadline_ms / 1000
+        
+        text = self._prepare_text(text)
+        if text is None:
             return {"error": "Empty text provided"}
         
-        # Check text length
-        max_length = self.config['system']['max_text_length']
-        if len(text) > max_length:
-            text = text[:max_length]
+        try:
+            plan = self._plan(metrics, profile)
+            language = self._check_language(language)
+        except ValueError as e:
+            return {"error": str(e)}
+        if tier not in TIERS:
+            return {"error": f"Unknown tier: {tier}"}
+        
+        confidence = detection_time = None
+        if language is None:
+            language, confidence, detection_time = self._route_language(text)
+        
+        # The estimate only answers a request for the grade (or for nothing in particular)
+        if tier == "fast" and ((metrics is None and profile is None)
+                               or plan.keys == FAST_TIER_KEYS):
+            result = self._analyze_fast(text, plan, deadline, language)
+        else:
+            result = self._analyze_planned(text, plan, deadline, language)
+            if tier is not None and "metadata" in result:
+                result["metadata"]["tier"] = "full"
+        if deadline is not None and "metadata" in result:
+            result["metadata"].setdefault("partial", False)
+        return self._note_detection(result, confidence, detection_time)
+    
+    def _analyze_fast(self, text: str, plan: Plan, deadline: Optional[float] = None,
+                      language: Optional[str] = None) -> Dict[str, Any]:
+        """Tier "fast": the estimate if it is clear of every threshold, else the full analysis"""
+        try:
+            start_time = time.time()
+            step_start = time.perf_counter()
+            segments = Segmentation.from_text(text)
+            lexicon = LEXICONS.get(self._language(language))
+            estimate = estimate_flesch_kincaid_grade(text, segments.sentence_count,
+                                                     lexicon.vowels if lexicon else None)
+            elapsed = time.perf_counter() - step_start
+            
+            tiers = self.config['tiers']
+            if estimate is not None and all(abs(estimate - threshold) > tiers['fast_margin']
+                                            for threshold in tiers['complexity_thresholds']):
+                return {
+                    "flesch_kincaid_grade": estimate,
+                    "metadata": {
+                        "processing_time_seconds": time.time() - start_time,
+                        "text_length_characters": len(text),
+                        "text_length_words": segments.token_count,
+                        "language": self._language(language),
+                        "spacy_available": self.spacy_available(language),
+                        "families": [],
+                        "timings_seconds": {"estimate": elapsed},
+                        "tier": "fast",
+                    },
+                }
+        except Exception as e:
+            return {"error": f"Analysis failed: {str(e)}"}
         
+        # Too close to call: escalate
+        result = self._analyze_planned(text, plan, deadline, language)
+        if "metadata" in result:
+            result["metadata"].update({"tier": "full", "fast_estimate": estimate})
+        return result
+    
+    def _analyze_planned(self, text: str, plan: Plan, deadline: Optional[float] = None,
+                         language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        analyze() for a prepared text and a resolved plan
+        
+        The deadline (a time.perf_counter() value) does not apply to
+        streamed texts, whose families all advance chunk by chunk.
+        """
         try:
             start_time = time.time()
             
-            # Create spaCy document if model is loaded
-            spacy_doc = self.nlp(text) if self.nlp else None
+            # Same text with the same settings seen before: skip all the work
+            key = self._result_key(text, plan, language)
+            cached = self._cached_result(key, start_time)
+            if cached:
+                return cached
             
-            # Compute all metrics
-            result = {}
+            if len(text) > self.config['system']['max_text_length']:
+                # Only reachable with long_text_mode = "stream" or "sample"
+                if self.config['system']['long_text_mode'] == 'sample':
+                    result = self._analyze_sampled(text, plan, language)
+                else:
+                    result = self._analyze_chunks([text], plan, language)
+                if "error" not in result:
+                    self.result_cache.put(key, result)
+                return result
+            
+            # The Doc is parsed on first use, only if a planned family needs it
+            result = self._build_result(text, None, start_time, plan, deadline, language)
+            if not result["metadata"].get("partial"):
+                self.result_cache.put(key, result)
+            return result
+            
+        except Exception as e:
+            return {"error": f"Analysis failed: {str(e)}"}
+    
+    def analyze_stream(self, pieces: Iterable[str], metrics: Optional[Iterable[str]] = None,
+                       profile: Optional[str] = None,
+                       language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a text of any length chunk by chunk, without truncating it
+        
+        The text is cut at paragraph boundaries into chunks of about
+        stream_chunk_chars, each chunk is counted (and parsed by spaCy,
+        in stream_workers processes) on its own, and the merged counts give
+        the whole-document metrics. Sentences cut by a chunk boundary are
+        counted in both chunks; chunks end at paragraph breaks whenever the
+        text has any, so this is rare. MTLD runs restart at each chunk, which
+        is within about one factor per chunk of the whole-text value; MATTR
+        skips the windows that span two chunks.
+        
+        Args:
+            pieces: The text, whole or in pieces (e.g. blocks read from a file)
+            metrics: Metric families and/or result keys to compute (default: all)
+            profile: Named selection from [profiles], used if metrics is None
+            language: Key of [languages] (default: default_language)
             
-            # 1. Readability metrics using textstat (always works)
-            if textstat:
-                result.update(self._compute_readability_metrics(text))
+        Returns:
+            Dictionary with the requested metrics, metadata.streamed set
+        """
+        try:
+            plan = self._plan(metrics, profile)
+            language = self._check_language(language)
+        except ValueError as e:
+            return {"error": str(e)}
+        return self._analyze_chunks(pieces, plan, language)
+    
+    def _analyze_chunks(self, pieces: Iterable[str], plan: Plan,
+                        language: Optional[str] = None) -> Dict[str, Any]:
+        """analyze_stream() for a resolved plan"""
+        system = self.config['system']
+        language = self._language(language)
+        try:
+            start_time = time.time()
+            hits, misses = self.word_cache.hits, self.word_cache.misses
+            chunks = iter_chunks(pieces, system['stream_chunk_chars'])
+            nlp = self.pipeline(language) if plan.needs("doc") else None
+            if nlp:
+                workers = max(1, system['stream_workers'])
+                # The trailing paragraph break would parse as a sentence of its own
+                docs = nlp.pipe(((chunk.rstrip(), chunk) for chunk in chunks),
+                                     as_tuples=True, batch_size=workers, n_process=workers)
+                parts = ((chunk, doc) for doc, chunk in docs)
+            else:
+                parts = ((chunk, None) for chunk in chunks)
             
-            # 2. Basic text statistics
-            result.update(self._compute_basic_stats(text))
+            # Metrics without mergeable counts need the whole text at once
+            streamed = [metric for metric in plan.metrics if metric.streamable]
+            skipped = [metric.name for metric in plan.metrics if not metric.streamable]
             
-            # 3. Structural metrics
-            result.update(self._compute_structural_metrics(text))
+            totals: Dict[str, Dict[str, Any]] = {metric.name: {} for metric in streamed}
+            timings: Dict[str, float] = {}
+            characters = words = chunk_count = 0
+            for chunk, spacy_doc in parts:
+                chunk_count += 1
+                characters += len(chunk)
+                inputs = Inputs(self, chunk, spacy_doc, language)
+                words += inputs.segments.token_count
+                for metric in streamed:
+                    merge_counts(totals[metric.name],
+                                 self._timed_step(timings, metric.name, inputs, metric.count, inputs))
             
-            # 4. Lexical metrics
-            result.update(self._compute_lexical_metrics(text))
+            if not chunk_count:
+                return {"error": "Empty text provided"}
             
-            # 5. Autism support metrics (requires spaCy)
-            if spacy_doc:
-                result.update(self._compute_autism_metrics(spacy_doc))
+            result = {}
+            for metric in streamed:
+                step_start = time.perf_counter()
+                result.update(self._run_step(metric.finalize, totals[metric.name]))
+                _add_timing(timings, metric.name, time.perf_counter() - step_start)
             
-            # Add metadata
             result["metadata"] = {
                 "processing_time_seconds": time.time() - start_time,
-                "text_length_characters": len(text),
-                "text_length_words": len(text.split()),
-                "language": self.config['system']['default_language'],
-                "spacy_available": spacy_doc is not None
+                "text_length_characters": characters,
+                "text_length_words": words,
+                "language": language,
+                "spacy_available": self.spacy_available(language),
+                "families": [name for name in plan.families if name not in skipped],
+                "timings_seconds": timings,
+                "word_cache": {
+                    "hits": self.word_cache.hits - hits,
+                    "misses": self.word_cache.misses - misses
+                },
+                "cache_hit": False,
+                "streamed": True,
+                "chunk_count": chunk_count
             }
+            if skipped:
+                result["metadata"]["skipped_families"] = skipped
+            
+            return plan.select({k: v for k, v in result.items() if v is not None and v != {}})
+            
+        except Exception as e:
+            return {"error": f"Analysis failed: {str(e)}"}
+    
+    def analyze_many(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1,
+                     metrics: Optional[Iterable[str]] = None,
+                     profile: Optional[str] = None,
+                     language: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze a stream of texts, batching the spaCy work with nlp.pipe
+        
+        Args:
+            texts: Input texts, consumed lazily
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of spaCy worker processes
+            metrics: Metric families and/or result keys to compute (default: all)
+            profile: Named selection from [profiles], used if metrics is None
+            language: Key of [languages] for all the texts; detected per text
+                      if None, and only default_language texts are batched
+            
+        Yields:
+            One result per input text, in input order, each identical to
+            what analyze() returns for that text
+        """
+        try:
+            plan = self._plan(metrics, profile)
+            language = self._check_language(language)
+        except ValueError as e:
+            for _ in texts:
+                yield {"error": str(e)}
+            return
+        
+        def routed(text: str) -> Tuple[str, Optional[float], Optional[float]]:
+            return (language, None, None) if language is not None else self._route_language(text)
+        
+        batch_language = self._language(language)
+        nlp = self.pipeline(batch_language) if plan.needs("doc") else None
+        if not nlp:
+            for text in texts:
+                text = self._prepare_text(text)
+                if text is None:
+                    yield {"error": "Empty text provided"}
+                    continue
+                text_language, confidence, seconds = routed(text)
+                result = self._analyze_planned(text, plan, language=text_language)
+                yield self._note_detection(result, confidence, seconds)
+            return
+        
+        def jobs():
+            # Empty, cached and other-language texts travel through the pipe
+            # as "" so the order is kept while spaCy does no work for them
+            for text in texts:
+                text = self._prepare_text(text)
+                if text is None:
+                    yield "", (None, None, {"error": "Empty text provided"}, (None, 0.0))
+                    continue
+                text_language, confidence, seconds = routed(text)
+                detection = (confidence, seconds)
+                if (len(text) > self.config['system']['max_text_length']
+                        or text_language != batch_language):
+                    # Streamed chunk by chunk instead of as one Doc, or
+                    # parsed by its own language's pipeline
+                    yield "", (text, None,
+                               self._analyze_planned(text, plan, language=text_language), detection)
+                    continue
+                key = self._result_key(text, plan, batch_language)
+                cached = self._cached_result(key, time.time())
+                if cached:
+                    yield "", (text, key, cached, detection)
+                else:
+                    yield text, (text, key, None, detection)
+        
+        docs = nlp.pipe(jobs(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+        
+        start_time = time.time()
+        for spacy_doc, (text, key, ready, detection) in docs:
+            if ready is not None:
+                yield self._note_detection(ready, *detection)
+            else:
+                try:
+                    result = self._build_result(text, spacy_doc, start_time, plan,
+                                                language=batch_language)
+                    self.result_cache.put(key, result)
+                    self._note_detection(result, *detection)
+                except Exception as e:
+                    result = {"error": f"Analysis failed: {str(e)}"}
+                yield result
+            start_time = time.time()
+    
+    def analyze_sample(self, text: str, metrics: Optional[Iterable[str]] = None,
+                       profile: Optional[str] = None,
+                       language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Estimate the metrics of a very large text from a sample of its paragraphs
+        
+        Paragraphs are drawn from [sampling] strata contiguous strata, with
+        a seeded random source, up to about max_tokens tokens in all (see
+        sampling.py). Texts with fewer tokens are analyzed in full.
+        
+        Args:
+            text: Input text, not truncated
+            metrics: Metric families and/or result keys to compute (default: all)
+            profile: Named selection from [profiles], used if metrics is None
+            language: Key of [languages]; detected from the text if None
+            
+        Returns:
+            Dictionary with the estimated metrics; metadata.sampling holds
+            the sample fraction and each metric's confidence interval
+        """
+        if not text or not text.strip():
+            return {"error": "Empty text provided"}
+        try:
+            plan = self._plan(metrics, profile)
+            language = self._check_language(language)
+        except ValueError as e:
+            return {"error": str(e)}
+        if language is not None:
+            return self._analyze_sampled(text, plan, language)
+        language, confidence, seconds = self._route_language(text)
+        result = self._analyze_sampled(text, plan, language)
+        return self._note_detection(result, confidence, seconds)
+    
+    def _analyze_sampled(self, text: str, plan: Plan,
+                         language: Optional[str] = None) -> Dict[str, Any]:
+        """analyze_sample() for a resolved plan"""
+        sampling = self.config['sampling']
+        language = self._language(language)
+        try:
+            start_time = time.time()
+            segments = Segmentation.from_text(text)
+            sizes = paragraph_token_counts(segments)
+            total_tokens = sum(sizes)
+            if total_tokens <= sampling['max_tokens'] or len(sizes) < 2:
+                result = self._build_result(text, None, start_time, plan, language=language)
+                result["metadata"]["sampled"] = False
+                return result
+            
+            hits, misses = self.word_cache.hits, self.word_cache.misses
+            rng = random.Random(sampling['seed'])
+            strata = stratified_sample(sizes, sampling['max_tokens'], sampling['strata'], rng)
+            picked = [index for stratum in strata for index in stratum]
+            spans = list(segments.paragraph_spans())
+            paragraphs = [text[spans[index][0]:spans[index][1]] for index in picked]
+            nlp = self.pipeline(language) if plan.needs("doc") else None
+            if nlp:
+                docs = nlp.pipe(paragraphs)
+            else:
+                docs = (None for _ in paragraphs)
+            
+            # Metrics without mergeable counts need the whole text at once
+            streamed = [metric for metric in plan.metrics if metric.streamable]
+            skipped = [metric.name for metric in plan.metrics if not metric.streamable]
+            
+            # Counts of every sampled paragraph, by family
+            timings: Dict[str, float] = {}
+            counts: Dict[int, Dict[str, Dict[str, Any]]] = {}
+            for index, paragraph, spacy_doc in zip(picked, paragraphs, docs):
+                inputs = Inputs(self, paragraph, spacy_doc, language)
+                counts[index] = {
+                    metric.name: self._timed_step(timings, metric.name, inputs, metric.count, inputs)
+                    for metric in streamed
+                }
             
-            # Remove any empty/None values
-            result = {k: v for k, v in result.items() if v is not None and v != {}}
+            def estimate(indices: List[int]) -> Dict[str, Any]:
+                """Metrics of some sampled paragraphs, extrapolated to the whole text"""
+                estimated = {}
+                for metric in streamed:
+                    totals: Dict[str, Any] = {}
+                    for index in indices:
+                        merge_counts(totals, counts[index][metric.name])
+                    estimated.update(self._run_step(metric.finalize, totals))
+                scale = total_tokens / max(1, sum(sizes[index] for index in indices))
+                return {key: value * scale if key in EXTENSIVE_KEYS else value
+                        for key, value in estimated.items() if key not in NOT_EXTRAPOLATED_KEYS}
             
+            step_start = time.perf_counter()
+            result = estimate(picked)
+            _add_timing(timings, "estimate", time.perf_counter() - step_start)
+            
+            step_start = time.perf_counter()
+            intervals = bootstrap_intervals(strata, estimate, sampling['bootstrap_replicates'],
+                                            sampling['confidence'], rng)
+            _add_timing(timings, "bootstrap", time.perf_counter() - step_start)
+            
+            result = plan.select({k: v for k, v in result.items() if v is not None and v != {}})
+            sampled_tokens = sum(sizes[index] for index in picked)
+            result["metadata"] = {
+                "processing_time_seconds": time.time() - start_time,
+                "text_length_characters": len(text),
+                "text_length_words": total_tokens,
+                "language": language,
+                "spacy_available": self.spacy_available(language),
+                "families": [name for name in plan.families if name not in skipped],
+                "timings_seconds": timings,
+                "word_cache": {
+                    "hits": self.word_cache.hits - hits,
+                    "misses": self.word_cache.misses - misses
+                },
+                "cache_hit": False,
+                "sampled": True,
+                "sampling": {
+                    "sample_fraction": sampled_tokens / total_tokens,
+                    "sampled_paragraphs": len(picked),
+                    "paragraph_count": len(sizes),
+                    "seed": sampling['seed'],
+                    "confidence": sampling['confidence'],
+                    # Next to each estimated metric: its bootstrap interval
+                    "metrics": {
+                        key: {"low": low, "high": high, "ci_width": high - low}
+                        for key, (low, high) in intervals.items() if key in result
+                    },
+                },
+            }
+            if skipped:
+                result["metadata"]["skipped_families"] = skipped
             return result
             
         except Exception as e:
             return {"error": f"Analysis failed: {str(e)}"}
     
-    def _compute_readability_metrics(self, text: str) -> Dict[str, Any]:
-        """Compute readability metrics using textstat"""
+    def _plan(self, metrics: Optional[Iterable[str]], profile: Optional[str]) -> Plan:
+        """Resolve a metric selection against the configured profiles"""
+        if self.fast_start and metrics is None and profile is None:
+            profile = "readability"
+        return plan_metrics(metrics, profile, self.config['profiles'], self.registry)
+    
+    def _result_key(self, text: str, plan: Optional[Plan] = None,
+                    language: Optional[str] = None) -> str:
+        """Result cache key: the text plus everything else the result depends on"""
+        plan = plan or self._plan(None, None)
+        language = self._language(language)
+        model = self.config['languages'][language] if self.spacy_available(language) else None
+        return ResultCache.key(text, {
+            "analyzer": ANALYZER_VERSION,
+            "textstat": TEXTSTAT_VERSION,
+            "max_text_length": self.config['system']['max_text_length'],
+            "long_text_mode": self.config['system']['long_text_mode'],
+            "stream_chunk_chars": self.config['system']['stream_chunk_chars'],
+            "lexical": self.config['lexical'],
+            "sampling": self.config['sampling'],
+            "metrics": plan.describe(),
+            "language": language,
+            "model": model,
+        })
+    
+    def _cached_result(self, key: str, start_time: float) -> Optional[Dict[str, Any]]:
+        """Cached result with its metadata marked as a cache hit, or None"""
+        result, tier = self.result_cache.get(key)
+        if result is None:
+            return None
+        metadata = result.setdefault("metadata", {})
+        metadata.update({
+            "processing_time_seconds": time.time() - start_time,
+            "timings_seconds": {},
+            "word_cache": {"hits": 0, "misses": 0},
+            "cache_hit": True,
+            "cache_tier": tier
+        })
+        return result
+    
+    def _prepare_text(self, text: str) -> Optional[str]:
+        """
+        Return the text to analyze, or None if empty
+        
+        Texts over max_text_length are truncated, unless long_text_mode is
+        "stream" (analyze() then streams them in chunks) or "sample"
+        (analyze() then estimates the metrics from a sample).
+        """
+        if not text or not text.strip():
+            return None
+        
+        # Check text length
+        max_length = self.config['system']['max_text_length']
+        long_text_mode = self.config['system']['long_text_mode']
+        if len(text) > max_length and long_text_mode not in ('stream', 'sample'):
+            text = text[:max_length]
+        return text
+    
+    def _build_result(self, text: str, spacy_doc, start_time: float,
+                      plan: Optional[Plan] = None, deadline: Optional[float] = None,
+                      language: Optional[str] = None) -> Dict[str, Any]:
+        """Run the planned metric families over shared inputs, timing each step"""
+        plan = plan or self._plan(None, None)
+        language = self._language(language)
+        result = {}
+        hits, misses = self.word_cache.hits, self.word_cache.misses
+        
+        # Words, sentences, counts and the Doc are built once, on first use
+        inputs = Inputs(self, text, spacy_doc, language)
+        timings: Dict[str, float] = {}
+        skipped = []
+        for metric in plan.metrics:
+            # Cheapest first: once one family misses the deadline, so do the rest
+            if deadline is not None and (skipped or not self._fits(metric, inputs, deadline)):
+                skipped.append(metric.name)
+                continue
+            result.update(self._timed_step(timings, metric.name, inputs, metric.compute, inputs))
+        self._learn_input_rates(inputs)
+        
+        # Add metadata
+        result["metadata"] = {
+            "processing_time_seconds": time.time() - start_time,
+            "text_length_characters": len(text),
+            "text_length_words": inputs.segments.token_count,
+            "language": language,
+            "spacy_available": self.spacy_available(language),
+            "families": [name for name in plan.families if name not in skipped],
+            "timings_seconds": timings,
+            "word_cache": {
+                "hits": self.word_cache.hits - hits,
+                "misses": self.word_cache.misses - misses
+            },
+            "cache_hit": False
+        }
+        if deadline is not None:
+            result["metadata"]["partial"] = bool(skipped)
+        if skipped:
+            result["metadata"]["skipped_families"] = skipped
+        
+        # Remove any empty/None values
+        result = {k: v for k, v in result.items() if v is not None and v != {}}
+        
+        return plan.select(result)
+    
+    def _fits(self, metric, inputs: Inputs, deadline: float) -> bool:
+        """Whether a metric should finish before the deadline, judging by its inputs"""
+        length = len(inputs.text)
+        expected = sum(self._input_rates.get(name, 0.0) * length
+                       for name in metric.inputs if not inputs.ready(name))
+        return time.perf_counter() + expected < deadline
+    
+    def _learn_input_rates(self, inputs: Inputs) -> None:
+        """Update the seconds-per-character estimate of every input built for a text"""
+        length = max(1, len(inputs.text))
+        for name, seconds in inputs.timings.items():
+            rate = seconds / length
+            previous = self._input_rates.get(name)
+            self._input_rates[name] = rate if previous is None else (previous + rate) / 2
+    
+    def _timed_step(self, timings: Dict[str, float], name: str, inputs: Inputs,
+                    step, *args) -> Dict[str, Any]:
+        """Run a metric step, adding its time and that of inputs it built to timings"""
+        built = set(inputs.timings)
+        start = time.perf_counter()
+        output = self._run_step(step, *args)
+        elapsed = time.perf_counter() - start
+        # Inputs first built by this step are reported on their own
+        for input_name in set(inputs.timings) - built:
+            elapsed -= inputs.timings[input_name]
+            _add_timing(timings, input_name, inputs.timings[input_name])
+        _add_timing(timings, name, elapsed)
+        return output
+    
+    def _run_step(self, step, *args) -> Dict[str, Any]:
+        """One metric step; a failing metric contributes nothing (silent fail)"""
         try:
-            if not textstat:
-                return {}
-            return {
-                # Core readability metrics
-                "flesch_kincaid_grade": textstat.flesch_kincaid_grade(text),
-                "flesch_reading_ease": textstat.flesch_reading_ease(text),
-                "gunning_fog_index": textstat.gunning_fog(text),
-                "smog_index": textstat.smog_index(text),
-                "automated_readability_index": textstat.automated_readability_index(text),
-                "coleman_liau_index": textstat.coleman_liau_index(text),
-                "dale_chall_score": textstat.dale_chall_readability_score(text),
-                "linsear_write_score": textstat.linsear_write_formula(text),
-                
-                # Additional readability metrics
-                "difficult_word_count": textstat.difficult_words(text),
-                "text_standard": textstat.text_standard(text),
-            }
+            return step(self, *args) or {}
+        except Exception:
+            return {}
+    
+    def _count_text(self, text: str, segments: Optional[Segmentation] = None,
+                    tokens: Optional[TokenizedText] = None,
+                    language: Optional[str] = None) -> Optional[TextCounts]:
+        """
+        Collect word, sentence and syllable counts in one pass (needs textstat)
+        
+        Words of a language in LEXICONS get its native syllable count and
+        easy-word list; everything else goes through the word cache (textstat).
+        """
+        try:
+            if not available('textstat'):
+                return None
+            language = self._language(language)
+            word_info = self.word_cache.lookup
+            if language in LEXICONS:
+                word_info = LEXICONS[language].word_info_with(word_info)
+            sentences = segments.raw_sentence_count if segments else None
+            return TextCounts.from_text(text, word_info, sentences, tokens, language)
+        except Exception:
+            return None
+    
+    def _compute_readability_metrics(self, counts: TextCounts) -> Dict[str, Any]:
+        """Compute readability metrics from shared counts (textstat formulas)"""
+        try:
+            return counts.readability_metrics()
         except Exception:
             return {}
     
-    def _compute_basic_stats(self, text: str) -> Dict[str, Any]:
+    def _compute_basic_stats(self, text: str, counts: Optional[TextCounts] = None,
+                             segments: Optional[Segmentation] = None) -> Dict[str, Any]:
         """Compute basic text statistics"""
         try:
-            if textstat:
-                return {
-                    "character_count": textstat.char_count(text),
-                    "letter_count": textstat.letter_count(text),
-                    "syllable_count": textstat.syllable_count(text),
-                    "word_count": textstat.lexicon_count(text),
-                    "sentence_count": textstat.sentence_count(text),
-                    "polysyllable_count": textstat.polysyllabcount(text),
-                }
-            else:
-                # Fallback to simple calculations
-                words = text.split()
-                sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
-                return {
-                    "character_count": len(text),
-                    "word_count": len(words),
-                    "sentence_count": len(sentences),
-                }
+            if counts:
+                return counts.basic_stats()
         except Exception:
-            # Fallback to simple calculations
-            words = text.split()
-            sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
-            return {
-                "character_count": len(text),
-                "word_count": len(words),
-                "sentence_count": len(sentences),
-            }
+            pass
+        # Fallback to simple calculations, same segmentation as everywhere else
+        segments = segments or Segmentation.from_text(text)
+        return {
+            "character_count": len(text),
+            "word_count": segments.token_count,
+            "sentence_count": segments.sentence_count,
+        }
     
     def _compute_structural_metrics(self, text: str) -> Dict[str, Any]:
         """Compute structural complexity metrics"""
         try:
-            paragraphs = [p for p in text.split('\n\n') if p.strip()]
-            sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
-            
-            if not sentences:
-                return {}
-            
-            # Detect structural elements
-            heading_pattern = re.compile(r'^#{1,3}\s+', re.MULTILINE)
-            list_pattern = re.compile(r'^[\s]*[-*•]\s|^\d+[\.\)]\s', re.MULTILINE)
-            
-            avg_paragraph_words = len(text.split()) / len(paragraphs) if paragraphs else 0
-            
-            return {
-                "paragraph_count": len(paragraphs),
-                "paragraph_sentence_ratio": len(paragraphs) / len(sentences) if sentences else 0,
-                "has_headings": bool(heading_pattern.search(text)),
-                "has_lists": bool(list_pattern.search(text)),
-                "list_item_count": len(list_pattern.findall(text)),
-                "average_paragraph_length_words": avg_paragraph_words,
-            }
+            return self._structural_metrics_from_counts(self._count_structure(text))
         except Exception:
             return {}
     
+    def _count_structure(self, text: str,
+                         segments: Optional[Segmentation] = None) -> Dict[str, int]:
+        """Paragraph, sentence, heading and list counts behind the structural metrics"""
+        segments = segments or Segmentation.from_text(text)
+        
+        # Headings, lists, quotes, tables and code blocks in one scan
+        counts = count_structure(text)
+        counts.update({
+            "paragraphs": segments.paragraph_count,
+            "sentences": segments.raw_sentence_count,
+            "words": segments.token_count,
+        })
+        return counts
+    
+    def _structural_metrics_from_counts(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        paragraphs = counts["paragraphs"]
+        if not paragraphs:
+            return {}
+        
+        avg_paragraph_words = counts["words"] / paragraphs
+        headings = counts["heading"] + counts["numbered_heading"]
+        
+        return {
+            "paragraph_count": paragraphs,
+            # Same sentence_count as the basic statistics (at least 1)
+            "paragraph_sentence_ratio": paragraphs / max(1, counts["sentences"]),
+            "has_headings": headings > 0,
+            "has_lists": counts["list_item"] > 0,
+            "list_item_count": counts["list_item"],
+            "average_paragraph_length_words": avg_paragraph_words,
+            "heading_count": headings,
+            "numbered_heading_count": counts["numbered_heading"],
+            "block_quote_count": counts["block_quote"],
+            "table_count": counts["table"],
+            "code_block_count": counts["code_block"],
+        }
+    
     def _compute_lexical_metrics(self, text: str) -> Dict[str, Any]:
         """Compute lexical diversity metrics"""
         try:
-            words = [w.lower() for w in text.split() if w.strip()]
-            if not words:
-                return {}
-            
-            unique_words = len(set(words))
-            total_words = len(words)
-            
-            result = {
-                "type_token_ratio": unique_words / total_words,
-                "unique_word_count": unique_words,
-                "unique_word_ratio": unique_words / total_words,
-            }
-            
-            # Approximate lexical diversity metrics for long texts
-            if total_words >= 50:  # Minimum for meaningful MTLD-like calculation
-                # Simple approximation of lexical diversity
-                segments = []
-                segment_size = 10
-                for i in range(0, total_words, segment_size):
-                    segment = words[i:i + segment_size]
-                    if segment:
-                        segments.append(len(set(segment)) / len(segment))
-                
-                if segments:
-                    result["lexical_diversity_score"] = sum(segments) / len(segments)
-            
-            return result
+            return self._lexical_metrics_from_counts(
+                self._count_vocabulary(TokenizedText.from_text(text)))
         except Exception:
             return {}
     
+    def _count_vocabulary(self, tokens: TokenizedText) -> Dict[str, Any]:
+        """Word frequencies, MTLD factors and segment TTRs behind the lexical metrics"""
+        # Lowercase word ids, in order
+        ids = tokens.ids
+        
+        # Simple approximation of lexical diversity: TTR of 10-word segments
+        segment_size = 10
+        segment_ttr_sum = 0.0
+        segments = 0
+        for i in range(0, len(ids), segment_size):
+            segment = ids[i:i + segment_size]
+            segment_ttr_sum += len(set(segment)) / len(segment)
+            segments += 1
+        
+        lexical = self.config['lexical']
+        threshold = lexical['mtld_threshold']
+        
+        # Sliding-window TTR; the series keeps every `step`-th window
+        window, step = lexical['mattr_window'], lexical['mattr_series_step']
+        size = min(max(1, window), len(ids))
+        window_counts = window_types(ids, window)
+        series = []
+        if step > 0:
+            window_counts = list(window_counts)
+            series = [types / size for types in window_counts[::step]]
+        mattr_types = sum(window_counts)
+        
+        return {
+            "frequencies": tokens.frequencies(),
+            "words": len(ids),
+            "segment_ttr_sum": segment_ttr_sum,
+            "segments": segments,
+            "mtld_forward_factors": mtld_factors(ids, threshold),
+            "mtld_backward_factors": mtld_factors(ids[::-1], threshold),
+            "mattr_types": mattr_types,
+            "mattr_slots": (len(ids) - size + 1) * size if ids else 0,
+            "mattr_series": series,
+        }
+    
+    def _lexical_metrics_from_counts(self, counts: Dict[str, Any]) -> Dict[str, Any]:
+        total_words = counts["words"]
+        if not total_words:
+            return {}
+        
+        unique_words = len(counts["frequencies"])
+        
+        result = {
+            "type_token_ratio": unique_words / total_words,
+            "unique_word_count": unique_words,
+            "unique_word_ratio": unique_words / total_words,
+        }
+        
+        # Approximate lexical diversity metrics for long texts
+        if total_words >= 50 and counts["segments"]:  # Minimum for meaningful MTLD-like calculation
+            result["lexical_diversity_score"] = counts["segment_ttr_sum"] / counts["segments"]
+        
+        # Length-independent diversity, only meaningful past a minimum length
+        lexical = self.config['lexical']
+        if total_words >= lexical['min_words_for_mtld']:
+            result["mtld"] = mtld_from_factors(total_words, counts["mtld_forward_factors"],
+                                               counts["mtld_backward_factors"])
+        if total_words >= max(lexical['min_words_for_hdd'], lexical['hdd_sample_size']):
+            result["hdd"] = hdd(counts["frequencies"].values(), lexical['hdd_sample_size'])
+        
+        # Under one window MATTR would just repeat the type-token ratio
+        if total_words >= lexical['mattr_window'] and counts["mattr_slots"]:
+            result["mattr"] = counts["mattr_types"] / counts["mattr_slots"]
+            if lexical['mattr_series_step'] > 0:
+                # values[i] is the TTR of the window starting at word i * step
+                result["mattr_series"] = {
+                    "window": lexical['mattr_window'],
+                    "step": lexical['mattr_series_step'],
+                    "values": counts["mattr_series"],
+                }
+        
+        return result
+    
     def _compute_autism_metrics(self, spacy_doc) -> Dict[str, Any]:
         """Compute autism-relevant linguistic metrics"""
         try:
-            # Count pronouns and determiners
-            pronouns = sum(1 for token in spacy_doc if token.pos_ == "PRON")
-            determiners = sum(1 for token in spacy_doc if token.pos_ == "DET")
-            
-            # Content tokens (exclude punctuation, spaces, symbols)
-            content_tokens = [
-                token for token in spacy_doc 
-                if token.pos_ not in ("PUNCT", "SPACE", "SYM")
-            ]
-            token_count = len(content_tokens)
-            
-            if token_count == 0:
-                return {}
-            
-            # Count anaphora (pronouns with morphological features)
-            anaphora_count = 0
-            for token in spacy_doc:
-                if token.pos_ == "PRON":
-                    morph = token.morph.to_dict()
-                    if any(key in morph for key in ['Person', 'Number', 'Case']):
-                        anaphora_count += 1
-                elif token.pos_ == "DET" and token.dep_ != "det":
-                    morph = token.morph.to_dict()
-                    if morph.get('PronType') == 'Dem':
-                        anaphora_count += 1
-            
-            return {
-                "pronoun_density": pronouns / token_count,
-                "determiner_density": determiners / token_count,
-                "anaphora_density": anaphora_count / token_count,
-                "content_token_count": token_count,
-                "sentence_count": len(list(spacy_doc.sents)),
-            }
+            return self._autism_metrics_from_counts(self._count_reference(spacy_doc))
         except Exception:
             return {}
+    
+    def _count_reference(self, spacy_doc) -> Dict[str, int]:
+        """Pronoun, determiner and anaphora counts behind the autism metrics"""
+        import numpy
+        from spacy.attrs import DEP, MORPH, POS
+        from spacy.parts_of_speech import DET, PRON, PUNCT, SPACE, SYM
+        
+        # One extraction of the token attributes, then array masks
+        columns = spacy_doc.to_array([POS, DEP, MORPH])
+        pos, dep, morph = columns[:, 0], columns[:, 1], columns[:, 2]
+        
+        pronouns = pos == PRON
+        determiners = pos == DET
+        
+        # Content tokens (exclude punctuation, spaces, symbols)
+        content_tokens = ~numpy.isin(pos, [PUNCT, SPACE, SYM])
+        
+        # Anaphora: pronouns with Person/Number/Case, and demonstrative
+        # determiners that are not attached as plain determiners
+        personal, demonstrative = self._morph_masks(morph, spacy_doc.vocab)
+        det_label = spacy_doc.vocab.strings["det"]
+        anaphora = (pronouns & personal) | (determiners & (dep != det_label) & demonstrative)
+        
+        return {
+            "pronouns": int(pronouns.sum()),
+            "determiners": int(determiners.sum()),
+            "content_tokens": int(content_tokens.sum()),
+            "anaphora": int(anaphora.sum()),
+        }
+    
+    def _morph_masks(self, morph, vocab):
+        """Per-token (has Person/Number/Case, is PronType=Dem) masks from MORPH hashes"""
+        import numpy
+        keys, inverse = numpy.unique(morph, return_inverse=True)
+        flags = self._morph_flags
+        for key in keys.tolist():
+            if key not in flags:
+                flags[key] = _reference_features(vocab.strings[key] if key else "")
+        personal = numpy.array([flags[key][0] for key in keys.tolist()], dtype=bool)
+        demonstrative = numpy.array([flags[key][1] for key in keys.tolist()], dtype=bool)
+        return personal[inverse], demonstrative[inverse]
+    
+    def _autism_metrics_from_counts(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        token_count = counts["content_tokens"]
+        if token_count == 0:
+            return {}
+        
+        return {
+            "pronoun_density": counts["pronouns"] / token_count,
+            "determiner_density": counts["determiners"] / token_count,
+            "anaphora_density": counts["anaphora"] / token_count,
+            "content_token_count": token_count,
+        }
+
+
+# ====== WORKER MODE - ONE PROCESS, MANY REQUESTS ======
+def serve(analyzer: TextAnalyzer, stdin=None, stdout=None) -> int:
+    """
+    Serve newline-delimited JSON requests until EOF
+    
+    Each input line is a request {"id": ..., "text": ...}; each output line
+    is a response {"id": ..., "result": {...}} with the same id. Models are
+    loaded once by the caller, so only the first request pays for them.
+    
+    Args:
+        analyzer: Initialized analyzer shared by all requests
+        stdin: Request stream (defaults to sys.stdin)
+        stdout: Response stream (defaults to sys.stdout)
+        
+    Returns:
+        Number of requests served
+    """
+    stdin = stdin if stdin is not None else sys.stdin
+    stdout = stdout if stdout is not None else sys.stdout
+    served = 0
+    
+    for line in stdin:
+        if not line.strip():
+            continue
+        
+        try:
+            message = handle_request(analyzer, json.loads(line))
+        except Exception as e:
+            message = {"id": None, "result": {"error": f"Invalid request: {str(e)}"}}
+        
+        try:
+            response = json.dumps(message, ensure_ascii=False, separators=(',', ':'))
+        except Exception:
+            response = json.dumps({"id": message["id"],
+                                   "result": {"error": "JSON serialization failed"}})
+        
+        # One line per response, flushed so the client never waits on a buffer
+        stdout.write(response + "\n")
+        stdout.flush()
+        served += 1
+    
+    return served
+
+
+# ====== SUBCOMMANDS ======
+COMMANDS = ("serve", "probe", "batch", "startup", "prepare-model")
+
+
+def run_command(argv) -> int:
+    """
+    Run a text_analyzer.py subcommand
+    
+    Args:
+        argv: Command line without the program name, e.g. ["serve", ...]
+        
+    Returns:
+        Process exit code
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="text_analyzer.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = commands.add_parser("serve", help="Pre-forked Unix socket server")
+    serve_parser.add_argument("--socket", required=True, help="Unix socket path")
+    serve_parser.add_argument("--workers", type=int, default=None,
+                              help="Worker processes (default: CPU count)")
+    serve_parser.add_argument("--config", default=None, help="TOML configuration file")
+    serve_parser.add_argument("--fast-start", action="store_true",
+                              help="Readability only, without loading spaCy")
+    
+    probe_parser = commands.add_parser("probe", help="Readiness probe for a running server")
+    probe_parser.add_argument("--socket", required=True, help="Unix socket path")
+    probe_parser.add_argument("--timeout", type=float, default=1.0)
+    
+    batch_parser = commands.add_parser("batch", help="Analyze a JSON/JSONL corpus file")
+    batch_parser.add_argument("input", help="JSONL or {\"texts\": [...]} corpus file")
+    batch_parser.add_argument("output", help="JSONL results file")
+    batch_parser.add_argument("--processes", type=int, default=1,
+                              help="Worker processes (default: 1)")
+    batch_parser.add_argument("--batch-size", type=int, default=64,
+                              help="Texts per worker task and spaCy batch")
+    batch_parser.add_argument("--no-resume", action="store_true",
+                              help="Overwrite the output instead of resuming it")
+    batch_parser.add_argument("--metrics", default=None,
+                              help="Comma-separated metric families/keys (default: all)")
+    batch_parser.add_argument("--profile", default=None, help="Named metric profile")
+    batch_parser.add_argument("--language", default=None,
+                              help="Language of the corpus, a key of [languages]")
+    batch_parser.add_argument("--config", default=None, help="TOML configuration file")
+    batch_parser.add_argument("--fast-start", action="store_true",
+                              help="Readability only, without loading spaCy")
+    
+    startup_parser = commands.add_parser("startup",
+                                         help="Cold-start import time per dependency")
+    startup_parser.add_argument("--repeat", type=int, default=3,
+                                help="Fresh interpreters per import, the fastest is kept")
+    
+    prepare_parser = commands.add_parser("prepare-model",
+                                         help="Write trimmed pipeline snapshots for fast loading")
+    prepare_parser.add_argument("--language", action="append", default=None,
+                                help="Language from [languages] (repeatable, default: all)")
+    prepare_parser.add_argument("--config", default=None, help="TOML configuration file")
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "prepare-model":
+        analyzer = TextAnalyzer(config_path=args.config, fast_start=True)
+        prepared = analyzer.prepare_models(args.language)
+        sys.stdout.write(json.dumps(prepared) + "\n")
+        return 1 if any("error" in entry for entry in prepared.values()) else 0
+    
+    if args.command == "startup":
+        from dependencies import DEPENDENCIES, import_times
+        times = import_times(DEPENDENCIES + ("text_analyzer",), repeat=args.repeat)
+        sys.stdout.write(json.dumps({"import_seconds": times}) + "\n")
+        return 0
+    
+    if args.command == "batch":
+        from corpus import run_batch
+        analyzer = TextAnalyzer(config_path=args.config, fast_start=args.fast_start)
+        summary = run_batch(analyzer, args.input, args.output,
+                            processes=args.processes, batch_size=args.batch_size,
+                            resume=not args.no_resume,
+                            metrics=args.metrics.split(",") if args.metrics else None,
+                            profile=args.profile, language=args.language)
+        analyzer.word_cache.save()
+        sys.stdout.write(json.dumps(summary) + "\n")
+        return 0
+    
+    from analyzer_server import AnalysisServer, probe
+    
+    if args.command == "probe":
+        return 0 if probe(args.socket, args.timeout) else 1
+    
+    # Models are loaded here, once, before the workers are forked
+    analyzer = TextAnalyzer(config_path=args.config, fast_start=args.fast_start)
+    analyzer.load_models()
+    AnalysisServer(analyzer, args.socket, args.workers).serve_forever()
+    return 0
 
 
 # ====== MAIN ENTRY POINT - GUARANTEED CLEAN EXIT ======
@@ -346,15 +1276,45 @@ def main():
     import sys
     import json
     
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(run_command(sys.argv[1:]))
+    
+    # Worker modes: one analyzer (models load on first use), answer requests until EOF
+    if "--serve" in sys.argv[1:] or "--framed" in sys.argv[1:]:
+        original_stderr = sys.stderr
+        sys.stderr = NullWriter()
+        try:
+            args = sys.argv[1:]
+            config_path = args[args.index("--config") + 1] if "--config" in args[:-1] else None
+            analyzer = TextAnalyzer(config_path=config_path, fast_start="--fast-start" in args)
+            if "--framed" in sys.argv[1:]:
+                codec = "msgpack" if "--msgpack" in sys.argv[1:] else "json"
+                serve_framed(analyzer, sys.stdin.buffer, sys.stdout.buffer, codec)
+            else:
+                serve(analyzer)
+            # Keep the vocabulary warm for the next worker
+            analyzer.word_cache.save()
+        except Exception:
+            pass
+        finally:
+            sys.stderr = original_stderr
+        sys.exit(0)
+    
     # Read JSON from stdin
+    metrics = profile = tier = deadline_ms = language = None
     try:
         input_json = json.loads(sys.stdin.read())
         text = input_json.get("text", "")
+        metrics = input_json.get("metrics")
+        profile = input_json.get("profile")
+        tier = input_json.get("tier")
+        deadline_ms = input_json.get("deadline_ms")
+        language = input_json.get("language")
     except:
         # Fallback: treat input as raw text
         if not sys.stdin.isatty():
             text = sys.stdin.read().strip()
-        elif len(sys.argv) > 1:
+        elif len(sys.argv) > 1 and sys.argv[1] != "--fast-start":
             text = sys.argv[1]
         else:
             text = ""
@@ -368,8 +1328,9 @@ def main():
     try:
         if text:
             # Initialize and analyze
-            analyzer = TextAnalyzer()
-            result = analyzer.analyze(text)
+            analyzer = TextAnalyzer(fast_start="--fast-start" in sys.argv[1:])
+            result = analyzer.analyze(text, metrics=metrics, profile=profile, tier=tier,
+                                      deadline_ms=deadline_ms, language=language)
         else:
             result = {"error": "No text provided"}
         
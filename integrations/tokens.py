@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compact whitespace tokenization shared by the metric families
+
+TokenizedText keeps the tokens of a text (the words of text.split()) as
+start/end offsets into the text plus one interned id per token, so the
+readability, basic, structural and lexical passes read one structure
+instead of each splitting and lowercasing the text again. Token strings are
+sliced out only when asked for; the only strings kept are the distinct
+lowercase words (vocabulary).
+
+    ids[i]                 id of the lowercased token i
+    vocabulary[ids[i]]     that lowercase word; ids follow first appearance
+"""
+
+import re
+from array import array
+from collections import Counter
+from typing import Iterator, List, Tuple
+
+_TOKEN = re.compile(r"\S+")
+
+
+def token_offsets(text: str) -> Tuple[array, array]:
+    """Start and end offsets of the whitespace tokens of a text"""
+    starts = array("I")
+    ends = array("I")
+    for match in _TOKEN.finditer(text):
+        starts.append(match.start())
+        ends.append(match.end())
+    return starts, ends
+
+
+class TokenizedText:
+    """Whitespace tokens of a text as offsets, with interned lowercase ids"""
+
+    __slots__ = ("text", "starts", "ends", "ids", "vocabulary")
+
+    def __init__(self, text: str, starts: array, ends: array):
+        """
+        Args:
+            text: The tokenized text
+            starts, ends: Token offsets, e.g. from token_offsets() or a
+                          Segmentation (shared, not copied)
+        """
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        index = {}
+        self.ids = array("I", (index.setdefault(text[start:end].lower(), len(index))
+                               for start, end in zip(starts, ends)))
+        self.vocabulary: List[str] = list(index)
+
+    @classmethod
+    def from_text(cls, text: str) -> "TokenizedText":
+        return cls(text, *token_offsets(text))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, position: int) -> str:
+        return self.text[self.starts[position]:self.ends[position]]
+
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        return (text[start:end] for start, end in zip(self.starts, self.ends))
+
+    @property
+    def character_count(self) -> int:
+        """Non-whitespace characters"""
+        return sum(self.ends) - sum(self.starts)
+
+    def frequencies(self) -> Counter:
+        """Occurrences of each lowercase word"""
+        vocabulary = self.vocabulary
+        return Counter({vocabulary[word_id]: n for word_id, n in Counter(self.ids).items()})